@@ -0,0 +1,70 @@
+# ABOUTME: Helpers and fixtures shared by the test modules
+# ABOUTME: Silent WAV audio and fake gTTS and pyttsx3 engines with post-processing off and no audio device
+import contextlib
+import io
+import wave
+import pytest
+from unittest.mock import Mock, patch
+import main
+
+
+def silence(seconds):
+    """Mono 16-bit 8 kHz WAV of silence lasting seconds"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b"\x00\x00" * int(8000 * seconds))
+    return buffer.getvalue()
+
+
+def _mp3_gtts(text, voice, emotion, rate):
+    return main.SynthesisResult(b"mp3-bytes", "mp3", ["engine: gTTS"])
+
+
+@pytest.fixture
+def fake_gtts():
+    """Yields a function that installs a synthesizer as gTTS, with a fresh router and silent output
+
+    Time stretching, silence trimming and the playback daemon are off, so audio goes
+    straight from the synthesizer to a NullSink, played in real time if asked.
+    """
+    with contextlib.ExitStack() as stack:
+        def install(synthesize=_mp3_gtts, realtime=False):
+            for patcher in (patch.dict(main._engines, {"gtts": "gtts"}),
+                            patch.dict(main._SYNTHESIZERS, {"gtts": synthesize}),
+                            patch('main.engine_router', main.EngineRouter()),
+                            patch('main.output_sink', main.NullSink(realtime=realtime)),
+                            patch('main.PLAYBACK_SOCKET', None),
+                            patch('main.TIME_STRETCH', False),
+                            patch('main.TRIM_SILENCE', False)):
+                stack.enter_context(patcher)
+
+        yield install
+
+
+@pytest.fixture
+def fake_pyttsx3():
+    """A pyttsx3 engine that renders each text to a short silent WAV; yields the texts it rendered
+
+    Output goes to a NullSink, so pyttsx3 renders instead of speaking on the device.
+    """
+    rendered = []
+
+    def save_to_file(text, path):
+        rendered.append(text)
+        with open(path, 'wb') as f:
+            f.write(silence(0.1))
+
+    engine = Mock()
+    engine.save_to_file.side_effect = save_to_file
+    with patch('main.tts_engine', engine), \
+         patch.dict(main._engines, {"pyttsx3": engine}), \
+         patch('main.engine_router', main.EngineRouter()), \
+         patch('main.output_sink', main.NullSink()), \
+         patch('main.PLAYBACK_SOCKET', None), \
+         patch('main.TIME_STRETCH', False), \
+         patch('main.TRIM_SILENCE', False), \
+         patch('main.NORMALIZE_TEXT', False):
+        yield rendered
@@ -0,0 +1,260 @@
+# ABOUTME: Local stand-in HTTP server for the ElevenLabs and Google Translate (gTTS) speech endpoints
+# ABOUTME: Serves canned audio with configurable latency, streaming cadence and 429/5xx injection
+
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+# One frame of MPEG-1 Layer III at 128 kbps and 44.1 kHz with empty side info, which decodes as silence
+SILENT_MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0x64]) + bytes(413)
+MP3_FRAME_SECONDS = 1152 / 44100
+
+GTTS_PATH = "/_/TranslateWebserverUi/data/batchexecute"
+_ELEVENLABS_TTS_PATH = re.compile(r"^/v1/text-to-speech/([^/]+)(/stream)?$")
+
+
+def silent_mp3(seconds: float) -> bytes:
+    """Constant-bitrate MP3 of silence lasting about seconds"""
+    return SILENT_MP3_FRAME * max(1, round(seconds / MP3_FRAME_SECONDS))
+
+
+@dataclass
+class FakeTTSOptions:
+    """How the stand-in endpoints behave"""
+    latency_ms: float = 0.0  # Before the response starts
+    jitter_ms: float = 0.0
+    chunk_bytes: int = 4096  # Audio is streamed in chunks of this size...
+    chunk_interval_ms: float = 0.0  # ...this far apart
+    error_rate: float = 0.0  # Fraction of requests answered with one of error_statuses
+    error_statuses: Tuple[int, ...] = (429, 500, 503)
+    retry_after: int = 1  # Seconds, sent with 429 responses
+    ms_per_word: float = 400.0  # Length of generated audio per word of text
+    audio: Optional[bytes] = None  # Canned MP3 returned for every request instead of generated silence
+    api_key: Optional[str] = None  # When set, ElevenLabs requests must send it as xi-api-key
+    seed: Optional[int] = None
+
+
+class FakeTTSServer:
+    """Stand-in for api.elevenlabs.io and translate.google.<tld>, matching the HTTP the SDKs send
+
+    Point the server at it with ELEVENLABS_BASE_URL and GTTS_BASE_URL. Runs in a
+    background thread; usable as a context manager.
+    """
+
+    def __init__(self, options: Optional[FakeTTSOptions] = None, host: str = "127.0.0.1", port: int = 0):
+        self.options = options or FakeTTSOptions()
+        self._random = random.Random(self.options.seed)
+        self._lock = threading.Lock()
+        self.requests = {"elevenlabs": 0, "gtts": 0, "models": 0, "errors": 0}
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTTSServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="fake-tts", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def __enter__(self) -> "FakeTTSServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self.requests[kind] += 1
+
+    def delay(self) -> float:
+        with self._lock:
+            delay = self._random.gauss(self.options.latency_ms, self.options.jitter_ms)
+        return max(0.0, delay) / 1000
+
+    def injected_error(self) -> Optional[int]:
+        """A status code to fail this request with, or None"""
+        with self._lock:
+            if self._random.random() >= self.options.error_rate:
+                return None
+            self.requests["errors"] += 1
+            return self._random.choice(self.options.error_statuses)
+
+    def audio_for(self, text: str) -> bytes:
+        if self.options.audio is not None:
+            return self.options.audio
+        return silent_mp3(len(text.split()) * self.options.ms_per_word / 1000)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Needed for chunked transfer encoding
+
+    @property
+    def fake(self) -> FakeTTSServer:
+        return self.server.fake
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path != "/v1/models":
+            return self._send_json(404, {"detail": {"status": "not_found", "message": f"No route for {path}"}})
+        self.fake.count("models")
+        if not self._authorized():
+            return
+        time.sleep(self.fake.delay())
+        if self._maybe_fail():
+            return
+        self._send_json(200, [{"model_id": "eleven_flash_v2_5", "name": "Eleven Flash v2.5 (fake)"}])
+
+    def do_POST(self):
+        path = urllib.parse.urlsplit(self.path).path
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if path == GTTS_PATH:
+            self.fake.count("gtts")
+            return self._gtts(body)
+        if _ELEVENLABS_TTS_PATH.match(path):
+            self.fake.count("elevenlabs")
+            return self._elevenlabs(body)
+        self._send_json(404, {"detail": {"status": "not_found", "message": f"No route for {path}"}})
+
+    def _elevenlabs(self, body: bytes) -> None:
+        if not self._authorized():
+            return
+        try:
+            text = json.loads(body)["text"]
+        except (ValueError, KeyError, TypeError):
+            return self._send_json(422, {"detail": [{"loc": ["body", "text"], "msg": "field required"}]})
+        time.sleep(self.fake.delay())
+        if self._maybe_fail():
+            return
+        self._stream(200, "audio/mpeg", self.fake.audio_for(text))
+
+    def _gtts(self, body: bytes) -> None:
+        try:
+            rpc = json.loads(urllib.parse.parse_qs(body.decode("utf-8"))["f.req"][0])
+            text = json.loads(rpc[0][0][1])[0]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return self._send_text(400, "Bad Request")
+        time.sleep(self.fake.delay())
+        if self._maybe_fail():
+            return
+        # batchexecute's reply: a guard line, then the RPC result with the MP3 as base64
+        audio = base64.b64encode(self.fake.audio_for(text)).decode("ascii")
+        # gTTS finds the audio with a regex, so the separators must be compact like Google's
+        result = json.dumps([["wrb.fr", "jQ1olc", json.dumps([audio]), None, None, None, "generic"]],
+                            separators=(",", ":"))
+        payload = f")]}}'\n\n{len(result)}\n{result}\n".encode("utf-8")
+        self._stream(200, "application/json; charset=utf-8", payload)
+
+    def _authorized(self) -> bool:
+        expected = self.fake.options.api_key
+        if expected is None or self.headers.get("xi-api-key") == expected:
+            return True
+        self._send_json(401, {"detail": {"status": "invalid_api_key", "message": "Invalid API key"}})
+        return False
+
+    def _maybe_fail(self) -> bool:
+        status = self.fake.injected_error()
+        if status is None:
+            return False
+        headers = {"Retry-After": str(self.fake.options.retry_after)} if status == 429 else {}
+        reason = "too_many_requests" if status == 429 else "service_unavailable"
+        self._send_json(status, {"detail": {"status": reason, "message": f"Injected {status}"}}, headers)
+        return True
+
+    def _send_json(self, status: int, payload, headers=None) -> None:
+        self._send(status, "application/json", json.dumps(payload).encode("utf-8"), headers)
+
+    def _send_text(self, status: int, text: str) -> None:
+        self._send(status, "text/plain; charset=utf-8", text.encode("utf-8"))
+
+    def _send(self, status: int, content_type: str, data: bytes, headers=None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, status: int, content_type: str, data: bytes) -> None:
+        """Send data with chunked transfer encoding at the configured cadence"""
+        options = self.fake.options
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        size = max(1, options.chunk_bytes)
+        for offset in range(0, len(data), size):
+            if offset and options.chunk_interval_ms:
+                time.sleep(options.chunk_interval_ms / 1000)
+            chunk = data[offset:offset + size]
+            self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in ElevenLabs and gTTS endpoints for benchmarks and CI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before each response starts")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Standard deviation of the delay")
+    parser.add_argument("--chunk-bytes", type=int, default=4096, help="Size of each streamed audio chunk")
+    parser.add_argument("--chunk-interval-ms", type=float, default=0.0, help="Pause between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that get an error status")
+    parser.add_argument("--error-status", default="429,500,503", help="Comma-separated statuses to inject")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds for injected 429s")
+    parser.add_argument("--ms-per-word", type=float, default=400.0, help="Length of generated silence per word")
+    parser.add_argument("--audio", metavar="FILE", help="Canned MP3 to return instead of generated silence")
+    parser.add_argument("--api-key", help="Require this xi-api-key on ElevenLabs requests")
+    parser.add_argument("--seed", type=int, help="Seed for latency jitter and error injection")
+    args = parser.parse_args()
+
+    audio = None
+    if args.audio:
+        with open(args.audio, "rb") as f:
+            audio = f.read()
+    options = FakeTTSOptions(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        chunk_bytes=args.chunk_bytes, chunk_interval_ms=args.chunk_interval_ms,
+        error_rate=args.error_rate, error_statuses=tuple(int(s) for s in args.error_status.split(",") if s.strip()),
+        retry_after=args.retry_after, ms_per_word=args.ms_per_word, audio=audio,
+        api_key=args.api_key, seed=args.seed,
+    )
+    server = FakeTTSServer(options, args.host, args.port)
+    print(f"Fake TTS endpoints on {server.url}")
+    print(f"  export ELEVENLABS_BASE_URL={server.url} ELEVENLABS_API_KEY={args.api_key or 'fake'}")
+    print(f"  export GTTS_BASE_URL={server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
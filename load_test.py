@@ -0,0 +1,485 @@
+# ABOUTME: Load test for the vocalize MCP server on stdio or a network transport, with optional fake engines
+# ABOUTME: Ramps up simulated agents and reports throughput, latency percentiles, error rates and queue depth
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.stdio import StdioServerParameters, stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+TOOLS = ("speak", "list_voices", "server_status")
+ENGINE_LABELS = {"pyttsx3": "pyttsx3", "gtts": "gTTS", "elevenlabs": "ElevenLabs"}
+
+
+# Fake engines, installed into a real server process by --serve
+def _silence_wav(seconds):
+    """A mono 16-bit WAV of silence"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b"\x00\x00" * int(8000 * seconds))
+    return buffer.getvalue()
+
+
+class FakeVoice:
+    """Looks enough like a pyttsx3 voice for the server's voice cache and list_voices"""
+
+    def __init__(self, voice_id, name, languages):
+        self.id = voice_id
+        self.name = name
+        self.languages = languages
+
+
+class FakePyttsx3:
+    """A pyttsx3 engine handle that only answers property queries; synthesis goes through FakeBackend"""
+
+    VOICES = [
+        FakeVoice("fake.alex", "Fake Alex", ["en_US"]),
+        FakeVoice("fake.daniel", "Fake Daniel", ["en_GB"]),
+        FakeVoice("fake.karen", "Fake Karen", ["en_AU"]),
+    ]
+
+    def getProperty(self, name):
+        return {"voices": self.VOICES, "voice": self.VOICES[0].id, "rate": 150, "volume": 1.0}.get(name)
+
+    def setProperty(self, name, value):
+        pass
+
+
+class FakeBackend:
+    """Stands in for one engine: waits a sampled latency, sometimes fails, and returns silence
+
+    Synthesis runs through the server's own cache and concurrency limiter, so
+    everything but the engine itself behaves as in production.
+    """
+
+    def __init__(self, name, latency_ms=200.0, jitter_ms=50.0, failure_rate=0.0, ms_per_word=60.0, seed=None):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.ms_per_word = ms_per_word
+        self._random = random.Random(seed)
+
+    def render(self, text, job=None):
+        """Produce audio for text after the configured latency, or raise an injected failure"""
+        delay = max(0.0, self._random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        if job is not None:
+            job.wait(delay)
+            job.check()
+        else:
+            time.sleep(delay)
+        if self._random.random() < self.failure_rate:
+            raise RuntimeError("injected failure")
+        return _silence_wav(len(text.split()) * self.ms_per_word / 1000)
+
+    def probe(self):
+        """Circuit breaker probe: as slow and as flaky as synthesis"""
+        self.render("ok")
+
+    def synthesizer(self, server):
+        """A drop-in replacement for the server's synthesizer for this engine"""
+        label = ENGINE_LABELS[self.name]
+
+        def synthesize(text, voice, emotion, rate):
+            def create():
+                with server._synthesis_limits[self.name]:
+                    return self.render(text, server._current_job.get())
+
+            try:
+                audio, cached = server._cached_synthesis(self.name, text, create, fake=True)
+            except server.SpeechCancelled:
+                raise
+            except Exception as e:
+                raise Exception(f"{label} error: {e}")
+            details = [f"engine: {label}", "fake backend"]
+            if emotion:
+                details.append(f"emotion: {emotion}")
+            if voice:
+                details.append(f"voice: {voice}")
+            if server.audio_cache is not None:
+                details.append(f"cache: {'hit' if cached else 'miss'}")
+            return server.SynthesisResult(audio, "wav", details, cached)
+
+        return synthesize
+
+
+def install_fake_backends(server, latency_ms=200.0, jitter_ms=50.0, failure_rate=0.0, ms_per_word=60.0, seed=None):
+    """Replace every engine in an imported server module with a fake backend; returns the backends"""
+    backends = {}
+    for index, name in enumerate(server.SUPPORTED_ENGINES):
+        backend = FakeBackend(name, latency_ms, jitter_ms, failure_rate, ms_per_word,
+                              None if seed is None else seed + index)
+        backends[name] = backend
+        server._SYNTHESIZERS[name] = backend.synthesizer(server)
+        if name in server._circuit_breakers:
+            server._circuit_breakers[name].probe = backend.probe
+
+    pyttsx3_engine = FakePyttsx3()
+    handles = {name: pyttsx3_engine if name == "pyttsx3" else f"fake-{name}" for name in server.SUPPORTED_ENGINES}
+    with server._engines_lock:
+        server._engines.update(handles)
+    server.tts_engine = handles[server.TTS_ENGINE]
+    server.initialize_voice_cache(pyttsx3_engine)
+    return backends
+
+
+def serve(args):
+    """Run the real server with fake engines on the requested transport"""
+    # Audio never reaches a device; realtime keeps the playback queue as busy as real speech would
+    os.environ["VOCALIZE_SINK"] = args.sink
+    os.environ.pop("VOCALIZE_PLAYBACK_SOCKET", None)
+    import main as server
+
+    install_fake_backends(server, args.fake_latency_ms, args.fake_jitter_ms, args.fake_failure_rate,
+                          args.fake_ms_per_word, args.seed)
+    sys.argv = [sys.argv[0], "--transport", args.transport, "--host", "127.0.0.1", "--port", str(args.port)]
+    server.main()
+
+
+# Spawning servers
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve_command(args, transport, port=0):
+    """Command line that runs this script as a fake-backed server"""
+    return [
+        sys.executable, os.path.abspath(__file__), "--serve",
+        "--transport", transport, "--port", str(port), "--sink", args.sink,
+        "--fake-latency-ms", str(args.fake_latency_ms), "--fake-jitter-ms", str(args.fake_jitter_ms),
+        "--fake-failure-rate", str(args.fake_failure_rate), "--fake-ms-per-word", str(args.fake_ms_per_word),
+    ] + (["--seed", str(args.seed)] if args.seed is not None else [])
+
+
+def _serve_env(cache_dir):
+    env = dict(os.environ)
+    env["VOCALIZE_CACHE_DIR"] = cache_dir
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"  # pygame's banner on stdout would corrupt the stdio transport
+    env.pop("VOCALIZE_PLAYBACK_SOCKET", None)
+    return env
+
+
+def spawn_server(args, cache_dir, timeout=30.0):
+    """Start a fake-backed network server and wait until it accepts connections; returns (process, url)"""
+    port = _free_port()
+    process = subprocess.Popen(_serve_command(args, args.transport, port), env=_serve_env(cache_dir),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"fake server exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                process.terminate()
+                raise RuntimeError(f"fake server did not start listening on port {port}")
+            time.sleep(0.1)
+    path = "/sse" if args.transport == "sse" else "/mcp"
+    return process, f"http://127.0.0.1:{port}{path}"
+
+
+# Load generation
+def _connect(target):
+    """Open a client transport to the server"""
+    if target["transport"] == "stdio":
+        return stdio_client(target["server"], errlog=target["errlog"])
+    if target["transport"] == "sse":
+        return sse_client(target["url"])
+    return streamablehttp_client(target["url"])
+
+
+def parse_mix(spec):
+    """Parse 'speak=8,list_voices=1' into {tool: weight}"""
+    mix = {}
+    for part in spec.split(","):
+        tool, _, weight = part.strip().partition("=")
+        if tool not in TOOLS:
+            raise ValueError(f"unknown tool '{tool}' (choose from {', '.join(TOOLS)})")
+        mix[tool] = float(weight) if weight else 1.0
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("the call mix needs at least one tool with a positive weight")
+    return mix
+
+
+def _arguments(tool, args, agent, call):
+    if tool != "speak":
+        return {}
+    # Distinct text keeps every call a cache miss so the engines see the load
+    text = args.text if args.repeat_text else f"{args.text} agent {agent} call {call}"
+    arguments = {"text": text}
+    if args.engine:
+        arguments["engine"] = args.engine
+    return arguments
+
+
+async def run_client(target, mix, args, agent, calls):
+    """Run one simulated agent and return a list of (tool, latency, ok)"""
+    chooser = random.Random(None if args.seed is None else args.seed * 1000 + agent)
+    tools, weights = list(mix), list(mix.values())
+    records = []
+    async with _connect(target) as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            for call in range(calls):
+                tool = chooser.choices(tools, weights)[0]
+                start = time.perf_counter()
+                try:
+                    result = await session.call_tool(tool, _arguments(tool, args, agent, call))
+                    text = "".join(getattr(c, "text", "") for c in result.content)
+                    ok = not (result.isError or text.startswith("❌"))
+                except Exception:
+                    ok = False
+                records.append((tool, time.perf_counter() - start, ok))
+    return records
+
+
+_QUEUE_DEPTH = re.compile(r"🎧 Playback queue depth: (\d+)")
+_ENGINE_LIMITER = re.compile(r"• (\w+): [^,]*, (\d+)/(\d+) synthesizing, (\d+) waiting")
+
+
+def parse_status(text):
+    """Pull playback queue depth and per-engine synthesis load out of server_status output"""
+    depth = _QUEUE_DEPTH.search(text)
+    return {
+        "playback_depth": int(depth.group(1)) if depth else 0,
+        "engines": {
+            name: {"active": int(active), "limit": int(limit), "waiting": int(waiting)}
+            for name, active, limit, waiting in _ENGINE_LIMITER.findall(text)
+        },
+    }
+
+
+async def sample_queue(target, interval, stop, start):
+    """Poll server_status on its own connection until stop is set; returns timestamped samples"""
+    samples = []
+    async with _connect(target) as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            while not stop.is_set():
+                result = await session.call_tool("server_status", {})
+                sample = parse_status("".join(getattr(c, "text", "") for c in result.content))
+                sample["t"] = round(time.perf_counter() - start, 3)
+                samples.append(sample)
+                try:
+                    await asyncio.wait_for(stop.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+    return samples
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _latency_summary(records):
+    latencies = [latency for _, latency, _ in records]
+    errors = sum(1 for _, _, ok in records if not ok)
+    return {
+        "calls": len(records),
+        "errors": errors,
+        "error_rate": errors / len(records) if records else 0.0,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p90": percentile(latencies, 90),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def summarize(clients, records, elapsed, samples):
+    """Throughput, latency percentiles and error rates overall and per tool, plus queue depth"""
+    summary = {"clients": clients, **_latency_summary(records)}
+    summary["throughput"] = len(records) / elapsed if elapsed else 0.0
+    summary["tools"] = {
+        tool: _latency_summary([record for record in records if record[0] == tool])
+        for tool in sorted({record[0] for record in records})
+    }
+    depths = [sample["playback_depth"] for sample in samples]
+    waiting = [sum(engine["waiting"] for engine in sample["engines"].values()) for sample in samples]
+    summary["queue"] = {
+        "samples": samples,
+        "peak_depth": max(depths, default=0),
+        "mean_depth": statistics.fmean(depths) if depths else 0.0,
+        "peak_synthesis_waiting": max(waiting, default=0),
+    }
+    return summary
+
+
+async def run_level(target, mix, args, clients, calls):
+    """Run a single concurrency level and summarize it"""
+    start = time.perf_counter()
+    stop = asyncio.Event()
+    # A stdio server belongs to one agent, so there is no shared queue to watch
+    sampler = None
+    if target["transport"] != "stdio" and args.sample_interval > 0:
+        sampler = asyncio.create_task(sample_queue(target, args.sample_interval, stop, start))
+    results = await asyncio.gather(
+        *(run_client(target, mix, args, agent, calls) for agent in range(clients)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    samples = []
+    if sampler is not None:
+        try:
+            samples = await sampler
+        except Exception:
+            pass
+
+    records = []
+    for result in results:
+        if isinstance(result, BaseException):
+            # The whole agent failed to connect or dropped mid-run
+            records.extend(("connect", 0.0, False) for _ in range(calls))
+            continue
+        records.extend(result)
+    return summarize(clients, records, elapsed, samples)
+
+
+def _print_level(summary, per_tool, timeline):
+    print(
+        f"{summary['clients']:>8} {summary['calls']:>6} {summary['errors']:>6} {summary['error_rate'] * 100:>6.1f} "
+        f"{summary['throughput']:>8.1f} {summary['p50'] * 1000:>8.0f} {summary['p95'] * 1000:>8.0f} "
+        f"{summary['p99'] * 1000:>8.0f} {summary['queue']['peak_depth']:>6}"
+    )
+    if per_tool:
+        for tool, stats in summary["tools"].items():
+            print(
+                f"{'':>8} {stats['calls']:>6} {stats['errors']:>6} {stats['error_rate'] * 100:>6.1f} "
+                f"{'':>8} {stats['p50'] * 1000:>8.0f} {stats['p95'] * 1000:>8.0f} {stats['p99'] * 1000:>8.0f}   {tool}"
+            )
+    if timeline:
+        for sample in summary["queue"]["samples"]:
+            engines = ", ".join(
+                f"{name} {engine['active']}/{engine['limit']}+{engine['waiting']}"
+                for name, engine in sample["engines"].items()
+            )
+            print(f"{'':>8} t={sample['t']:>6.2f}s playback depth {sample['playback_depth']:>3}  {engines}")
+
+
+def _levels(max_clients):
+    levels = []
+    clients = 1
+    while clients <= max_clients:
+        levels.append(clients)
+        clients *= 2
+    if levels[-1] != max_clients:
+        levels.append(max_clients)
+    return levels
+
+
+async def main_async(args, target, mix):
+    where = "stdio (one fake-backed server per agent)" if target["transport"] == "stdio" else f"{target['url']} ({args.transport})"
+    print(f"Load testing {where} with {', '.join(f'{tool}={weight:g}' for tool, weight in mix.items())}")
+    print(
+        f"{'clients':>8} {'calls':>6} {'errors':>6} {'err %':>6} {'calls/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queue':>6}"
+    )
+
+    handled = 0
+    levels = []
+    for clients in _levels(args.max_clients):
+        summary = await run_level(target, mix, args, clients, args.calls)
+        levels.append(summary)
+        _print_level(summary, len(mix) > 1, args.timeline)
+        if summary["error_rate"] <= args.max_error_rate and summary["p95"] * 1000 <= args.max_p95_ms:
+            handled = clients
+
+    served_by = "Per-agent servers" if target["transport"] == "stdio" else "One instance"
+    print(
+        f"\n{served_by} handled {handled} concurrent clients with error rate <= {args.max_error_rate:.1%} "
+        f"and p95 <= {args.max_p95_ms} ms"
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"transport": args.transport, "mix": mix, "handled": handled, "levels": levels}, f, indent=2)
+        print(f"Wrote report to {args.json}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a vocalize MCP server")
+    parser.add_argument("--transport", choices=["stdio", "sse", "streamable-http"], default="sse")
+    parser.add_argument("--url", help="Server URL (default: http://127.0.0.1:8000/sse or /mcp)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="Start a server with fake engines instead of using a running one (always on for stdio)")
+    parser.add_argument("--tool", choices=TOOLS, default="server_status")
+    parser.add_argument("--mix", help="Weighted call mix per agent, e.g. speak=8,list_voices=1,server_status=1")
+    parser.add_argument("--text", default="Load test", help="Text for speak calls")
+    parser.add_argument("--repeat-text", action="store_true", help="Send the same text every time (cache hits)")
+    parser.add_argument("--engine", choices=["pyttsx3", "gtts", "elevenlabs", "auto"], help="Engine for speak calls")
+    parser.add_argument("--max-clients", type=int, default=32)
+    parser.add_argument("--calls", type=int, default=5, help="Calls per client at each level")
+    parser.add_argument("--max-p95-ms", type=float, default=5000.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="Highest error rate a level may have to count as handled")
+    parser.add_argument("--sample-interval", type=float, default=0.25, help="Seconds between queue depth samples (0 to disable)")
+    parser.add_argument("--timeline", action="store_true", help="Print queue depth samples under each level")
+    parser.add_argument("--json", metavar="FILE", help="Write the full report, including queue depth samples, as JSON")
+    parser.add_argument("--seed", type=int, help="Seed for the call mix and fake engines")
+
+    fakes = parser.add_argument_group("fake engines (--spawn, stdio and --serve)")
+    fakes.add_argument("--fake-latency-ms", type=float, default=200.0, help="Mean synthesis latency")
+    fakes.add_argument("--fake-jitter-ms", type=float, default=50.0, help="Standard deviation of synthesis latency")
+    fakes.add_argument("--fake-failure-rate", type=float, default=0.0, help="Fraction of syntheses that fail")
+    fakes.add_argument("--fake-ms-per-word", type=float, default=60.0, help="Length of the returned audio per word")
+    fakes.add_argument("--sink", choices=["null", "null:realtime"], default="null:realtime",
+                       help="Output sink; realtime holds the playback queue for the audio's duration")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    try:
+        mix = parse_mix(args.mix) if args.mix else {args.tool: 1.0}
+    except ValueError as e:
+        parser.error(str(e))
+
+    process = None
+    with tempfile.TemporaryDirectory(prefix="vocalize-load-") as cache_dir, open(os.devnull, "w") as errlog:
+        target = {"transport": args.transport, "url": args.url, "server": None, "errlog": errlog}
+        if args.transport == "stdio":
+            command = _serve_command(args, "stdio")
+            target["server"] = StdioServerParameters(command=command[0], args=command[1:], env=_serve_env(cache_dir))
+        elif args.spawn:
+            process, target["url"] = spawn_server(args, cache_dir)
+        elif not args.url:
+            path = "/sse" if args.transport == "sse" else "/mcp"
+            target["url"] = f"http://127.0.0.1:8000{path}"
+
+        try:
+            asyncio.run(main_async(args, target, mix))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,44 @@
 # ABOUTME: MCP server with text-to-speech capabilities using pyttsx3 or gTTS
 # ABOUTME: Provides voice emoting tools for agents with configurable TTS engines
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
+import anyio
 import pyttsx3
 import threading
+import functools
+import inspect
+import collections
+import contextlib
+import contextvars
+import cProfile
+import itertools
 import logging
 import atexit
 import platform
+import pstats
 import os
+import io
+import base64
+import json
+import hashlib
+import stat
+import string
+import wave
+import mmap
+import multiprocessing
+import sqlite3
+import socket
+import subprocess
+import sys
+import queue
+import re
+import shutil
 import tempfile
-from typing import Dict, List, Tuple
+import time
+import unicodedata
+import urllib.request
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -16,7 +46,7 @@ load_dotenv()
 
 # Optional gTTS imports
 try:
-    from gtts import gTTS
+    from gtts import gTTS, tts as gtts_tts
     import pygame
     GTTS_AVAILABLE = True
 except ImportError:
@@ -30,15 +60,377 @@ try:
 except ImportError:
     ELEVENLABS_AVAILABLE = False
 
+# Optional NumPy for vectorized audio post-processing
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to default when unset or invalid"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Invalid integer for {name}: '{value}', using {default}")
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean environment variable (1/true/yes/on)"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Server transport configuration: stdio (one process per client) or a shared network server
+SUPPORTED_TRANSPORTS = ("stdio", "sse", "streamable-http")
+SERVER_TRANSPORT = os.getenv("VOCALIZE_TRANSPORT", "stdio").lower()
+SERVER_HOST = os.getenv("VOCALIZE_HOST", "127.0.0.1")
+SERVER_PORT = _env_int("VOCALIZE_PORT", 8000)
+
 # Create an MCP server
-mcp = FastMCP("VocalizeAgent")
+mcp = FastMCP("VocalizeAgent", host=SERVER_HOST, port=SERVER_PORT)
+
+
+# Cancellation
+class SpeechCancelled(Exception):
+    """Raised inside a job's work once the job has been cancelled"""
+
+
+class SpeechJob:
+    """Cancellation token for one speak() or synthesize() call
+    
+    The job is current for the thread running the call (see _job_scope), so
+    queueing, network synthesis and playback can check it, or register a
+    callback that interrupts whatever they are blocked on the moment the
+    job is cancelled.
+    """
+    
+    def __init__(self, job_id: str, text: str, tool: str):
+        self.id = job_id
+        self.text = text
+        self.tool = tool
+        self.timing = CallTiming()
+        self.state = "synthesizing"  # Then "queued" for the audio device and "playing"
+        self._cancelled = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        return self._state
+    
+    @state.setter
+    def state(self, value: str) -> None:
+        self._state = value
+        self.timing.mark(value)
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def cancel(self) -> bool:
+        """Cancel the job and run its callbacks; returns False if it was already cancelled"""
+        with self._lock:
+            if self._cancelled.is_set():
+                return False
+            self._cancelled.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancelling job {self.id}: {e}")
+        return True
+    
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback when the job is cancelled (now, if it already is); returns an unregister function"""
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+    
+    def _unregister(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+    
+    def check(self) -> None:
+        """Raise SpeechCancelled if the job has been cancelled"""
+        if self._cancelled.is_set():
+            raise SpeechCancelled(f"job {self.id} cancelled")
+    
+    def wait(self, timeout: float) -> bool:
+        """Sleep for up to timeout seconds, waking early if cancelled; returns True if cancelled"""
+        return self._cancelled.wait(timeout)
+
+
+# Every speak()/synthesize() call in progress, oldest first, by job ID
+_jobs: "collections.OrderedDict[str, SpeechJob]" = collections.OrderedDict()
+_jobs_lock = threading.Lock()
+_job_ids = itertools.count(1)
+_current_job: contextvars.ContextVar[Optional[SpeechJob]] = contextvars.ContextVar("vocalize_job", default=None)
+
+
+@contextlib.contextmanager
+def _job_scope(text: str, tool: str):
+    """Register a cancellable job for a tool call and make it current for this thread"""
+    job = SpeechJob(f"job-{next(_job_ids)}", text, tool)
+    with _jobs_lock:
+        _jobs[job.id] = job
+    token = _current_job.set(job)
+    try:
+        yield job
+    finally:
+        _current_job.reset(token)
+        with _jobs_lock:
+            _jobs.pop(job.id, None)
+
+
+def _job_cancelled() -> bool:
+    """Whether the current thread's job has been cancelled"""
+    job = _current_job.get()
+    return job is not None and job.cancelled
+
+
+def _wait_unless_cancelled(event: Optional[threading.Event], timeout: float) -> bool:
+    """Wait up to timeout for event (or just sleep, without one); returns whether it was set
+    
+    Raises SpeechCancelled within one 50 ms slice of the current job being cancelled.
+    """
+    job = _current_job.get()
+    deadline = time.monotonic() + timeout
+    while True:
+        if job is not None:
+            job.check()
+        if event is not None and event.is_set():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if event is not None:
+            event.wait(min(0.05, remaining))
+        elif job is not None:
+            job.wait(remaining)
+        else:
+            time.sleep(remaining)
+
+
+def _in_job_context(fn: Callable) -> Callable:
+    """Bind fn to the current context so threads it runs in see the current job"""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+# Per-call timing
+class CallTiming:
+    """Where the time of one call went, reported by speak(timing=True)
+    
+    Durations are accumulated per phase by the code doing the work, and
+    marks record when the call first reached a state such as "playing".
+    Everything is relative to the start of the call.
+    """
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+        self.engine: Optional[str] = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.audio_bytes = 0
+        self.network_bytes = 0
+        self._lock = threading.Lock()
+    
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+    
+    def mark(self, event: str) -> None:
+        with self._lock:
+            self.marks.setdefault(event, time.perf_counter())
+    
+    def record_synthesis(self, engine_name: str, result: "SynthesisResult") -> None:
+        with self._lock:
+            if self.engine is None:
+                self.engine = engine_name  # The first engine to succeed is the one whose audio is used
+            self.audio_bytes += len(result.audio)
+            if engine_name in NETWORK_ENGINES:
+                if result.cached:
+                    self.cache_hits += 1
+                else:
+                    self.cache_misses += 1
+                    self.network_bytes += len(result.audio)
+    
+    def report(self, requested_engine: Optional[str] = None) -> Dict[str, Any]:
+        """Timing as a JSON-serializable dict; phases that never happened are None"""
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return None if seconds is None else round(seconds * 1000, 1)
+        
+        def between(start: str, end: str) -> Optional[float]:
+            if start in self.marks and end in self.marks:
+                return ms(self.marks[end] - self.marks[start])
+            return None
+        
+        cache = None
+        if self.cache_hits or self.cache_misses:
+            cache = "hit" if not self.cache_misses else "miss" if not self.cache_hits else "partial"
+        return {
+            "requested_engine": requested_engine,
+            "engine": self.engine,
+            "cache": cache,
+            "audio_bytes": self.audio_bytes,
+            "network_bytes": self.network_bytes,
+            "total_ms": ms(time.perf_counter() - self.started),
+            "synthesis_queue_ms": ms(self.phases.get("synthesis_queue")),
+            "voice_resolution_ms": ms(self.phases.get("voice_resolution")),
+            "synthesis_ms": ms(self.phases.get("synthesis")),
+            "postprocess_ms": ms(self.phases.get("postprocess")),
+            "playback_queue_ms": between("queued", "playing"),
+            "first_audio_ms": ms(self.marks["playing"] - self.started) if "playing" in self.marks else None,
+            "playback_ms": between("playing", "played"),
+        }
+
+
+def _call_timing() -> Optional[CallTiming]:
+    job = _current_job.get()
+    return job.timing if job is not None else None
+
+
+@contextlib.contextmanager
+def _timed(phase: str):
+    """Add the time spent in the block to the current call's timing"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = _call_timing()
+        if timing is not None:
+            timing.add(phase, time.perf_counter() - start)
+
+
+def _timing_line(job: "SpeechJob", requested_engine: Optional[str]) -> str:
+    return f"⏱️ Timing: {json.dumps(job.timing.report(requested_engine), ensure_ascii=False)}"
+
+
+class OrderedLock:
+    """FIFO lock so concurrent speak() calls are served in arrival order
+
+    threading.Lock makes no ordering promise, which is fine for a single stdio
+    client but lets one busy client starve others when many clients share a
+    network server. Waiters queue up and are released strictly first-come,
+    first-served; the queue depth is exposed for status reporting.
+    """
 
-# Thread lock for TTS operations
-tts_lock = threading.Lock()
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._waiters = collections.deque()
+
+    def acquire(self) -> bool:
+        """Wait for the lock in arrival order; a cancelled job leaves the queue immediately"""
+        job = _current_job.get()
+        ticket = object()
+        unregister = job.on_cancel(self._wake) if job is not None else None
+        try:
+            with self._cond:
+                self._waiters.append(ticket)
+                while self._waiters[0] is not ticket:
+                    if job is not None and job.cancelled:
+                        self._waiters.remove(ticket)
+                        self._cond.notify_all()
+                        job.check()
+                    self._cond.wait()
+        finally:
+            if unregister is not None:
+                unregister()
+        return True
+    
+    def _wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def release(self) -> None:
+        with self._cond:
+            if not self._waiters:
+                raise RuntimeError("release unlocked lock")
+            self._waiters.popleft()
+            self._cond.notify_all()
+
+    def locked(self) -> bool:
+        with self._cond:
+            return bool(self._waiters)
+
+    @property
+    def depth(self) -> int:
+        """Number of callers holding or waiting for the lock"""
+        with self._cond:
+            return len(self._waiters)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+# Exclusive lock on the audio output device, shared by every client of this process.
+# Synthesis is limited per engine instead (see _synthesis_limits).
+audio_output_lock = OrderedLock()
+
+# Server-wide counters reported by server_status()
+_server_stats = {
+    "started_at": time.time(),
+    "transport": "stdio",
+    "speak_calls": 0,
+    "speak_errors": 0,
+    "synthesize_calls": 0,
+    "synthesize_errors": 0,
+    "cancelled_calls": 0,
+    "active_calls": 0,
+}
+_stats_lock = threading.Lock()
+
+
+def _record_stat(name: str, delta: int = 1) -> None:
+    """Thread-safe increment of a server counter"""
+    with _stats_lock:
+        _server_stats[name] += delta
+
+
+def _threaded_tool():
+    """Register a blocking tool with MCP so it runs in a worker thread
+
+    FastMCP calls synchronous tools directly on the event loop. With the sse or
+    streamable-http transports many clients share that loop, so a speak() that
+    blocks for the length of playback would stall every other client. The plain
+    function is returned unchanged so it stays directly callable.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def run_in_thread(*args, **kwargs):
+            return await anyio.to_thread.run_sync(functools.partial(_run_tool, fn, *args, **kwargs))
+
+        mcp.add_tool(run_in_thread, name=fn.__name__, description=fn.__doc__)
+        return fn
+    return decorator
+
+
+# Bulk-render workers are spawned with this set; they import this module only for _render_worker,
+# so they skip the server's startup (engines, standby, tracing, sinks) and create their own pyttsx3 engine
+_RENDER_WORKER_ENV = "VOCALIZE_RENDER_WORKER"
+_IN_RENDER_WORKER = os.environ.get(_RENDER_WORKER_ENV) == "1"
 
 # Determine TTS engine from environment variable
 TTS_ENGINE = os.getenv("TTS_ENGINE", "pyttsx3").lower()
@@ -47,48 +439,474 @@ TTS_ENGINE = os.getenv("TTS_ENGINE", "pyttsx3").lower()
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "JBFqnCBsd6RMkjVDRZzb")  # Default to George voice
 
-# Initialize TTS engine based on configuration
-tts_engine = None
-elevenlabs_client = None
+# Stand-in endpoints for benchmarks and CI (see fake_tts_server.py); unset means the real services
+ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL") or None
+GTTS_BASE_URL = os.getenv("GTTS_BASE_URL") or None
+
+# Shared playback daemon: every server process on this machine hands audio to one player
+PLAYBACK_SOCKET = os.getenv("VOCALIZE_PLAYBACK_SOCKET")
+PLAYBACK_DAEMON_AUTOSTART = _env_bool("VOCALIZE_PLAYBACK_AUTOSTART", True)
+
+# Where played audio goes: device, null, null:realtime, wav:DIR or pcm:PATH
+OUTPUT_SINK = os.getenv("VOCALIZE_SINK", "device").strip() or "device"
+if OUTPUT_SINK != "device":
+    # No sound hardware needed; pygame only decodes, so don't let it open an audio device
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# Queue the next clip on the mixer while one plays so back-to-back utterances have no gap
+GAPLESS_PLAYBACK = _env_bool("VOCALIZE_GAPLESS", True)
+
+# Trim leading/trailing silence from synthesized audio (needs numpy)
+TRIM_SILENCE = _env_bool("VOCALIZE_TRIM_SILENCE", False)
+TRIM_THRESHOLD_DB = _env_int("VOCALIZE_TRIM_THRESHOLD_DB", -45)  # RMS level below which audio counts as silence
+TRIM_PAD_MS = _env_int("VOCALIZE_TRIM_PAD_MS", 30)  # Silence kept at each end so speech isn't clipped
+
+# Time-stretch network engine audio so speak(rate=...) applies to them too (needs numpy)
+TIME_STRETCH = _env_bool("VOCALIZE_TIME_STRETCH", True)
+TIME_STRETCH_STEP = _env_int("VOCALIZE_TIME_STRETCH_STEP_PCT", 5) / 100  # Speeds are rounded to this step for caching
+
+# Shared synthesis cache, safe for many server processes on one machine
+CACHE_ENABLED = _env_bool("VOCALIZE_CACHE", True)
+CACHE_DIR = os.getenv(
+    "VOCALIZE_CACHE_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "vocalize-mcp"),
+)
+CACHE_MAX_BYTES = _env_int("VOCALIZE_CACHE_MAX_MB", 256) * 1024 * 1024
+CACHE_WAIT_TIMEOUT = _env_int("VOCALIZE_CACHE_WAIT_TIMEOUT", 30)
+CACHE_SEGMENT_BYTES = _env_int("VOCALIZE_CACHE_SEGMENT_MB", 16) * 1024 * 1024
+
+# Headless synthesis: rendered audio is written here when synthesize() returns a path
+OUTPUT_DIR = os.getenv("VOCALIZE_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "vocalize-mcp"))
+OUTPUT_MAX_FILES = _env_int("VOCALIZE_OUTPUT_MAX_FILES", 200)
+AUDIO_FORMATS = ("mp3", "wav", "ogg")
+
+# Template synthesis: crossfade between stitched fragments so joins don't click
+TEMPLATE_CROSSFADE_MS = _env_int("VOCALIZE_TEMPLATE_CROSSFADE_MS", 20)
+
+# Speculative prefetch: budget and lifetime for pre-synthesized audio that hasn't been spoken yet
+PREFETCH_MAX_BYTES = _env_int("VOCALIZE_PREFETCH_MAX_MB", 32) * 1024 * 1024
+PREFETCH_TTL = _env_int("VOCALIZE_PREFETCH_TTL", 600)  # Seconds an unplayed prefetched clip is kept
+PREFETCH_MAX_QUEUE = _env_int("VOCALIZE_PREFETCH_MAX_ITEMS", 50)
 
-if TTS_ENGINE == "elevenlabs":
-    if ELEVENLABS_AVAILABLE and ELEVENLABS_API_KEY:
+# Startup cache warm-up: phrases synthesized into the cache in the background after startup
+WARMUP_MANIFEST = os.getenv("VOCALIZE_WARMUP_MANIFEST")
+WARMUP_CONCURRENCY = _env_int("VOCALIZE_WARMUP_CONCURRENCY", 2)
+WARMUP_RATE = _env_int("VOCALIZE_WARMUP_RATE", 4)  # Phrases started per second
+
+# Slow call profiling: speak() calls slower than the threshold leave a profile (0 disables)
+PROFILE_SLOW_MS = _env_int("VOCALIZE_PROFILE_SLOW_MS", 0)
+PROFILE_MODE = os.getenv("VOCALIZE_PROFILE_MODE", "sample").lower()  # sample or cprofile
+PROFILE_INTERVAL_MS = _env_int("VOCALIZE_PROFILE_INTERVAL_MS", 5)  # Sampling period
+PROFILE_DIR = os.getenv("VOCALIZE_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "vocalize-mcp-profiles"))
+PROFILE_MAX_FILES = _env_int("VOCALIZE_PROFILE_MAX_FILES", 20)
+
+# Bulk offline rendering: one independent pyttsx3 engine per worker process
+RENDER_WORKERS = _env_int("VOCALIZE_RENDER_WORKERS", os.cpu_count() or 1)
+
+# Additional engines to initialize alongside TTS_ENGINE so speak(engine=...) can route per call
+SUPPORTED_ENGINES = ("pyttsx3", "gtts", "elevenlabs")
+EXTRA_ENGINES = [name.strip().lower() for name in os.getenv("VOCALIZE_ENGINES", "").split(",") if name.strip()]
+
+# Text normalization before synthesis and cache lookup, so trivially different texts share audio.
+# Steps per engine; ElevenLabs reads casing and numbers itself, so it only gets the safe ones.
+NORMALIZE_TEXT = _env_bool("VOCALIZE_NORMALIZE", True)
+NORMALIZATION_STEPS = ("whitespace", "emoji", "punctuation", "numbers", "case", "terminal")
+_DEFAULT_NORMALIZATION = {
+    "pyttsx3": ",".join(NORMALIZATION_STEPS),
+    "gtts": ",".join(NORMALIZATION_STEPS),
+    "elevenlabs": "whitespace,emoji,punctuation",
+}
+NORMALIZE_STEPS = {}
+for _engine_name, _default_steps in _DEFAULT_NORMALIZATION.items():
+    _steps = os.getenv(f"VOCALIZE_NORMALIZE_{_engine_name.upper()}", _default_steps)
+    NORMALIZE_STEPS[_engine_name] = {step.strip().lower() for step in _steps.split(",") if step.strip()}
+    for _unknown in NORMALIZE_STEPS[_engine_name] - set(NORMALIZATION_STEPS) - {"none"}:
+        logger.warning(f"Unknown normalization step '{_unknown}' for {_engine_name}, ignoring")
+
+# Latency-aware routing across engines: fixed (always TTS_ENGINE), latency or hedged
+ROUTING_MODES = ("fixed", "latency", "hedged")
+ROUTING_MODE = os.getenv("VOCALIZE_ROUTING", "fixed").lower()
+if ROUTING_MODE not in ROUTING_MODES:
+    logger.warning(f"Unknown VOCALIZE_ROUTING '{ROUTING_MODE}', using fixed")
+    ROUTING_MODE = "fixed"
+ROUTING_ENGINES = [
+    name.strip().lower()
+    for name in os.getenv("VOCALIZE_ROUTING_ENGINES", "elevenlabs,gtts,pyttsx3").split(",")
+    if name.strip().lower() in ("pyttsx3", "gtts", "elevenlabs")
+]
+ROUTING_LATENCY_BUDGET = _env_int("VOCALIZE_LATENCY_BUDGET_MS", 2000) / 1000
+
+# Keep one pyttsx3 driver loop running instead of runAndWait() per utterance
+PYTTSX3_SESSION_ENABLED = _env_bool("VOCALIZE_PYTTSX3_SESSION", True)
+
+# Circuit breakers for network engines: fail fast to a local engine while a service is down
+NETWORK_ENGINES = ("gtts", "elevenlabs")
+NETWORK_TIMEOUT = _env_int("VOCALIZE_NETWORK_TIMEOUT", 10)  # Seconds per HTTP request
+BREAKER_FAILURE_THRESHOLD = _env_int("VOCALIZE_BREAKER_FAILURES", 3)
+BREAKER_RESET_TIMEOUT = _env_int("VOCALIZE_BREAKER_RESET", 30)  # Seconds open before probing recovery
+FALLBACK_ENGINE = os.getenv("VOCALIZE_FALLBACK_ENGINE", "pyttsx3").lower()
+if FALLBACK_ENGINE in ("", "none"):
+    FALLBACK_ENGINE = None
+
+# Synthesis concurrency per engine; pyttsx3 drives a single local engine so it is always 1
+SYNTHESIS_CONCURRENCY = {
+    "pyttsx3": 1,
+    "gtts": _env_int("VOCALIZE_GTTS_CONCURRENCY", 4),
+    "elevenlabs": _env_int("VOCALIZE_ELEVENLABS_CONCURRENCY", 4),
+}
+
+# Opt-in tracing: OTLP/JSON spans appended to a file, or POSTed to a collector when this is a URL
+TRACE_EXPORT = os.getenv("VOCALIZE_TRACE")
+TRACE_FLUSH_INTERVAL = _env_int("VOCALIZE_TRACE_FLUSH_MS", 1000) / 1000
+
+
+# Tracing
+class Span:
+    """One timed operation in a trace, exported in the OpenTelemetry span format"""
+    
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any], kind: int):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self._token = None
+    
+    def set(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+    
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        _current_span.reset(self._token)
+        exc_type, exc = exc_info[:2]
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.finish(self, time.time_ns())
+
+
+class _NoSpan:
+    """Stands in for a span while tracing is off, so instrumented code costs next to nothing"""
+    
+    def set(self, key: str, value: Any) -> None:
+        pass
+    
+    def __enter__(self) -> "_NoSpan":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("vocalize_span", default=None)
+# OTLP SpanKind values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # OTLP/JSON encodes 64-bit integers as strings
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class Tracer:
+    """Collects finished spans and exports them in batches as OTLP/JSON
+    
+    Every flush writes one ExportTraceServiceRequest. For a file target it is
+    appended as a single line, the layout of the OpenTelemetry Collector's
+    file exporter. For an http(s) target it is POSTed to the collector's
+    /v1/traces endpoint. Export runs on a background thread, so a slow
+    collector never delays speech. Failed batches are logged and dropped.
+    """
+    
+    def __init__(self, target: str, flush_interval: float = TRACE_FLUSH_INTERVAL, max_batch: int = 512):
+        self.target = target
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.exported = 0
+        self.dropped = 0
+        self._spans = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._resource = _otlp_attributes({
+            "service.name": "vocalize-mcp", "process.pid": os.getpid(), "host.name": platform.node(),
+        })
+        self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+        self._thread.start()
+    
+    def span(self, name: str, attributes: Dict[str, Any], kind: int = SPAN_KIND_INTERNAL) -> Span:
+        return Span(self, name, attributes, kind)
+    
+    def finish(self, span: Span, end_ns: int) -> None:
+        record = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id is not None:
+            record["parentSpanId"] = span.parent_id
+        with self._cond:
+            self._spans.append(record)
+            if len(self._spans) >= self.max_batch:
+                self._cond.notify()
+    
+    def flush(self) -> None:
+        with self._cond:
+            spans, self._spans = self._spans, []
+        if not spans:
+            return
+        payload = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": self._resource},
+            "scopeSpans": [{"scope": {"name": "vocalize-mcp"}, "spans": spans}],
+        }]}, ensure_ascii=False)
         try:
-            elevenlabs_client = ElevenLabs(api_key=ELEVENLABS_API_KEY)
-            logger.info("ElevenLabs engine initialized successfully")
-            tts_engine = "elevenlabs"
-        except Exception as e:
-            logger.error(f"Failed to initialize ElevenLabs: {e}")
-            logger.info("Falling back to pyttsx3")
-            TTS_ENGINE = "pyttsx3"
-    else:
+            if self.target.startswith(("http://", "https://")):
+                request = urllib.request.Request(
+                    self.target, data=payload.encode("utf-8"), headers={"Content-Type": "application/json"},
+                )
+                urllib.request.urlopen(request, timeout=NETWORK_TIMEOUT).close()
+            else:
+                with open(os.path.expanduser(self.target), "a", encoding="utf-8") as f:
+                    f.write(payload + "\n")
+            self.exported += len(spans)
+        except (OSError, ValueError) as e:
+            self.dropped += len(spans)
+            logger.warning(f"Failed to export {len(spans)} spans to {self.target}: {e}")
+    
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+        self.flush()
+    
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._spans) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
+
+
+tracer: Optional[Tracer] = None
+if TRACE_EXPORT and not _IN_RENDER_WORKER:
+    tracer = Tracer(TRACE_EXPORT)
+    atexit.register(tracer.close)
+    logger.info(f"Tracing enabled, exporting spans to {TRACE_EXPORT}")
+
+
+def _span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = SPAN_KIND_INTERNAL):
+    """A span for the block, or a no-op stand-in when tracing is off"""
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, attributes or {}, kind)
+
+
+def _span_attributes(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Span attributes for call arguments: scalars as they are, text and audio by length only"""
+    attributes = {}
+    for name, value in arguments.items():
+        if name == "text" and isinstance(value, str):
+            attributes["vocalize.text_length"] = len(value)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            attributes[f"vocalize.{name}_bytes"] = len(value)
+        elif isinstance(value, (str, int, float, bool)):
+            attributes[f"vocalize.{name}"] = value
+    return attributes
+
+
+def _traced(name: str) -> Callable:
+    """Decorator running the function inside a span, with its arguments as attributes"""
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if tracer is None:
+                return fn(*args, **kwargs)
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            arguments.pop("self", None)
+            with tracer.span(name, _span_attributes(arguments)):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _run_tool(fn: Callable, *args, **kwargs):
+    """Run a tool inside a server span covering the whole call"""
+    if tracer is None:
+        return fn(*args, **kwargs)
+    arguments = inspect.signature(fn).bind_partial(*args, **kwargs).arguments
+    attributes = {"mcp.tool.name": fn.__name__, **_span_attributes(arguments)}
+    with tracer.span(f"tool {fn.__name__}", attributes, SPAN_KIND_SERVER) as span:
+        result = fn(*args, **kwargs)
+        if isinstance(result, str):
+            outcome = "error" if result.startswith("❌") else "cancelled" if result.startswith("⏹️") else "ok"
+            span.set("vocalize.outcome", outcome)
+            if outcome == "error":
+                span.error = result.splitlines()[0]
+        return result
+
+
+def _init_elevenlabs():
+    """Create the ElevenLabs client; returns None when unavailable"""
+    global elevenlabs_client
+    if not ELEVENLABS_AVAILABLE or not ELEVENLABS_API_KEY:
         if not ELEVENLABS_AVAILABLE:
-            logger.warning("ElevenLabs not available, falling back to pyttsx3")
+            logger.warning("ElevenLabs not available")
         if not ELEVENLABS_API_KEY:
-            logger.warning("ELEVENLABS_API_KEY not set, falling back to pyttsx3")
-        TTS_ENGINE = "pyttsx3"
+            logger.warning("ELEVENLABS_API_KEY not set")
+        return None
+    try:
+        elevenlabs_client = ElevenLabs(api_key=ELEVENLABS_API_KEY, timeout=NETWORK_TIMEOUT, base_url=ELEVENLABS_BASE_URL)
+        if ELEVENLABS_BASE_URL:
+            logger.info(f"ElevenLabs requests go to {ELEVENLABS_BASE_URL}")
+        logger.info("ElevenLabs engine initialized successfully")
+        return "elevenlabs"
+    except Exception as e:
+        logger.error(f"Failed to initialize ElevenLabs: {e}")
+        return None
 
-elif TTS_ENGINE == "gtts":
-    if GTTS_AVAILABLE:
-        try:
-            pygame.mixer.init()
-            logger.info("gTTS engine initialized successfully")
-            tts_engine = "gtts"  # Use string to indicate gTTS mode
-        except Exception as e:
-            logger.error(f"Failed to initialize gTTS/pygame: {e}")
-            logger.info("Falling back to pyttsx3")
-            TTS_ENGINE = "pyttsx3"
-    else:
-        logger.warning("gTTS not available, falling back to pyttsx3")
-        TTS_ENGINE = "pyttsx3"
 
-if TTS_ENGINE == "pyttsx3" or tts_engine is None:
+def _gtts_translate_url(tld: str = "com", path: str = "") -> str:
+    """gTTS request URL on GTTS_BASE_URL rather than translate.google.<tld>; the accent rides along as a query"""
+    return f"{GTTS_BASE_URL.rstrip('/')}/{path}?tld={tld}"
+
+
+def _init_gtts():
+    """Prepare gTTS playback; returns None when unavailable"""
+    if not GTTS_AVAILABLE:
+        logger.warning("gTTS not available")
+        return None
+    if GTTS_BASE_URL:
+        # gTTS has no endpoint setting, so replace the helper it builds request URLs with
+        gtts_tts._translate_url = _gtts_translate_url
+        logger.info(f"gTTS requests go to {GTTS_BASE_URL}")
+    try:
+        pygame.mixer.init()
+        logger.info("gTTS engine initialized successfully")
+        return "gtts"  # Use string to indicate gTTS mode
+    except Exception as e:
+        logger.error(f"Failed to initialize gTTS/pygame: {e}")
+        return None
+
+
+def _init_pyttsx3():
+    """Create a pyttsx3 engine; returns None when unavailable"""
     try:
-        tts_engine = pyttsx3.init()
+        engine = pyttsx3.init()
         logger.info("pyttsx3 engine initialized successfully")
+        return engine
     except Exception as e:
         logger.error(f"Failed to initialize pyttsx3 engine: {e}")
-        tts_engine = None
+        return None
+
+
+_ENGINE_INITIALIZERS = {"pyttsx3": _init_pyttsx3, "gtts": _init_gtts, "elevenlabs": _init_elevenlabs}
+
+# Initialize TTS engine based on configuration
+tts_engine = None
+elevenlabs_client = None
+
+if TTS_ENGINE in ("elevenlabs", "gtts") and not _IN_RENDER_WORKER:
+    tts_engine = _ENGINE_INITIALIZERS[TTS_ENGINE]()
+    if tts_engine is None:
+        logger.info("Falling back to pyttsx3")
+        TTS_ENGINE = "pyttsx3"
+
+if TTS_ENGINE == "pyttsx3" or tts_engine is None:
+    TTS_ENGINE = "pyttsx3"
+    if not _IN_RENDER_WORKER:
+        tts_engine = _init_pyttsx3()
+
+# Every engine initialized in this process; the default engine is always tts_engine
+_engines: Dict[str, object] = {}
+_engines_lock = threading.Lock()
+
+
+def _get_engine(name: str):
+    """Return the handle for an engine, initializing it on first use
+    
+    The default engine is always the module-level tts_engine. Other engines
+    are created side by side on demand (or at startup via VOCALIZE_ENGINES);
+    failures are remembered so a missing dependency is not retried per call.
+    """
+    if name == TTS_ENGINE:
+        return tts_engine
+    with _engines_lock:
+        if name not in _engines:
+            _engines[name] = _ENGINE_INITIALIZERS[name]()
+            if name == "pyttsx3" and _engines[name] is not None:
+                initialize_voice_cache(_engines[name])
+        return _engines[name]
+
+
+def _pyttsx3_engine():
+    """The pyttsx3 engine used for local speech, whether or not it is the default"""
+    return _get_engine("pyttsx3")
+
+
+class SynthesisLimiter:
+    """Bounded synthesis concurrency for one engine, with counters for status reporting"""
+    
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self._semaphore = threading.BoundedSemaphore(self.limit)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+    
+    def __enter__(self):
+        job = _current_job.get()
+        with self._lock:
+            self.waiting += 1
+        try:
+            with _timed("synthesis_queue"):
+                if job is None:
+                    self._semaphore.acquire()
+                else:
+                    while not self._semaphore.acquire(timeout=0.01):
+                        job.check()
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        with self._lock:
+            self.active += 1
+        return self
+    
+    def __exit__(self, *exc_info):
+        with self._lock:
+            self.active -= 1
+        self._semaphore.release()
+
+
+# Synthesis runs concurrently up to each engine's limit; only audio output is exclusive
+_synthesis_limits = {name: SynthesisLimiter(name, limit) for name, limit in SYNTHESIS_CONCURRENCY.items()}
 
 # Voice cache for efficient lookups
 _voice_cache: Dict[str, int] = {}
@@ -201,33 +1019,45 @@ VOICE_EMOTIONS = get_voice_emotions_for_platform()
 
 
 def cleanup_tts_engine():
-    """Cleanup TTS engine on shutdown"""
-    global tts_engine, elevenlabs_client
-    if tts_engine:
+    """Cleanup TTS engines on shutdown"""
+    engines = dict(_engines)
+    engines[TTS_ENGINE] = tts_engine
+    if _pyttsx3_session is not None:
+        _pyttsx3_session.close()
+    for name, engine in engines.items():
+        if not engine:
+            continue
         try:
-            if TTS_ENGINE == "pyttsx3" and hasattr(tts_engine, 'stop'):
-                tts_engine.stop()
-            elif TTS_ENGINE == "gtts":
+            if name == "pyttsx3" and hasattr(engine, 'stop'):
+                engine.stop()
+            elif name == "gtts":
                 pygame.mixer.quit()
-            elif TTS_ENGINE == "elevenlabs":
+            elif name == "elevenlabs":
                 # ElevenLabs client doesn't need explicit cleanup
                 pass
-            logger.info(f"{TTS_ENGINE} engine stopped successfully")
+            logger.info(f"{name} engine stopped successfully")
         except Exception as e:
-            logger.error(f"Error stopping {TTS_ENGINE} engine: {e}")
+            logger.error(f"Error stopping {name} engine: {e}")
 
 
-def initialize_voice_cache():
-    """Initialize voice cache for efficient lookups"""
+def initialize_voice_cache(engine=None):
+    """Initialize voice cache for efficient lookups
+    
+    Builds the pyttsx3 voice cache from the given engine, or from the default
+    engine when pyttsx3 is the configured TTS_ENGINE.
+    """
     global _voice_cache, _available_voices
     
-    if not tts_engine:
+    if engine is None and TTS_ENGINE == "pyttsx3":
+        engine = tts_engine
+    
+    if not engine and not tts_engine:
         logger.warning("TTS engine not available, skipping voice cache initialization")
         return
     
     try:
-        if TTS_ENGINE == "pyttsx3":
-            voices = tts_engine.getProperty('voices')
+        if engine:
+            voices = engine.getProperty('voices')
             if not voices:
                 logger.warning("No voices available on this system")
                 return
@@ -291,12 +1121,73 @@ def _update_emotion_categories_with_available_voices():
             logger.warning(f"No specific voices found for emotion '{emotion}', using fallback")
 
 
-# Register cleanup function
-atexit.register(cleanup_tts_engine)
+# Initialize any additional engines requested for per-call routing
+_startup_engines = EXTRA_ENGINES + (ROUTING_ENGINES if ROUTING_MODE != "fixed" else [])
+
+if not _IN_RENDER_WORKER:
+    # Register cleanup function
+    atexit.register(cleanup_tts_engine)
+    
+    # Initialize voice cache
+    initialize_voice_cache()
+    
+    for _extra_engine in _startup_engines:
+        if _extra_engine in SUPPORTED_ENGINES:
+            _get_engine(_extra_engine)
+        else:
+            logger.warning(f"Unknown engine '{_extra_engine}' in VOCALIZE_ENGINES, ignoring")
+
+
+class WarmStandby:
+    """Initializes the fallback engine in a background thread after startup
+    
+    pyttsx3.init() and voice enumeration are slow, so when a network engine
+    is the default the local fallback is warmed up front (engine, voice cache
+    and emotion table) instead of on the first failover.
+    """
+    
+    def __init__(self, engine_name: str):
+        self.engine_name = engine_name
+        self.state = "cold"
+        self.warm_seconds: Optional[float] = None
+        self._ready = threading.Event()
+    
+    def start(self) -> None:
+        self.state = "warming"
+        threading.Thread(target=self._warm, name=f"standby-{self.engine_name}", daemon=True).start()
+    
+    def _warm(self) -> None:
+        start = time.perf_counter()
+        try:
+            handle = _get_engine(self.engine_name)
+        except Exception as e:
+            logger.error(f"Failed to warm standby engine {self.engine_name}: {e}")
+            handle = None
+        self.warm_seconds = time.perf_counter() - start
+        self.state = "ready" if handle else "failed"
+        logger.info(f"Standby engine {self.engine_name} {self.state} after {self.warm_seconds:.2f}s")
+        self._ready.set()
+    
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warming finishes; returns whether the standby is ready"""
+        self._ready.wait(timeout)
+        return self.ready
+
+
+# Warm the circuit breaker fallback whenever a network engine is in use
+standby_engine: Optional[WarmStandby] = None
+if (not _IN_RENDER_WORKER and FALLBACK_ENGINE in SUPPORTED_ENGINES and FALLBACK_ENGINE != TTS_ENGINE
+        and FALLBACK_ENGINE not in _startup_engines
+        and any(name in NETWORK_ENGINES for name in [TTS_ENGINE] + _startup_engines)):
+    standby_engine = WarmStandby(FALLBACK_ENGINE)
+    standby_engine.start()
 
-# Initialize voice cache
-initialize_voice_cache()
 
+@_traced("find_voice")
 def find_voice_by_emotion_and_name(emotion: str = None, voice_name: str = None) -> int:
     """Find voice index by emotion category or specific voice name using cached lookups"""
     if not _available_voices:
@@ -332,244 +1223,3248 @@ def find_voice_by_emotion_and_name(emotion: str = None, voice_name: str = None)
     return 0  # Default to first voice
 
 
-def validate_speak_input(text: str, rate: int) -> Tuple[bool, str]:
-    """Validate input parameters for speak function"""
-    if not text or not text.strip():
-        return False, "Text cannot be empty"
+@_traced("validate")
+def validate_speak_input(text: str, rate: int) -> Tuple[bool, str]:
+    """Validate input parameters for speak function"""
+    if not text or not text.strip():
+        return False, "Text cannot be empty"
+    
+    if not isinstance(rate, (int, float)):
+        return False, "Rate must be a number"
+    
+    if rate < RATE_CONFIG["min_rate"] or rate > RATE_CONFIG["max_rate"]:
+        return False, f"Rate must be between {RATE_CONFIG['min_rate']} and {RATE_CONFIG['max_rate']} wpm"
+    
+    return True, ""
+
+
+def calculate_emotion_rate(base_rate: int, emotion: str) -> int:
+    """Calculate speaking rate based on emotion using configurable multipliers"""
+    if not emotion or emotion.lower() not in RATE_CONFIG["emotion_multipliers"]:
+        return base_rate
+    
+    multiplier = RATE_CONFIG["emotion_multipliers"][emotion.lower()]
+    adjusted_rate = int(base_rate * multiplier)
+    
+    # Ensure rate stays within bounds
+    return max(RATE_CONFIG["min_rate"], min(RATE_CONFIG["max_rate"], adjusted_rate))
+
+
+# Shared synthesis cache
+class AudioCache:
+    """Synthesized audio cache shared by every server process on the machine
+    
+    Audio lives in segmented append-only pack files rather than one file per
+    clip, and a SQLite index (WAL mode, so readers never block) maps each key
+    to (segment, offset, length). Reads are zero-copy memoryviews over an mmap
+    of the segment. Eviction only drops index rows; compaction rewrites mostly
+    dead segments in the background to reclaim the space.
+    
+    Synthesis is single-flight across threads and processes: the first caller
+    claims the key in an ``inflight`` table, and everyone else waits for the
+    published result instead of issuing a duplicate network request. Claims
+    left behind by dead processes or older than the wait timeout are taken over.
+    """
+    
+    SCHEMA_VERSION = 2
+    
+    def __init__(self, directory: str, max_bytes: int = CACHE_MAX_BYTES, wait_timeout: float = CACHE_WAIT_TIMEOUT,
+                 segment_bytes: int = CACHE_SEGMENT_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.wait_timeout = wait_timeout
+        self.segment_bytes = segment_bytes
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._maps_lock = threading.Lock()
+        self._compacting = False
+        self._local = threading.local()
+        self._flights_lock = threading.Lock()
+        self._flights: Dict[str, threading.Event] = {}
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "shared_waits": 0, "evictions": 0, "compactions": 0}
+    
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+    
+    @staticmethod
+    def make_key(engine: str, text: str, **params) -> str:
+        """Build a cache key from everything that affects the synthesized audio"""
+        material = json.dumps({"engine": engine, "text": text, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._ensure_initialized()
+            conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _ensure_initialized(self) -> None:
+        # Created lazily so merely importing the server never touches the disk
+        with self._init_lock:
+            if self._initialized:
+                return
+            os.makedirs(os.path.join(self.directory, "packs"), exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.directory, "index.sqlite3"), timeout=30, isolation_level=None)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("BEGIN IMMEDIATE")
+                if conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+                    # Older layouts stored one file per clip; start the index afresh and delete
+                    # the clip files, which the size limit would otherwise never see
+                    conn.execute("DROP TABLE IF EXISTS entries")
+                    conn.execute("DROP TABLE IF EXISTS inflight")
+                    conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+                    shutil.rmtree(os.path.join(self.directory, "blobs"), ignore_errors=True)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key TEXT PRIMARY KEY, engine TEXT, segment INTEGER, offset INTEGER, size INTEGER, "
+                    "created REAL, last_access REAL, hits INTEGER DEFAULT 0)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS entries_segment ON entries (segment)")
+                conn.execute("CREATE TABLE IF NOT EXISTS inflight (key TEXT PRIMARY KEY, owner_pid INTEGER, started REAL)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+                conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('active_segment', 1)")
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+            self._initialized = True
+    
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, "packs", f"segment-{segment:06d}.pack")
+    
+    def _map_segment(self, segment: int, min_length: int) -> mmap.mmap:
+        """Return a read-only mapping of a segment covering at least min_length bytes"""
+        with self._maps_lock:
+            mapping = self._maps.get(segment)
+            if mapping is None or len(mapping) < min_length:
+                # Segments only grow by appends, so remap to pick up new clips
+                with open(self._segment_path(segment), "rb") as f:
+                    mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = mapping
+            return mapping
+    
+    @_traced("cache.get")
+    def get(self, key: str) -> Optional[memoryview]:
+        """Return cached audio for key as a zero-copy view of its pack segment, or None"""
+        conn = self._connect()
+        for _ in range(2):
+            row = conn.execute("SELECT segment, offset, size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            segment, offset, size = row
+            try:
+                mapping = self._map_segment(segment, offset + size)
+            except (FileNotFoundError, ValueError):
+                # Segment was compacted away between the lookup and the read; look up again
+                continue
+            conn.execute("UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+            return memoryview(mapping)[offset:offset + size]
+        return None
+    
+    @_traced("cache.put")
+    def put(self, key: str, engine: str, data: bytes) -> None:
+        """Append audio for key to the active pack segment and publish it in the index"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            segment, offset = self._append(conn, data)
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, engine, segment, offset, size, created, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, engine, segment, offset, len(data), now, now),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._evict_if_needed()
+    
+    def _append(self, conn: sqlite3.Connection, data: bytes) -> Tuple[int, int]:
+        """Append data to the active segment; caller holds the index write lock
+        
+        The index write transaction is the cross-process append lock, and the
+        row pointing at the new bytes is committed only after they are flushed,
+        so readers never see a partial clip. Bytes from an append whose commit
+        never happens are simply dead space reclaimed by compaction.
+        """
+        segment = conn.execute("SELECT value FROM meta WHERE name = 'active_segment'").fetchone()[0]
+        path = self._segment_path(segment)
+        if os.path.exists(path) and os.path.getsize(path) + len(data) > self.segment_bytes and os.path.getsize(path) > 0:
+            segment += 1
+            conn.execute("UPDATE meta SET value = ? WHERE name = 'active_segment'", (segment,))
+            path = self._segment_path(segment)
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return segment, offset
+    
+    def _evict_if_needed(self) -> None:
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self._count("evictions")
+        self._schedule_compaction()
+    
+    def _schedule_compaction(self) -> None:
+        """Reclaim evicted space in a background thread"""
+        with self._maps_lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        
+        def run():
+            try:
+                self.compact()
+            except Exception as e:
+                logger.warning(f"Audio cache compaction failed: {e}")
+            finally:
+                self._compacting = False
+        
+        threading.Thread(target=run, name="audio-cache-compaction", daemon=True).start()
+    
+    def compact(self, min_dead_ratio: float = 0.5) -> int:
+        """Rewrite sealed segments that are mostly dead space; returns bytes reclaimed
+        
+        Live clips are copied into the active segment and their index rows
+        repointed in the same transaction, then the old segment is deleted.
+        Readers still holding a mapping of the old file keep working until
+        they drop it.
+        """
+        conn = self._connect()
+        reclaimed = 0
+        active = conn.execute("SELECT value FROM meta WHERE name = 'active_segment'").fetchone()[0]
+        live_by_segment = dict(conn.execute("SELECT segment, SUM(size) FROM entries GROUP BY segment").fetchall())
+        
+        for name in sorted(os.listdir(os.path.join(self.directory, "packs"))):
+            if not (name.startswith("segment-") and name.endswith(".pack")):
+                continue
+            segment = int(name[len("segment-"):-len(".pack")])
+            if segment >= active:
+                continue
+            file_size = os.path.getsize(self._segment_path(segment))
+            live = live_by_segment.get(segment, 0)
+            if file_size == 0 or (file_size - live) / file_size < min_dead_ratio:
+                continue
+            
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute("SELECT key, offset, size FROM entries WHERE segment = ?", (segment,)).fetchall()
+                if rows:
+                    with open(self._segment_path(segment), "rb") as f:
+                        source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    try:
+                        for key, offset, size in rows:
+                            new_segment, new_offset = self._append(conn, source[offset:offset + size])
+                            conn.execute(
+                                "UPDATE entries SET segment = ?, offset = ? WHERE key = ?", (new_segment, new_offset, key)
+                            )
+                    finally:
+                        source.close()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            
+            with self._maps_lock:
+                self._maps.pop(segment, None)
+            try:
+                os.unlink(self._segment_path(segment))
+            except OSError as e:
+                # Windows refuses to delete a file another process has mapped; retry next time
+                logger.debug(f"Could not remove compacted segment {segment}: {e}")
+                continue
+            reclaimed += file_size - live
+            self._count("compactions")
+        return reclaimed
+    
+    def _try_claim(self, key: str) -> bool:
+        """Claim the right to synthesize key; False if another live process holds it"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner_pid, started FROM inflight WHERE key = ?", (key,)).fetchone()
+            if row is not None and not self._claim_is_stale(*row):
+                conn.execute("COMMIT")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO inflight (key, owner_pid, started) VALUES (?, ?, ?)",
+                (key, os.getpid(), time.time()),
+            )
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def _claim_is_stale(self, owner_pid: int, started: float) -> bool:
+        if time.time() - started > self.wait_timeout:
+            return True
+        if os.name == "posix" and owner_pid != os.getpid():
+            try:
+                os.kill(owner_pid, 0)
+            except ProcessLookupError:
+                return True
+            except PermissionError:
+                pass
+        return False
+    
+    def _release_claim(self, key: str) -> None:
+        self._connect().execute("DELETE FROM inflight WHERE key = ? AND owner_pid = ?", (key, os.getpid()))
+    
+    def _wait_for_other_process(self, key: str) -> Optional[bytes]:
+        """Wait for another process's in-flight synthesis; None if it gave up"""
+        conn = self._connect()
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            data = self.get(key)
+            if data is not None:
+                return data
+            if conn.execute("SELECT 1 FROM inflight WHERE key = ?", (key,)).fetchone() is None:
+                return self.get(key)
+            _wait_unless_cancelled(None, 0.05)
+        return None
+    
+    def get_or_create(self, key: str, engine: str, create: Callable[[], bytes]) -> Tuple[bytes, bool]:
+        """Return (audio, was_cached), synthesizing at most once across threads and processes"""
+        while True:
+            with self._flights_lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = threading.Event()
+            
+            if not leader:
+                # Another thread in this process is already on it
+                self._count("shared_waits")
+                _wait_unless_cancelled(flight, self.wait_timeout)
+                data = self.get(key)
+                if data is not None:
+                    self._count("hits")
+                    return data, True
+                continue
+            
+            try:
+                data = self.get(key)
+                if data is not None:
+                    self._count("hits")
+                    return data, True
+                
+                while not self._try_claim(key):
+                    self._count("shared_waits")
+                    data = self._wait_for_other_process(key)
+                    if data is not None:
+                        self._count("hits")
+                        return data, True
+                
+                try:
+                    self._count("misses")
+                    data = create()
+                    self.put(key, engine, data)
+                    return data, False
+                finally:
+                    self._release_claim(key)
+            finally:
+                with self._flights_lock:
+                    del self._flights[key]
+                flight.set()
+    
+    def unused(self, keys: List[str]) -> set:
+        """The subset of keys that are cached but have never been read"""
+        if not keys:
+            return set()
+        conn = self._connect()
+        placeholders = ",".join("?" * len(keys))
+        rows = conn.execute(f"SELECT key FROM entries WHERE hits = 0 AND key IN ({placeholders})", keys).fetchall()
+        return {row[0] for row in rows}
+    
+    def discard(self, keys: List[str]) -> int:
+        """Drop entries that have never been read; returns how many were dropped"""
+        conn = self._connect()
+        dropped = 0
+        for key in keys:
+            dropped += conn.execute("DELETE FROM entries WHERE key = ? AND hits = 0", (key,)).rowcount
+        if dropped:
+            self._schedule_compaction()
+        return dropped
+    
+    def summary(self) -> Dict[str, int]:
+        """Entry count, live size and on-disk pack size of the shared cache"""
+        if not self._initialized and not os.path.exists(os.path.join(self.directory, "index.sqlite3")):
+            return {"entries": 0, "bytes": 0, "segments": 0, "pack_bytes": 0}
+        entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        packs = [name for name in os.listdir(os.path.join(self.directory, "packs")) if name.endswith(".pack")]
+        pack_bytes = sum(os.path.getsize(os.path.join(self.directory, "packs", name)) for name in packs)
+        return {"entries": entries, "bytes": size, "segments": len(packs), "pack_bytes": pack_bytes}
+
+
+audio_cache = AudioCache(CACHE_DIR) if CACHE_ENABLED else None
+
+
+# Cache entries created while a prefetch runs, as (key, size), so they can be expired if never played
+_cache_writes: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("vocalize_cache_writes", default=None)
+
+
+def _note_cache_write(key: str, audio_data: bytes, cached: bool) -> None:
+    writes = _cache_writes.get()
+    if writes is not None and not cached:
+        writes.append((key, len(audio_data)))
+
+
+def _cached_synthesis(engine: str, text: str, create: Callable[[], bytes], **params) -> Tuple[bytes, bool]:
+    """Synthesize through the shared cache when enabled; returns (audio, was_cached)"""
+    if audio_cache is None:
+        return create(), False
+    try:
+        key = AudioCache.make_key(engine, text, **params)
+        audio_data, cached = audio_cache.get_or_create(key, engine, create)
+    except sqlite3.Error as e:
+        logger.warning(f"Audio cache unavailable ({e}), synthesizing directly")
+        return create(), False
+    _note_cache_write(key, audio_data, cached)
+    _record_normalized_lookup(engine, text, cached, params)
+    return audio_data, cached
+
+
+# Output sinks
+class AudioSink:
+    """Destination for played audio; every engine's playback ends in one sink"""
+    
+    name = "sink"
+    # Only the device sink lets pyttsx3 speak straight to the sound card
+    is_device = False
+    
+    def __init__(self):
+        self.played = 0
+    
+    def play(self, audio_data: bytes, audio_format: str) -> None:
+        raise NotImplementedError
+    
+    def enqueue(self, audio_data: bytes, audio_format: str) -> threading.Event:
+        """Start playing a clip, returning an event that is set once it has finished
+        
+        Sinks that can hold the next clip while one is still playing override
+        this; the rest play synchronously.
+        """
+        job = _current_job.get()
+        if job is not None:
+            job.state = "playing"
+        self.play(audio_data, audio_format)
+        finished = threading.Event()
+        finished.set()
+        return finished
+    
+    def drain(self) -> None:
+        """Wait until every enqueued clip has finished"""
+    
+    def cancel(self, finished: threading.Event) -> None:
+        """Stop or drop the clip whose enqueue() returned finished, setting it"""
+    
+    def describe(self) -> str:
+        return self.name
+
+
+class DeviceSink(AudioSink):
+    """Plays on this process's audio device through pygame"""
+    
+    name = "device"
+    is_device = True
+    
+    def __init__(self):
+        super().__init__()
+        self._player = None
+    
+    def play(self, audio_data: bytes, audio_format: str) -> None:
+        if GAPLESS_PLAYBACK:
+            self.enqueue(audio_data, audio_format).wait()
+            return
+        _play_audio_locally(audio_data, audio_format)
+        self.played += 1
+    
+    def enqueue(self, audio_data: bytes, audio_format: str) -> threading.Event:
+        if not GAPLESS_PLAYBACK:
+            return super().enqueue(audio_data, audio_format)
+        if self._player is None:
+            self._player = GaplessPlayer()
+        finished = self._player.enqueue(audio_data, audio_format)
+        self.played += 1
+        return finished
+    
+    def drain(self) -> None:
+        if self._player is not None:
+            self._player.drain()
+    
+    def cancel(self, finished: threading.Event) -> None:
+        if self._player is not None:
+            self._player.cancel(finished)
+    
+    def describe(self) -> str:
+        if self._player is None:
+            return self.name
+        gap = "n/a" if self._player.last_gap is None else f"{self._player.last_gap * 1000:.0f} ms"
+        return f"device (gapless, {self._player.handoffs} queued handoffs, last gap {gap})"
+
+
+class WavFileSink(AudioSink):
+    """Writes each clip to the next numbered WAV file in a directory"""
+    
+    name = "wav"
+    
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.last_path: Optional[str] = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Continue numbering after clips left by earlier runs
+        numbers = [int(name[:-4]) for name in os.listdir(directory) if name.endswith(".wav") and name[:-4].isdigit()]
+        self._next = max(numbers, default=0) + 1
+    
+    def play(self, audio_data: bytes, audio_format: str) -> None:
+        if audio_format == "wav":
+            data = bytes(audio_data)
+        else:
+            data = _pcm_to_wav(*_decode_pcm(audio_data, audio_format))
+        with self._lock:
+            path = os.path.join(self.directory, f"{self._next:05d}.wav")
+            self._next += 1
+            self.played += 1
+        with open(path, 'wb') as f:
+            f.write(data)
+        self.last_path = path
+    
+    def describe(self) -> str:
+        return f"wav → {self.directory} ({self.played} clips)"
+
+
+class PcmStreamSink(AudioSink):
+    """Streams raw signed 16-bit PCM to a FIFO or Unix socket
+    
+    Every clip is decoded to the pygame mixer's format (44100 Hz stereo by
+    default) so the stream stays uniform across engines, e.g. for piping
+    into `aplay -f S16_LE -r 44100 -c 2` or a recorder.
+    """
+    
+    name = "pcm"
+    
+    def __init__(self, target: str):
+        super().__init__()
+        self.target = target
+        self.format: Optional[Tuple[int, int]] = None
+        self._stream = None
+    
+    def _open(self):
+        if stat.S_ISSOCK(os.stat(self.target).st_mode):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.target)
+            return sock.makefile('wb')
+        # Opening a FIFO for writing blocks until a reader attaches
+        return open(self.target, 'wb')
+    
+    def play(self, audio_data: bytes, audio_format: str) -> None:
+        frames, sample_rate, channels = _decode_pcm(audio_data, audio_format, normalize=True)
+        self.format = (sample_rate, channels)
+        for attempt in range(2):
+            try:
+                if self._stream is None:
+                    self._stream = self._open()
+                self._stream.write(frames)
+                self._stream.flush()
+                break
+            except (BrokenPipeError, ConnectionError):
+                # The reader went away; reconnect once for the next reader
+                self._stream = None
+                if attempt:
+                    raise
+        self.played += 1
+    
+    def describe(self) -> str:
+        fmt = f", s16le {self.format[0]} Hz {self.format[1]} ch" if self.format else ""
+        return f"pcm → {self.target} ({self.played} clips{fmt})"
+
+
+class NullSink(AudioSink):
+    """Discards audio, either instantly or after its real playback duration"""
+    
+    name = "null"
+    
+    def __init__(self, realtime: bool = False):
+        super().__init__()
+        self.realtime = realtime
+    
+    def play(self, audio_data: bytes, audio_format: str) -> None:
+        if self.realtime:
+            job = _current_job.get()
+            duration = _audio_duration(audio_data, audio_format)
+            if job is not None:
+                job.wait(duration)
+            else:
+                time.sleep(duration)
+        self.played += 1
+    
+    def describe(self) -> str:
+        return f"null ({'realtime' if self.realtime else 'instant'}, {self.played} clips)"
+
+
+def _create_sink(spec: str) -> AudioSink:
+    """Build the sink named by VOCALIZE_SINK"""
+    kind, _, target = spec.partition(":")
+    kind = kind.lower()
+    if kind == "null":
+        return NullSink(realtime=target.lower() == "realtime")
+    if kind == "wav" and target:
+        return WavFileSink(os.path.expanduser(target))
+    if kind == "pcm" and target:
+        return PcmStreamSink(os.path.expanduser(target))
+    if kind != "device":
+        logger.warning(f"Unknown output sink '{spec}', using the audio device")
+    return DeviceSink()
+
+
+def _decode_pcm(audio_data: bytes, audio_format: str, normalize: bool = False) -> Tuple[bytes, int, int]:
+    """Decode audio to signed 16-bit PCM; returns (frames, sample rate, channels)
+    
+    16-bit WAV is read directly unless normalize asks for the mixer's format;
+    everything else is decoded with pygame.
+    """
+    if audio_format == "wav" and not normalize:
+        with wave.open(io.BytesIO(bytes(audio_data)), 'rb') as wav:
+            if wav.getsampwidth() == 2:
+                return wav.readframes(wav.getnframes()), wav.getframerate(), wav.getnchannels()
+    if not GTTS_AVAILABLE:
+        raise RuntimeError(f"pygame is required to decode {audio_format} audio")
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    sample_rate, _, channels = pygame.mixer.get_init()
+    sound = pygame.mixer.Sound(file=io.BytesIO(bytes(audio_data)))
+    return sound.get_raw(), sample_rate, channels
+
+
+def _pcm_to_wav(frames: bytes, sample_rate: int, channels: int) -> bytes:
+    """Wrap signed 16-bit PCM frames in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+
+# Layer III bitrates in kbps by index, for MPEG-1 and MPEG-2/2.5
+_MP3_BITRATES = {
+    "v1": (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    "v2": (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+
+def _audio_duration(audio_data: bytes, audio_format: str) -> float:
+    """Playback length in seconds, without decoding where the header is enough
+    
+    WAV length comes from its header. MP3 length is estimated from the first
+    frame's bitrate, which is exact for the constant-bitrate MP3 that gTTS
+    and ElevenLabs return.
+    """
+    data = bytes(audio_data)
+    if audio_format == "wav":
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            return wav.getnframes() / float(wav.getframerate())
+    if audio_format == "mp3":
+        offset = 0
+        if data[:3] == b"ID3" and len(data) >= 10:
+            # Skip the ID3v2 tag; its size is a 28-bit synchsafe integer
+            offset = 10 + ((data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9])
+        while offset + 3 < len(data):
+            if data[offset] == 0xFF and data[offset + 1] & 0xE0 == 0xE0:
+                version = (data[offset + 1] >> 3) & 0x03
+                bitrate_index = data[offset + 2] >> 4
+                if 0 < bitrate_index < 15:
+                    table = _MP3_BITRATES["v1" if version == 3 else "v2"]
+                    return (len(data) - offset) * 8 / (table[bitrate_index] * 1000)
+            offset += 1
+        return 0.0
+    if GTTS_AVAILABLE:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        return pygame.mixer.Sound(file=io.BytesIO(data)).get_length()
+    return 0.0
+
+
+output_sink = NullSink() if _IN_RENDER_WORKER else _create_sink(OUTPUT_SINK)
+
+
+# Silence trimming
+def _trim_silence(audio_data: bytes, audio_format: str, threshold_db: int = None, pad_ms: int = None) -> bytes:
+    """Cut leading and trailing silence, returning 16-bit WAV
+    
+    The clip is decoded to PCM, mixed down to mono for level detection and
+    split into 10 ms frames whose RMS is computed in one vectorized pass.
+    Everything before the first and after the last frame above the
+    threshold is dropped, keeping pad_ms at each end. Clips with no frame
+    above the threshold are returned whole.
+    """
+    threshold_db = TRIM_THRESHOLD_DB if threshold_db is None else threshold_db
+    pad_ms = TRIM_PAD_MS if pad_ms is None else pad_ms
+    frames, sample_rate, channels = _decode_pcm(audio_data, audio_format)
+    
+    samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    frame_length = max(1, sample_rate // 100)
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return _pcm_to_wav(frames, sample_rate, channels)
+    
+    windows = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = np.sqrt(np.mean(windows * windows, axis=1))
+    loud = np.flatnonzero(rms > 10 ** (threshold_db / 20))
+    if loud.size == 0:
+        return _pcm_to_wav(frames, sample_rate, channels)
+    
+    pad = sample_rate * pad_ms // 1000
+    start = max(0, int(loud[0]) * frame_length - pad)
+    end = min(len(samples), (int(loud[-1]) + 1) * frame_length + pad)
+    bytes_per_sample = 2 * channels
+    return _pcm_to_wav(frames[start * bytes_per_sample:end * bytes_per_sample], sample_rate, channels)
+
+
+def _cached_postprocess(kind: str, result: "SynthesisResult", create: Callable[[], bytes], **params) -> bytes:
+    """Post-process synthesized audio through the shared cache, keyed by the source audio"""
+    if audio_cache is None:
+        return create()
+    key = AudioCache.make_key(kind, hashlib.sha256(bytes(result.audio)).hexdigest(), **params)
+    audio_data, cached = audio_cache.get_or_create(key, kind, create)
+    _note_cache_write(key, audio_data, cached)
+    return audio_data
+
+
+def _trim_result(result: "SynthesisResult") -> "SynthesisResult":
+    """Apply silence trimming to a synthesis result, caching the trimmed audio"""
+    if not TRIM_SILENCE or not NUMPY_AVAILABLE:
+        return result
+    
+    trimmed = _cached_postprocess(
+        "trim", result, lambda: _trim_silence(result.audio, result.audio_format),
+        threshold_db=TRIM_THRESHOLD_DB, pad_ms=TRIM_PAD_MS,
+    )
+    trimmed_ms = max(0.0, (_audio_duration(result.audio, result.audio_format) - _audio_duration(trimmed, "wav")) * 1000)
+    details = result.details + [f"trimmed: {trimmed_ms:.0f} ms"]
+    return SynthesisResult(trimmed, "wav", details, result.cached)
+
+
+# Time-stretching
+def _phase_vocoder(signal: "np.ndarray", speed: float, n_fft: int = 2048) -> "np.ndarray":
+    """Change the duration of a mono signal by 1/speed without changing its pitch
+    
+    Every step is vectorized: the STFT is taken over a strided view of all
+    frames at once, magnitudes are interpolated at the new frame positions,
+    phases are advanced with a cumulative sum of each bin's measured
+    frequency, and the frames are overlap-added with a single bincount.
+    """
+    hop = n_fft // 4
+    window = np.hanning(n_fft)
+    padded = np.pad(signal, (n_fft, n_fft))
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop] * window
+    spectrum = np.fft.rfft(frames, axis=1)
+    
+    steps = np.arange(0, len(spectrum) - 1, speed)
+    base = steps.astype(int)
+    weight = (steps - base)[:, None]
+    magnitude = (1 - weight) * np.abs(spectrum[base]) + weight * np.abs(spectrum[base + 1])
+    
+    # Expected phase advance per hop for each bin, corrected by the measured deviation
+    expected = 2 * np.pi * hop * np.arange(spectrum.shape[1]) / n_fft
+    phase = np.angle(spectrum)
+    deviation = phase[base + 1] - phase[base] - expected
+    deviation -= 2 * np.pi * np.round(deviation / (2 * np.pi))
+    advance = np.cumsum(expected + deviation, axis=0)
+    phases = phase[0] + np.vstack([np.zeros((1, advance.shape[1])), advance[:-1]])
+    
+    # Identity phase locking: bins around each spectral peak keep their measured phase
+    # offset from the peak, so one partial's bins don't drift apart and cancel out
+    bins = np.arange(magnitude.shape[1])
+    is_peak = np.ones(magnitude.shape, dtype=bool)
+    is_peak[:, 1:] &= magnitude[:, 1:] > magnitude[:, :-1]
+    is_peak[:, :-1] &= magnitude[:, :-1] >= magnitude[:, 1:]
+    previous_peak = np.maximum.accumulate(np.where(is_peak, bins, 0), axis=1)
+    next_peak = np.minimum.accumulate(np.where(is_peak, bins, bins[-1])[:, ::-1], axis=1)[:, ::-1]
+    peak = np.where(bins - previous_peak <= next_peak - bins, previous_peak, next_peak)
+    analysis_phase = phase[base]
+    phases = (np.take_along_axis(phases, peak, axis=1) + analysis_phase
+              - np.take_along_axis(analysis_phase, peak, axis=1))
+    
+    output_frames = np.fft.irfft(magnitude * np.exp(1j * phases), n=n_fft, axis=1) * window
+    positions = (np.arange(len(output_frames)) * hop)[:, None] + np.arange(n_fft)
+    length = hop * (len(output_frames) - 1) + n_fft
+    output = np.bincount(positions.ravel(), weights=output_frames.ravel(), minlength=length)
+    overlap = np.bincount(positions.ravel(), weights=np.broadcast_to(window ** 2, output_frames.shape).ravel(),
+                          minlength=length)
+    output /= np.maximum(overlap, 1e-3)
+    return output[n_fft:n_fft + int(round(len(signal) / speed))]
+
+
+def _time_stretch(audio_data: bytes, audio_format: str, speed: float) -> bytes:
+    """Speed audio up (speed > 1) or slow it down while preserving pitch, returning 16-bit WAV"""
+    frames, sample_rate, channels = _decode_pcm(audio_data, audio_format)
+    samples = np.frombuffer(frames, dtype="<i2").astype(np.float64) / 32768.0
+    samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+    stretched = np.stack([_phase_vocoder(samples[:, channel], speed) for channel in range(channels)], axis=1)
+    pcm = np.clip(np.round(stretched * 32768.0), -32768, 32767).astype("<i2")
+    return _pcm_to_wav(pcm.tobytes(), sample_rate, channels)
+
+
+def _stretch_speed(rate: int, emotion: str) -> float:
+    """Playback speed for a speaking rate, rounded to TIME_STRETCH_STEP so variants can be cached"""
+    speed = calculate_emotion_rate(rate, emotion) / RATE_CONFIG["default_rate"]
+    step = TIME_STRETCH_STEP if TIME_STRETCH_STEP > 0 else 0.01
+    return round(round(speed / step) * step, 2)
+
+
+def _stretch_result(engine_name: str, result: "SynthesisResult", rate: int, emotion: str) -> "SynthesisResult":
+    """Apply the speaking rate to engines that can't control it, caching each speed variant
+    
+    pyttsx3 sets its rate natively; network engines return audio at a fixed
+    rate, so it is time-stretched to rate / default_rate instead.
+    """
+    if engine_name not in NETWORK_ENGINES or not TIME_STRETCH or not NUMPY_AVAILABLE:
+        return result
+    speed = _stretch_speed(rate, emotion)
+    if speed == 1.0:
+        return result
+    
+    stretched = _cached_postprocess(
+        "stretch", result, lambda: _time_stretch(result.audio, result.audio_format, speed), speed=speed,
+    )
+    return SynthesisResult(stretched, "wav", result.details + [f"speed: {speed:.2f}x"], result.cached)
+
+
+# Audio playback
+def _play_audio(audio_data: bytes, audio_format: str, label: str = "") -> None:
+    """Play synthesized audio, via the shared playback daemon when one is configured
+    
+    Holds the exclusive audio output lock, so clips from concurrent calls play
+    one after another in the order they became ready. Without a daemon the
+    audio goes to this process's output sink. Cancelling the current job
+    takes it out of the queue or stops its clip, raising SpeechCancelled.
+    """
+    job = _current_job.get()
+    if job is not None:
+        job.check()
+        job.state = "queued"
+    span_attributes = {"vocalize.audio_format": audio_format, "vocalize.audio_bytes": len(audio_data),
+                       "vocalize.sink": "daemon" if _playback_daemon_enabled() else output_sink.name}
+    with _span("playback", span_attributes) as span:
+        queued_at = time.perf_counter()
+        with audio_output_lock:
+            span.set("vocalize.queue_ms", round((time.perf_counter() - queued_at) * 1000, 1))
+            if _playback_daemon_enabled():
+                if job is not None:
+                    job.state = "playing"
+                try:
+                    _send_to_playback_daemon(audio_data, audio_format, label)
+                    if job is not None:
+                        job.timing.mark("played")
+                    return
+                except (OSError, RuntimeError) as e:
+                    logger.warning(f"Playback daemon unavailable ({e}), playing locally")
+            # Only handing the clip over is exclusive: the next caller can queue its clip
+            # while this one plays, which is what makes back-to-back playback gapless
+            finished = output_sink.enqueue(audio_data, audio_format)
+        
+        if job is None:
+            finished.wait()
+            return
+        unregister = job.on_cancel(lambda: output_sink.cancel(finished))
+        try:
+            finished.wait()
+        finally:
+            unregister()
+        job.check()
+        job.timing.mark("played")
+
+
+def _play_audio_locally(audio_data: bytes, audio_format: str) -> None:
+    """Play encoded audio on this process's pygame mixer and wait for it to finish"""
+    if not GTTS_AVAILABLE:
+        raise RuntimeError("pygame is required for local audio playback")
+    
+    # Initialize pygame mixer if not already done
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    
+    with _span("mixer.load", {"vocalize.audio_format": audio_format, "vocalize.audio_bytes": len(audio_data)}):
+        pygame.mixer.music.load(io.BytesIO(audio_data), audio_format)
+    pygame.mixer.music.play()
+    
+    # Wait for playback to complete, stopping straight away if the job is cancelled
+    job = _current_job.get()
+    while pygame.mixer.music.get_busy():
+        if job is None:
+            pygame.time.wait(100)
+        elif job.wait(0.1):
+            pygame.mixer.music.stop()
+            break
+    pygame.mixer.music.unload()
+
+
+class GaplessPlayer:
+    """Plays pre-decoded clips back to back on one reserved mixer channel
+    
+    Each clip is decoded into a Sound when it is handed over, while the
+    previous clip is still playing, and queued behind it on the channel so
+    the mixer switches to it within the same audio callback. pygame only
+    delivers end-of-track events through the display's event queue, which a
+    headless server doesn't have, so the player thread sleeps until each
+    clip's known end instead of polling, then confirms the mixer moved on.
+    New and cancelled clips wake it early.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = collections.deque()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+        self._current = None
+        self._following = None
+        self.handoffs = 0  # Clips the mixer started on its own, queued behind the previous one
+        self.last_gap = None  # Seconds of silence before the last clip that was waiting to play
+    
+    def enqueue(self, audio_data: bytes, audio_format: str) -> threading.Event:
+        """Decode a clip and queue it, returning an event set once it has played"""
+        if not GTTS_AVAILABLE:
+            raise RuntimeError("pygame is required for local audio playback")
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        with _span("mixer.load", {"vocalize.audio_format": audio_format, "vocalize.audio_bytes": len(audio_data)}):
+            sound = pygame.mixer.Sound(file=io.BytesIO(bytes(audio_data)))
+        clip = {"sound": sound, "length": sound.get_length(), "queued_at": time.monotonic(),
+                "finished": threading.Event(), "cancelled": False, "job": _current_job.get()}
+        with self._cond:
+            self._pending.append(clip)
+            self._idle.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="gapless-player", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return clip["finished"]
+    
+    def drain(self) -> None:
+        """Wait until every queued clip has played"""
+        self._idle.wait()
+    
+    def cancel(self, finished: threading.Event) -> None:
+        """Drop a waiting clip, or stop it if it is playing"""
+        with self._cond:
+            for clip in self._pending:
+                if clip["finished"] is finished:
+                    self._pending.remove(clip)
+                    finished.set()
+                    return
+            for clip in (self._current, self._following):
+                if clip is not None and clip["finished"] is finished:
+                    clip["cancelled"] = True
+                    if clip is self._following:
+                        # Can't be taken off the channel; it is stopped when the mixer reaches it
+                        finished.set()
+                    self._cond.notify()
+    
+    @staticmethod
+    def _mark_playing(clip: dict) -> None:
+        if clip["job"] is not None:
+            clip["job"].state = "playing"
+    
+    def _run(self) -> None:
+        pygame.mixer.set_reserved(1)
+        channel = pygame.mixer.Channel(0)
+        previous_end = None
+        while True:
+            with self._cond:
+                if self._current is None:
+                    while not self._pending:
+                        self._idle.set()
+                        self._cond.wait()
+                    self._current = self._pending.popleft()
+                    self._current["start"] = time.monotonic()
+                    channel.play(self._current["sound"])
+                    self._mark_playing(self._current)
+                    if previous_end is not None and self._current["queued_at"] <= previous_end:
+                        self.last_gap = self._current["start"] - previous_end
+                current = self._current
+                if current["cancelled"]:
+                    # Stopping the channel drops its queued clip too, so put that back in line
+                    channel.stop()
+                    current["finished"].set()
+                    following, self._current, self._following = self._following, None, None
+                    if following is not None and not following["cancelled"]:
+                        self._pending.appendleft(following)
+                    previous_end = None
+                    continue
+                if self._following is None and self._pending:
+                    self._following = self._pending.popleft()
+                    channel.queue(self._following["sound"])
+                remaining = current["start"] + current["length"] - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(timeout=remaining)
+                    continue
+                following = self._following
+                due = current["start"] + current["length"]
+            
+            deadline = time.monotonic() + 1.0
+            while time.monotonic() < deadline and channel.get_busy() and (
+                    channel.get_queue() is not None if following else True):
+                time.sleep(0.002)
+            # With a clip queued behind it, this is when the mixer was seen starting that clip
+            previous_end = time.monotonic()
+            
+            with self._cond:
+                current["finished"].set()
+                self._current, self._following = None, None
+                if following is None:
+                    continue
+                if following["cancelled"]:
+                    channel.stop()
+                    continue
+                # The mixer already started it when the current clip ran out; any delay past
+                # the current clip's end is silence between the two
+                following["start"] = previous_end
+                self._current = following
+                self._mark_playing(following)
+                self.handoffs += 1
+                self.last_gap = max(0.0, previous_end - due)
+
+
+def _playback_daemon_enabled() -> bool:
+    """Check whether audio should be handed to the shared playback daemon"""
+    return bool(PLAYBACK_SOCKET) and hasattr(socket, "AF_UNIX")
+
+
+def _daemon_request(header: dict, payload: bytes = b"", timeout: float = None) -> dict:
+    """Send one request to the playback daemon and return its JSON reply
+    
+    Wire format: a JSON header line (with the payload length), the raw payload,
+    then a single JSON reply line once the request has been handled.
+    """
+    header = dict(header, length=len(payload))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(PLAYBACK_SOCKET)
+        sock.sendall(json.dumps(header).encode() + b"\n")
+        if payload:
+            sock.sendall(payload)
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise RuntimeError("playback daemon closed the connection")
+    return json.loads(line)
+
+
+def _start_playback_daemon() -> None:
+    """Spawn a detached playback daemon and wait briefly for its socket"""
+    logger.info(f"Starting playback daemon on {PLAYBACK_SOCKET}")
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--playback-daemon", "--socket", PLAYBACK_SOCKET],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            _daemon_request({"op": "ping"}, timeout=1)
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("playback daemon did not start")
+
+
+def _send_to_playback_daemon(audio_data: bytes, audio_format: str, label: str = "") -> None:
+    """Queue audio on the shared playback daemon and block until it has been played"""
+    header = {"op": "play", "format": audio_format, "pid": os.getpid(), "label": label[:50]}
+    job = _current_job.get()
+    unregister = None
+    if job is not None:
+        header["job"] = f"{os.getpid()}:{job.id}"
+        unregister = job.on_cancel(lambda: _daemon_request({"op": "cancel", "job": header["job"]}, timeout=1))
+    try:
+        try:
+            reply = _daemon_request(header, audio_data)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not PLAYBACK_DAEMON_AUTOSTART:
+                raise
+            _start_playback_daemon()
+            reply = _daemon_request(header, audio_data)
+    finally:
+        if unregister is not None:
+            unregister()
+    
+    if reply.get("status") == "cancelled" and job is not None:
+        job.check()
+    if reply.get("status") != "done":
+        raise RuntimeError(reply.get("error", "playback failed"))
+
+
+class PlaybackDaemon:
+    """Owns the audio device and plays audio from every local server process in order
+    
+    Each vocalize-mcp process connects over a Unix socket and hands over
+    synthesized audio instead of initializing its own mixer. Requests are
+    appended to one global queue and played strictly one at a time, so
+    concurrent agents never talk over each other.
+    """
+    
+    def __init__(self, socket_path: str, play=None):
+        self.socket_path = socket_path
+        # The default hands clips to the sink without waiting, so the next one can be queued gaplessly
+        self._play = play or (lambda audio_data, audio_format: output_sink.enqueue(audio_data, audio_format))
+        self._queue = queue.Queue()
+        self._finishing = queue.Queue()
+        self._jobs: Dict[str, dict] = {}
+        self._jobs_lock = threading.Lock()
+        self._server = None
+        self._stopped = threading.Event()
+        self.played = 0
+    
+    def start(self) -> None:
+        """Bind the socket and start the player thread"""
+        if os.path.exists(self.socket_path):
+            # Refuse to steal the socket from a live daemon, clean up after a dead one
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                raise RuntimeError(f"playback daemon already running on {self.socket_path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.socket_path)
+            finally:
+                probe.close()
+        
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        self._server.listen(64)
+        threading.Thread(target=self._player_loop, name="playback-daemon-player", daemon=True).start()
+        threading.Thread(target=self._finish_loop, name="playback-daemon-finisher", daemon=True).start()
+        logger.info(f"Playback daemon listening on {self.socket_path}")
+    
+    def serve_forever(self) -> None:
+        """Accept client connections until stopped"""
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+    
+    def stop(self) -> None:
+        """Stop accepting requests and remove the socket"""
+        self._stopped.set()
+        self._queue.put(None)
+        if self._server:
+            self._server.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+    
+    def cancel(self, job_id: str) -> bool:
+        """Skip a queued clip or stop a playing one for a client whose call was cancelled"""
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job["cancelled"] = True
+            finished = job["finished"]
+        if isinstance(finished, threading.Event):
+            output_sink.cancel(finished)
+        return True
+    
+    def _handle_connection(self, conn) -> None:
+        with conn, conn.makefile("rb") as reader:
+            try:
+                header = json.loads(reader.readline())
+                payload = reader.read(header.get("length", 0))
+                op = header.get("op")
+                
+                if op == "ping":
+                    reply = {"status": "ok"}
+                elif op == "status":
+                    reply = {"status": "ok", "queue_depth": self._queue.qsize(), "played": self.played}
+                elif op == "play":
+                    done = threading.Event()
+                    job = {"data": payload, "format": header.get("format", "mp3"), "done": done, "error": None,
+                           "id": header.get("job"), "cancelled": False, "finished": None}
+                    if job["id"]:
+                        with self._jobs_lock:
+                            self._jobs[job["id"]] = job
+                    self._queue.put(job)
+                    done.wait()
+                    if job["id"]:
+                        with self._jobs_lock:
+                            self._jobs.pop(job["id"], None)
+                    if job["cancelled"]:
+                        reply = {"status": "cancelled"}
+                    elif job["error"] is None:
+                        reply = {"status": "done"}
+                    else:
+                        reply = {"status": "error", "error": job["error"]}
+                elif op == "cancel":
+                    reply = {"status": "ok", "cancelled": self.cancel(header.get("job"))}
+                else:
+                    reply = {"status": "error", "error": f"unknown op: {op}"}
+            except Exception as e:
+                reply = {"status": "error", "error": str(e)}
+            
+            try:
+                conn.sendall(json.dumps(reply).encode() + b"\n")
+            except OSError:
+                pass  # Client went away while waiting
+    
+    def _player_loop(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._finishing.put(None)
+                return
+            if job["cancelled"]:
+                job["done"].set()
+                continue
+            try:
+                finished = self._play(job["data"], job["format"])
+            except Exception as e:
+                logger.error(f"Playback daemon error: {e}")
+                job["error"] = str(e)
+                finished = None
+            with self._jobs_lock:
+                job["finished"] = finished
+                cancelled = job["cancelled"]
+            if cancelled and isinstance(finished, threading.Event):
+                output_sink.cancel(finished)
+            self._finishing.put((job, finished))
+    
+    def _finish_loop(self) -> None:
+        # Jobs complete in play order; a play function may return an event set when its clip ends
+        while True:
+            item = self._finishing.get()
+            if item is None:
+                return
+            job, finished = item
+            if isinstance(finished, threading.Event):
+                finished.wait()
+            if job["error"] is None and not job["cancelled"]:
+                self.played += 1
+            job["done"].set()
+
+
+def run_playback_daemon(socket_path: str) -> None:
+    """Run the shared playback daemon in the foreground"""
+    if not GTTS_AVAILABLE:
+        raise RuntimeError("pygame is required for the playback daemon")
+    import signal
+    
+    pygame.mixer.init()
+    daemon = PlaybackDaemon(socket_path)
+    daemon.start()
+    # Exit through the finally block on SIGTERM so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        daemon.serve_forever()
+    finally:
+        daemon.stop()
+        pygame.mixer.quit()
+
+
+# Circuit breakers for network engines
+class CircuitOpenError(Exception):
+    """Raised instead of calling an engine whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker guarding one network engine
+    
+    After failure_threshold consecutive failures the breaker opens and calls
+    fail immediately instead of waiting for another HTTP timeout. A
+    background thread then probes the service every reset_timeout seconds
+    (half-open while probing) and closes the breaker once a probe succeeds.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+    
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0,
+                 probe: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.probe = probe
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.fallbacks = 0
+    
+    def allow(self) -> bool:
+        """Whether a real request may be sent to the engine right now"""
+        return self.state == self.CLOSED
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state != self.CLOSED or self.failures < self.failure_threshold:
+                return
+            self.state = self.OPEN
+            self.trips += 1
+        logger.warning(f"{self.name} circuit opened after {self.failures} consecutive failures")
+        threading.Thread(target=self._probe_until_recovered, name=f"breaker-{self.name}", daemon=True).start()
+    
+    def note_fallback(self) -> None:
+        with self._lock:
+            self.fallbacks += 1
+    
+    def _probe_until_recovered(self) -> None:
+        while True:
+            time.sleep(self.reset_timeout)
+            with self._lock:
+                self.state = self.HALF_OPEN
+            try:
+                if self.probe is not None:
+                    self.probe()
+            except Exception as e:
+                logger.info(f"{self.name} recovery probe failed: {e}")
+                with self._lock:
+                    self.state = self.OPEN
+                continue
+            self.record_success()
+            logger.info(f"{self.name} circuit closed, service recovered")
+            return
+
+
+def _probe_gtts() -> None:
+    gTTS(text="ok", slow=False, timeout=NETWORK_TIMEOUT).write_to_fp(io.BytesIO())
+
+
+def _probe_elevenlabs() -> None:
+    # Listing models checks reachability and the API key without spending characters
+    elevenlabs_client.models.list()
+
+
+_circuit_breakers = {
+    name: CircuitBreaker(name, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT, probe)
+    for name, probe in (("gtts", _probe_gtts), ("elevenlabs", _probe_elevenlabs))
+}
+
+
+# Latency-aware engine routing
+@dataclass
+class SynthesisResult:
+    """Encoded audio from one engine, plus the details reported back to the caller"""
+    audio: bytes
+    audio_format: str
+    details: List[str]
+    cached: bool = False
+
+
+class EngineRouter:
+    """Tracks rolling synthesis latency and error rate per engine
+    
+    Healthy engines whose p90 latency is within the budget are ranked by p90,
+    with configured preference only breaking ties; over-budget engines follow,
+    fastest first, and engines whose recent error rate is too high go last.
+    """
+    
+    def __init__(self, window: int = 50, max_error_rate: float = 0.5, min_samples: int = 5):
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, collections.deque] = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self._outcomes: Dict[str, collections.deque] = collections.defaultdict(lambda: collections.deque(maxlen=window))
+        self.hedges = 0
+        self.hedge_wins = 0
+    
+    def record(self, engine: str, latency: Optional[float], ok: bool) -> None:
+        """Record one synthesis attempt; latency None means not representative (e.g. cache hit)"""
+        with self._lock:
+            self._outcomes[engine].append(ok)
+            if ok and latency is not None:
+                self._latencies[engine].append(latency)
+    
+    def percentile(self, engine: str, pct: float) -> Optional[float]:
+        """Rolling latency percentile in seconds, or None without samples"""
+        with self._lock:
+            samples = sorted(self._latencies[engine])
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(pct / 100 * len(samples))) - 1))
+        return samples[index]
+    
+    def error_rate(self, engine: str) -> float:
+        with self._lock:
+            outcomes = list(self._outcomes[engine])
+        if not outcomes:
+            return 0.0
+        return outcomes.count(False) / len(outcomes)
+    
+    def is_healthy(self, engine: str) -> bool:
+        with self._lock:
+            samples = len(self._outcomes[engine])
+        return samples < self.min_samples or self.error_rate(engine) <= self.max_error_rate
+    
+    def rank(self, candidates: List[str], budget: float) -> List[str]:
+        """Order candidate engines from best to worst choice for the next call"""
+        healthy = [name for name in candidates if self.is_healthy(name)]
+        unhealthy = [name for name in candidates if name not in healthy]
+        p90s = {name: self.percentile(name, 90) for name in healthy}
+        # Engines without samples yet are given the benefit of the doubt
+        within_budget = [name for name in healthy if p90s[name] is None or p90s[name] <= budget]
+        over_budget = [name for name in healthy if name not in within_budget]
+        # Stable sorts keep preference order among equal latencies and unsampled engines
+        within_budget.sort(key=lambda name: (p90s[name] is None, p90s[name] or 0.0))
+        over_budget.sort(key=lambda name: p90s[name])
+        return within_budget + over_budget + unhealthy
+    
+    def note_hedge(self) -> None:
+        with self._lock:
+            self.hedges += 1
+    
+    def note_hedge_win(self) -> None:
+        with self._lock:
+            self.hedge_wins += 1
+    
+    def snapshot(self, engine: str) -> Dict[str, float]:
+        """Rolling statistics for status reporting"""
+        with self._lock:
+            samples = len(self._outcomes[engine])
+        return {
+            "samples": samples,
+            "p50": self.percentile(engine, 50),
+            "p90": self.percentile(engine, 90),
+            "error_rate": self.error_rate(engine),
+        }
+
+
+engine_router = EngineRouter()
+
+
+def _resolve_engine(engine: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Pick the engine for one call; returns (engine name, error message or None)"""
+    engine_name = engine.lower() if engine else TTS_ENGINE
+    if engine is None and ROUTING_MODE != "fixed":
+        engine_name = "auto"
+    if engine_name != "auto" and engine_name not in SUPPORTED_ENGINES:
+        logger.warning(f"Unknown engine requested: {engine}")
+        return engine_name, f"❌ Error: Unknown engine '{engine}' (choose from {', '.join(SUPPORTED_ENGINES)}, auto)"
+    
+    if engine_name != "auto" and not _get_engine(engine_name):
+        if engine:
+            logger.error(f"{engine_name} engine not available")
+            return engine_name, f"❌ Error: {engine_name} engine not available"
+        logger.error("TTS engine not available")
+        return engine_name, "❌ Error: Text-to-speech engine not available"
+    return engine_name, None
+
+
+# Slow call profiling
+class StackSampler:
+    """Samples one thread's call stack on a timer, counting identical stacks
+    
+    Unlike cProfile this sees time spent blocked (waiting for a lock, the
+    network or playback) and costs little, since the profiled thread runs
+    untouched. Stacks are saved in the folded format flame graph tools read.
+    """
+    
+    extension = "folded"
+    
+    def __init__(self, interval: float = None):
+        self.interval = (PROFILE_INTERVAL_MS if interval is None else interval * 1000) / 1000
+        self.stacks: "collections.Counter[str]" = collections.Counter()
+        self.samples = 0
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+    
+    def start(self) -> bool:
+        self._thread.start()
+        return True
+    
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+    
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class CProfileCapture:
+    """Deterministic cProfile capture of the calling thread, saved in pstats format"""
+    
+    extension = "prof"
+    
+    def __init__(self):
+        self.profile = cProfile.Profile()
+    
+    def start(self) -> bool:
+        try:
+            self.profile.enable()
+        except ValueError:
+            return False  # Only one cProfile can run at a time; another call is being profiled
+        return True
+    
+    def stop(self) -> None:
+        self.profile.disable()
+    
+    def save(self, path: str) -> None:
+        self.profile.dump_stats(path)
+
+
+@contextlib.contextmanager
+def _profiled(job: SpeechJob, params: Dict[str, Any]):
+    """Profile the block and keep the profile if it ran longer than PROFILE_SLOW_MS"""
+    if PROFILE_SLOW_MS <= 0:
+        yield
+        return
+    capture = CProfileCapture() if PROFILE_MODE == "cprofile" else StackSampler()
+    if not capture.start():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        capture.stop()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= PROFILE_SLOW_MS:
+            try:
+                _save_profile(job, params, elapsed_ms, capture)
+            except OSError as e:
+                logger.warning(f"Failed to save profile for {job.id}: {e}")
+
+
+def _save_profile(job: SpeechJob, params: Dict[str, Any], elapsed_ms: float, capture) -> str:
+    """Write a profile and its metadata to PROFILE_DIR, keeping only the newest PROFILE_MAX_FILES"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{job.id}"
+    data_file = f"{profile_id}.{capture.extension}"
+    capture.save(os.path.join(PROFILE_DIR, data_file))
+    metadata = {
+        "id": profile_id, "tool": job.tool, "params": params, "elapsed_ms": round(elapsed_ms, 1),
+        "mode": capture.extension, "data_file": data_file, "created": time.time(),
+        "timing": job.timing.report(params.get("engine")),
+    }
+    with open(os.path.join(PROFILE_DIR, f"{profile_id}.json"), "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    logger.info(f"{job.tool} {job.id} took {elapsed_ms:.0f} ms, saved profile {profile_id}")
+    _prune_profiles()
+    return profile_id
+
+
+def _load_profiles() -> List[Dict[str, Any]]:
+    """Metadata of every saved profile, newest first"""
+    profiles = []
+    try:
+        entries = [entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".json")]
+    except FileNotFoundError:
+        return []
+    for entry in entries:
+        try:
+            with open(entry.path, encoding="utf-8") as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # Pruned or half-written by another process
+    profiles.sort(key=lambda profile: profile.get("created", 0), reverse=True)
+    return profiles
+
+
+def _prune_profiles() -> None:
+    for profile in _load_profiles()[PROFILE_MAX_FILES:]:
+        for name in (f"{profile['id']}.json", profile.get("data_file", "")):
+            try:
+                os.unlink(os.path.join(PROFILE_DIR, name))
+            except (FileNotFoundError, IsADirectoryError):
+                pass  # Pruned by another call
+
+
+def _profile_summary(profile: Dict[str, Any], limit: int) -> List[str]:
+    """The hottest functions of a saved profile, as report lines"""
+    path = os.path.join(PROFILE_DIR, profile["data_file"])
+    if profile["mode"] == "prof":
+        stream = io.StringIO()
+        stats = pstats.Stats(path, stream=stream)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue().strip().splitlines()
+    
+    # Inclusive samples per frame: how often each function was anywhere on the stack
+    inclusive: "collections.Counter[str]" = collections.Counter()
+    total = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            total += int(count)
+            for frame in set(stack.split(";")):
+                inclusive[frame] += int(count)
+    lines = [f"{total} samples, by share of samples with the function on the stack:"]
+    for frame, count in inclusive.most_common(limit):
+        lines.append(f"{count / total:6.1%}  {frame}")
+    return lines
+
+
+@_threaded_tool()
+def list_profiles(limit: int = 10) -> str:
+    """List recent profiles captured for slow speak calls (enable with VOCALIZE_PROFILE_SLOW_MS)
+    
+    Args:
+        limit: How many of the newest profiles to list
+    
+    Returns:
+        One line per profile: ID, duration and the call's parameters
+    """
+    profiles = _load_profiles()[:max(1, limit)]
+    if not profiles:
+        state = f"slower than {PROFILE_SLOW_MS} ms" if PROFILE_SLOW_MS > 0 else "disabled, set VOCALIZE_PROFILE_SLOW_MS"
+        return f"ℹ️ No profiles captured (profiling calls {state})"
+    lines = [f"🔬 {len(profiles)} recent profiles in {PROFILE_DIR}:"]
+    for profile in profiles:
+        params = profile.get("params", {})
+        lines.append(
+            f"• {profile['id']}: {profile['tool']} took {profile['elapsed_ms']:.0f} ms "
+            f"(engine: {params.get('engine')}, {profile['mode']}) '{str(params.get('text', ''))[:40]}'"
+        )
+    return "\n".join(lines)
+
+
+@_threaded_tool()
+def get_profile(profile_id: str, limit: int = 25) -> str:
+    """Show a captured profile: the call's parameters, its timing breakdown and the hottest functions
+    
+    Args:
+        profile_id: ID from list_profiles
+        limit: How many functions to show
+    
+    Returns:
+        The profile report, with the path of the raw profile for external tools
+    """
+    profile = next((profile for profile in _load_profiles() if profile["id"] == profile_id), None)
+    if profile is None:
+        return f"❌ Error: No profile '{profile_id}'"
+    try:
+        summary = _profile_summary(profile, max(1, limit))
+    except (OSError, ValueError) as e:
+        return f"❌ Error: Profile '{profile_id}' could not be read: {e}"
+    lines = [
+        f"🔬 Profile {profile['id']}: {profile['tool']} took {profile['elapsed_ms']:.0f} ms",
+        f"📁 Raw profile: {os.path.join(PROFILE_DIR, profile['data_file'])}",
+        f"⚙️ Parameters: {json.dumps(profile.get('params', {}), ensure_ascii=False)}",
+        f"⏱️ Timing: {json.dumps(profile.get('timing', {}), ensure_ascii=False)}",
+        "",
+    ]
+    return "\n".join(lines + summary)
+
+
+# Unified text-to-speech tool
+@_threaded_tool()
+def speak(text: str, voice: str = None, emotion: str = None, rate: int = 150, engine: str = None,
+          timing: bool = False) -> str:
+    """Speak text aloud with optional voice and emotion control
+    
+    Args:
+        text: The text to speak (KEEP IT SHORT! Aim for under 10 words for best results)
+        voice: Specific voice name to use (e.g. "Fred", "Alex", "Samantha")
+        emotion: Emotion/vibe - "dramatic", "friendly", "professional", "playful", "calm"
+        rate: Speaking rate in words per minute (default: 150, range: 50-400)
+        engine: Engine for this call - "pyttsx3", "gtts", "elevenlabs" or "auto" for latency-aware routing
+            (default: server's TTS_ENGINE, or "auto" when the server has routing enabled)
+        timing: Add a "⏱️ Timing:" line with a JSON breakdown of where the call's time went
+    
+    Returns:
+        Confirmation message about what was spoken, including engine used
+    
+    Note: Shorter is better! Use brief phrases (under 10 words) for optimal speech flow.
+    """
+    # Validate inputs
+    is_valid, error_msg = validate_speak_input(text, rate)
+    if not is_valid:
+        logger.warning(f"Invalid input for speak function: {error_msg}")
+        return f"❌ Error: {error_msg}"
+    
+    engine_name, error_msg = _resolve_engine(engine)
+    if error_msg:
+        return error_msg
+    
+    _record_stat("active_calls")
+    params = {"text": text, "voice": voice, "emotion": emotion, "rate": rate, "engine": engine_name}
+    with _job_scope(text, "speak") as job, _profiled(job, params):
+        try:
+            # Engines synthesize concurrently up to their own limits; audio output is serialized inside
+            logger.info(f"Speaking text: '{text[:50]}...' with emotion='{emotion}', voice='{voice}', rate={rate} using {engine_name} ({job.id})")
+            
+            try:
+                if engine_name == "auto":
+                    result = _speak_routed(text, voice, emotion, rate)
+                elif engine_name == "pyttsx3":
+                    result = _speak_with_pyttsx3(text, voice, emotion, rate)
+                elif engine_name == "gtts":
+                    result = _speak_with_gtts(text, voice, emotion, rate)
+                elif engine_name == "elevenlabs":
+                    result = _speak_with_elevenlabs(text, voice, emotion, rate)
+                else:
+                    result = "❌ Error: No TTS engine available"
+            except CircuitOpenError:
+                # The service is known to be down; answer immediately from the local engine
+                result = _speak_with_fallback(engine_name, text, voice, emotion, rate)
+            
+        except Exception as e:
+            if job.cancelled:
+                result = _cancelled_message(job)
+            else:
+                error_msg = f"Error speaking text: {str(e)}"
+                logger.error(error_msg)
+                result = f"❌ {error_msg}"
+        finally:
+            _record_stat("active_calls", -1)
+    
+    if result.startswith("⏹️"):
+        _record_stat("cancelled_calls")
+    else:
+        _record_stat("speak_errors" if result.startswith("❌") else "speak_calls")
+    if timing:
+        result += "\n" + _timing_line(job, engine_name)
+    return result
+
+
+def _cancelled_message(job: SpeechJob) -> str:
+    logger.info(f"Job {job.id} cancelled while {job.state}")
+    return f"⏹️ Cancelled: '{job.text}' ({job.id}, while {job.state})"
+
+
+def _spoken_message(text: str, details: List[str]) -> str:
+    """Build the confirmation message returned by speak()"""
+    detail_str = f" ({', '.join(details)})" if details else ""
+    return f"🗣️ Spoke: '{text}'{detail_str}"
+
+
+class Pyttsx3Session:
+    """Long-lived pyttsx3 event loop pumped from one dedicated thread
+    
+    runAndWait() starts and stops the driver loop for every utterance. The
+    session starts pyttsx3's external loop once (startLoop(False)), pumps it
+    with iterate(), and learns that an utterance is done from the
+    finished-utterance callback, so queued utterances flow straight into the
+    driver. Voice and rate are only set when they differ from the last
+    utterance. Drivers without a working external loop are detected at
+    startup and marked unsupported, leaving callers on runAndWait().
+    """
+    
+    def __init__(self, engine, poll_interval: float = 0.01):
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self.supported = False
+        self.utterances = 0
+        self.property_changes = 0
+        self._voice_id = None
+        self._rate = None
+        self._requests = queue.Queue()
+        self._pending: Dict[str, dict] = {}
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pyttsx3-session", daemon=True)
+        self._thread.start()
+        self._started.wait(timeout=5)
+    
+    def run(self, text: str, voice_id: Optional[str] = None, rate: Optional[int] = None,
+            output_path: Optional[str] = None, timeout: float = 120) -> None:
+        """Speak one utterance (or save it to output_path) and wait for it to finish"""
+        if not self.supported:
+            raise RuntimeError("pyttsx3 session is not running")
+        request = {
+            "text": text, "voice_id": voice_id, "rate": rate, "output_path": output_path,
+            "done": threading.Event(), "error": None, "cancelled": False,
+        }
+        job = _current_job.get()
+        unregister = job.on_cancel(lambda: self._requests.put({"cancel": request})) if job is not None else None
+        self._requests.put(request)
+        try:
+            if not request["done"].wait(timeout):
+                raise TimeoutError("pyttsx3 utterance did not finish")
+        finally:
+            if unregister is not None:
+                unregister()
+        if request["error"] is not None:
+            raise request["error"]
+    
+    def close(self) -> None:
+        if self.supported:
+            self._requests.put(None)
+            self._thread.join(timeout=2)
+    
+    def _run(self) -> None:
+        engine = self.engine
+        tokens = [
+            engine.connect('finished-utterance', self._on_finished),
+            engine.connect('error', self._on_error),
+        ]
+        try:
+            engine.startLoop(False)
+            engine.iterate()
+            self.supported = True
+        except Exception as e:
+            logger.info(f"pyttsx3 driver has no usable external loop, using runAndWait: {e}")
+            self._shutdown(tokens)
+            self._started.set()
+            return
+        self._started.set()
+        
+        try:
+            while True:
+                try:
+                    # Block while idle; keep pumping the driver while utterances are in flight
+                    request = self._requests.get(timeout=self.poll_interval if self._pending else None)
+                except queue.Empty:
+                    request = False
+                if request is None:
+                    break
+                if request and "cancel" in request:
+                    self._cancel(request["cancel"])
+                elif request:
+                    self._start(request)
+                engine.iterate()
+        except Exception as e:
+            logger.error(f"pyttsx3 session stopped: {e}")
+        finally:
+            self.supported = False
+            for request in self._pending.values():
+                request["error"] = RuntimeError("pyttsx3 session stopped")
+                request["done"].set()
+            self._pending.clear()
+            self._shutdown(tokens)
+    
+    def _shutdown(self, tokens) -> None:
+        for token in tokens:
+            self.engine.disconnect(token)
+        try:
+            self.engine.endLoop()
+        except RuntimeError:
+            pass  # Loop never started
+    
+    def _cancel(self, request: dict) -> None:
+        # Runs on the session thread, which owns the driver
+        request["cancelled"] = True
+        for name, pending in list(self._pending.items()):
+            if pending is request:
+                self.engine.stop()
+                del self._pending[name]
+                request["error"] = SpeechCancelled("utterance cancelled")
+                request["done"].set()
+    
+    def _start(self, request: dict) -> None:
+        if request["cancelled"]:
+            request["error"] = SpeechCancelled("utterance cancelled")
+            request["done"].set()
+            return
+        engine = self.engine
+        name = f"utterance-{self.utterances}"
+        self.utterances += 1
+        try:
+            if request["voice_id"] is not None and request["voice_id"] != self._voice_id:
+                engine.setProperty('voice', request["voice_id"])
+                self._voice_id = request["voice_id"]
+                self.property_changes += 1
+            if request["rate"] is not None and request["rate"] != self._rate:
+                engine.setProperty('rate', request["rate"])
+                self._rate = request["rate"]
+                self.property_changes += 1
+            self._pending[name] = request
+            if request["output_path"]:
+                engine.save_to_file(request["text"], request["output_path"], name)
+            else:
+                engine.say(request["text"], name)
+        except Exception as e:
+            self._pending.pop(name, None)
+            request["error"] = e
+            request["done"].set()
+    
+    def _on_finished(self, name, completed):
+        request = self._pending.pop(name, None)
+        if request is not None:
+            request["done"].set()
+    
+    def _on_error(self, name, exception):
+        request = self._pending.pop(name, None)
+        if request is not None:
+            request["error"] = exception
+            request["done"].set()
+
+
+_pyttsx3_session: Optional[Pyttsx3Session] = None
+_pyttsx3_session_lock = threading.Lock()
+
+
+def _get_pyttsx3_session(engine) -> Optional[Pyttsx3Session]:
+    """The persistent session for a pyttsx3 engine, or None to fall back to runAndWait()"""
+    global _pyttsx3_session
+    if not PYTTSX3_SESSION_ENABLED or not isinstance(engine, pyttsx3.Engine):
+        return None
+    with _pyttsx3_session_lock:
+        if _pyttsx3_session is None or _pyttsx3_session.engine is not engine:
+            _pyttsx3_session = Pyttsx3Session(engine)
+        return _pyttsx3_session if _pyttsx3_session.supported else None
+
+
+def _pyttsx3_voice_and_rate(voice: str, emotion: str, rate: int) -> Tuple[Optional[str], str, int]:
+    """Resolve the pyttsx3 voice and emotion-adjusted rate; returns (voice id, voice used, final rate)"""
+    # Find appropriate voice based on voice name or emotion
+    with _timed("voice_resolution"):
+        voice_index = find_voice_by_emotion_and_name(emotion, voice)
+    
+    if _available_voices and voice_index < len(_available_voices):
+        voice_id = _available_voices[voice_index].id
+        voice_used = _available_voices[voice_index].name
+        logger.debug(f"Using voice: {voice_used} (index: {voice_index})")
+    else:
+        voice_id = None
+        voice_used = "default"
+        logger.warning("Could not find requested voice, using default")
+    
+    # Calculate final rate based on emotion
+    final_rate = calculate_emotion_rate(rate, emotion)
+    return voice_id, voice_used, final_rate
+
+
+def _pyttsx3_say(engine, text: str, voice: str, emotion: str, rate: int,
+                 output_path: Optional[str] = None) -> Tuple[str, int]:
+    """Speak text with pyttsx3, or save it to output_path; returns (voice used, final rate)"""
+    voice_id, voice_used, final_rate = _pyttsx3_voice_and_rate(voice, emotion, rate)
+    _pyttsx3_run(engine, text, voice_id, final_rate, output_path)
+    return voice_used, final_rate
+
+
+def _pyttsx3_run(engine, text: str, voice_id: Optional[str], final_rate: int,
+                 output_path: Optional[str] = None) -> None:
+    """Speak text with an already resolved pyttsx3 voice and rate, or save it to output_path"""
+    session = _get_pyttsx3_session(engine)
+    if session is not None:
+        session.run(text, voice_id, final_rate, output_path)
+        return
+    
+    if voice_id is not None:
+        engine.setProperty('voice', voice_id)
+    engine.setProperty('rate', final_rate)
+    if output_path:
+        engine.save_to_file(text, output_path)
+    else:
+        engine.say(text)
+    job = _current_job.get()
+    unregister = job.on_cancel(engine.stop) if job is not None else None
+    try:
+        engine.runAndWait()
+    finally:
+        if unregister is not None:
+            unregister()
+    if job is not None:
+        job.check()
+
+
+def _pyttsx3_details(voice: str, emotion: str, voice_used: str, final_rate: int) -> List[str]:
+    details = ["engine: pyttsx3"]  # Engine first for visibility
+    if emotion:
+        details.append(f"emotion: {emotion}")
+    if voice:
+        details.append(f"voice: {voice_used}")
+    details.append(f"rate: {final_rate} wpm")
+    return details
+
+
+def _speak_with_pyttsx3(text: str, voice: str, emotion: str, rate: int) -> str:
+    """Speak using pyttsx3 engine"""
+    if _playback_daemon_enabled() or not output_sink.is_device:
+        # Render to a file and hand it to the shared daemon or output sink instead of the local device
+        result = _synthesize("pyttsx3", text, voice, emotion, rate)
+        _play_audio(result.audio, result.audio_format, text)
+        logger.info("Successfully spoke text with pyttsx3")
+        return _spoken_message(text, result.details)
+    
+    engine = _pyttsx3_engine()
+    
+    # pyttsx3 synthesizes while it plays, so it holds both its engine and the audio device
+    job = _current_job.get()
+    with _synthesis_limits["pyttsx3"]:
+        if job is not None:
+            job.state = "queued"
+        with audio_output_lock:
+            if job is not None:
+                job.state = "playing"
+            output_sink.drain()  # Don't talk over clips still playing from the mixer queue
+            voice_used, final_rate = _pyttsx3_say(engine, text, voice, emotion, rate)
+    if job is not None:
+        job.timing.engine = "pyttsx3"
+        job.timing.mark("played")
+    
+    # Build response message
+    success_msg = _spoken_message(text, _pyttsx3_details(voice, emotion, voice_used, final_rate))
+    logger.info("Successfully spoke text with pyttsx3")
+    return success_msg
+
+
+def _synthesize_pyttsx3(text: str, voice: str, emotion: str, rate: int) -> SynthesisResult:
+    """Render speech with pyttsx3 to WAV (through the shared cache) without playing it"""
+    voice_id, voice_used, final_rate = _pyttsx3_voice_and_rate(voice, emotion, rate)
+    
+    def synthesize() -> bytes:
+        engine = _pyttsx3_engine()
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
+            tmp_file_path = tmp_file.name
+        try:
+            with _synthesis_limits["pyttsx3"]:
+                _pyttsx3_run(engine, text, voice_id, final_rate, output_path=tmp_file_path)
+            with _span("tempfile.read") as span, open(tmp_file_path, 'rb') as f:
+                audio_data = f.read()
+                span.set("vocalize.audio_bytes", len(audio_data))
+                return audio_data
+        finally:
+            os.unlink(tmp_file_path)
+    
+    # The resolved voice and rate decide the audio; voice ids are specific to this machine's speech driver
+    audio_data, cached = _cached_synthesis("pyttsx3", text, synthesize, voice_id=voice_id, rate=final_rate)
+    
+    details = _pyttsx3_details(voice, emotion, voice_used, final_rate)
+    if audio_cache is not None:
+        details.append(f"cache: {'hit' if cached else 'miss'}")
+    return SynthesisResult(audio_data, "wav", details, cached)
+
+
+class _CancellableBuffer(io.BytesIO):
+    """In-memory file that aborts the writer once the job is cancelled"""
+    
+    def __init__(self, job: Optional[SpeechJob]):
+        super().__init__()
+        self.job = job
+    
+    def write(self, data) -> int:
+        if self.job is not None:
+            self.job.check()
+        return super().write(data)
+
+
+def _read_cancellable(chunks) -> bytes:
+    """Join a streamed response, closing it as soon as the current job is cancelled"""
+    job = _current_job.get()
+    parts = []
+    try:
+        for chunk in chunks:
+            if job is not None:
+                job.check()
+            parts.append(chunk)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return b"".join(parts)
+
+
+def _synthesize_gtts(text: str, voice: str, emotion: str, rate: int) -> SynthesisResult:
+    """Synthesize speech with gTTS (through the shared cache) without playing it"""
+    try:
+        # For gTTS, we'll use different languages/accents to simulate voice variety
+        lang = 'en'
+        tld = 'com'  # Default to US English
+        
+        # Map emotions to different accents/languages for variety
+        if emotion == "dramatic":
+            tld = 'co.uk'  # British English for dramatic effect
+        elif emotion == "friendly":
+            tld = 'com.au'  # Australian English for friendly
+        elif emotion == "professional":
+            tld = 'com'  # US English for professional
+        elif emotion == "playful":
+            tld = 'ca'  # Canadian English for playful
+        elif emotion == "calm":
+            tld = 'co.uk'  # British English for calm
+            
+        def synthesize() -> bytes:
+            # Create gTTS object and synthesize into memory
+            with _synthesis_limits["gtts"]:
+                tts = gTTS(text=text, lang=lang, tld=tld, slow=False, timeout=NETWORK_TIMEOUT)
+                buffer = _CancellableBuffer(_current_job.get())
+                tts.write_to_fp(buffer)
+                return buffer.getvalue()
+        
+        audio_data, cached = _cached_synthesis("gtts", text, synthesize, lang=lang, tld=tld)
+        
+        details = ["engine: gTTS"]  # Engine first for visibility
+        if emotion:
+            details.append(f"emotion: {emotion}")
+        if voice:
+            details.append(f"voice: {voice}")
+        details.append(f"accent: {tld}")
+        if audio_cache is not None:
+            details.append(f"cache: {'hit' if cached else 'miss'}")
+        return SynthesisResult(audio_data, "mp3", details, cached)
+        
+    except Exception as e:
+        raise Exception(f"gTTS error: {str(e)}")
+
+
+def _synthesize_elevenlabs(text: str, voice: str, emotion: str, rate: int) -> SynthesisResult:
+    """Synthesize speech with ElevenLabs (through the shared cache) without playing it"""
+    try:
+        # Use the configured voice ID or override with voice parameter
+        voice_id = voice if voice else ELEVENLABS_VOICE_ID
+        
+        # Map emotions to voice settings for ElevenLabs
+        # Stability: 0-1 (higher = more stable, lower = more variable)
+        # Similarity: 0-1 (higher = closer to original voice)
+        # Style: 0-1 (emotional range)
+        # Use speaker boost for clarity
+        emotion_settings = {
+            "dramatic": VoiceSettings(stability=0.3, similarity_boost=0.8, style=0.9, use_speaker_boost=True),
+            "friendly": VoiceSettings(stability=0.7, similarity_boost=0.8, style=0.6, use_speaker_boost=True),
+            "professional": VoiceSettings(stability=0.8, similarity_boost=0.9, style=0.3, use_speaker_boost=True),
+            "playful": VoiceSettings(stability=0.4, similarity_boost=0.7, style=0.8, use_speaker_boost=True),
+            "calm": VoiceSettings(stability=0.9, similarity_boost=0.8, style=0.2, use_speaker_boost=True),
+            "cheerful": VoiceSettings(stability=0.5, similarity_boost=0.8, style=0.7, use_speaker_boost=True)
+        }
+        
+        # Get voice settings based on emotion, default to professional
+        voice_settings = emotion_settings.get(emotion, emotion_settings["professional"])
+        
+        def synthesize() -> bytes:
+            # Generate speech using eleven_flash_v2_5 model
+            with _synthesis_limits["elevenlabs"]:
+                audio_generator = elevenlabs_client.text_to_speech.convert(
+                    text=text,
+                    voice_id=voice_id,
+                    model_id="eleven_flash_v2_5",
+                    voice_settings=voice_settings,
+                    output_format="mp3_44100_128"
+                )
+                # Convert generator to bytes, dropping the download if the job is cancelled
+                return _read_cancellable(audio_generator)
+        
+        audio_data, cached = _cached_synthesis(
+            "elevenlabs", text, synthesize,
+            voice_id=voice_id, model_id="eleven_flash_v2_5",
+            voice_settings=voice_settings.model_dump(), output_format="mp3_44100_128",
+        )
+        
+        details = ["engine: ElevenLabs"]  # Engine first for visibility
+        if emotion:
+            details.append(f"emotion: {emotion}")
+        if voice:
+            details.append(f"voice: {voice}")
+        else:
+            details.append(f"voice: {voice_id}")
+        details.append("model: eleven_flash_v2_5")
+        if audio_cache is not None:
+            details.append(f"cache: {'hit' if cached else 'miss'}")
+        return SynthesisResult(audio_data, "mp3", details, cached)
+        
+    except Exception as e:
+        raise Exception(f"ElevenLabs error: {str(e)}")
+
+
+_SYNTHESIZERS = {"pyttsx3": _synthesize_pyttsx3, "gtts": _synthesize_gtts, "elevenlabs": _synthesize_elevenlabs}
+
+
+# Text normalization
+_ONES = (
+    "zero one two three four five six seven eight nine ten eleven twelve thirteen "
+    "fourteen fifteen sixteen seventeen eighteen nineteen"
+).split()
+_TENS = ("", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety")
+_SCALES = ((10 ** 12, "trillion"), (10 ** 9, "billion"), (10 ** 6, "million"), (1000, "thousand"))
+# Unit suffixes spoken after a number: (singular, plural)
+_UNITS = {
+    "%": ("percent", "percent"),
+    "ms": ("millisecond", "milliseconds"),
+    "s": ("second", "seconds"), "sec": ("second", "seconds"), "secs": ("second", "seconds"),
+    "min": ("minute", "minutes"), "mins": ("minute", "minutes"),
+    "h": ("hour", "hours"), "hr": ("hour", "hours"), "hrs": ("hour", "hours"),
+    "KB": ("kilobyte", "kilobytes"), "MB": ("megabyte", "megabytes"),
+    "GB": ("gigabyte", "gigabytes"), "TB": ("terabyte", "terabytes"),
+}
+# A standalone number (not part of a version, time, identifier or 3rd-style ordinal), its sign and what follows it
+_NUMBER_PATTERN = re.compile(r"(?<![\w.,:])([-−])?(\d{1,3}(?:,\d{3})+|\d+)(?:\.(\d+))?(?![.,:]?\d)(\s?)(%|[A-Za-z]+\b)?")
+_MARKUP_PATTERN = re.compile(r"[*`#~\"“”]")
+_REPEATED_PUNCTUATION = re.compile(r"([!?,;:])\1+|\.{4,}")
+_EMOJI_JOINERS = {"\u200d", "\ufe0f", "\u20e3"}
+
+_normalization_lock = threading.Lock()
+_normalization_stats = {"texts": 0, "rewritten": 0, "lookups": 0, "hits": 0, "normalized_hits": 0}
+# Text as the caller wrote it, so cache hits can be attributed to normalization
+_raw_text: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("vocalize_raw_text", default=None)
+# Cache keys the raw texts would have had, most recent last: a hit only counts as gained by
+# normalization if the raw text's own key had not been looked up before
+_raw_cache_keys: "collections.OrderedDict[str, None]" = collections.OrderedDict()
+_RAW_CACHE_KEYS_LIMIT = 10000
+
+
+def _number_words(n: int) -> str:
+    """Spell out a non-negative integer in English words"""
+    if n < 20:
+        return _ONES[n]
+    if n < 100:
+        return _TENS[n // 10] + (f"-{_ONES[n % 10]}" if n % 10 else "")
+    if n < 1000:
+        return f"{_ONES[n // 100]} hundred" + (f" {_number_words(n % 100)}" if n % 100 else "")
+    scale, name = next((scale, name) for scale, name in _SCALES if n >= scale)
+    rest = n % scale
+    return f"{_number_words(n // scale)} {name}" + (f" {_number_words(rest)}" if rest else "")
+
+
+def _expand_number(match: re.Match) -> str:
+    sign, whole, fraction, space, unit = match.groups()
+    unit = unit or ""
+    value = int(whole.replace(",", ""))
+    spoken_unit = _UNITS.get(unit) or _UNITS.get(unit.upper()) if unit else None
+    if (unit and not space and spoken_unit is None) or value >= 1000 * _SCALES[0][0]:
+        return match.group(0)  # Ordinals like 3rd, identifiers like 4k, or too large to be worth spelling out
+    
+    words = ("minus " if sign else "") + _number_words(value)
+    if fraction:
+        words += " point " + " ".join(_ONES[int(digit)] for digit in fraction)
+    if spoken_unit is None:
+        return f"{words}{space}{unit}"
+    singular, plural = spoken_unit
+    return f"{words} {singular if value == 1 and not fraction else plural}"
+
+
+def _lowercase_word(match: re.Match) -> str:
+    word = match.group(0)
+    return word if len(word) > 1 and word.isupper() else word.lower()  # Keep acronyms like API or USB
+
+
+def normalize_text(text: str, steps: set) -> str:
+    """Rewrite text into a canonical form that sounds the same when spoken
+    
+    Steps: whitespace (collapse runs), emoji (strip), punctuation (drop
+    markdown and quote characters, collapse repeats), numbers (spell out
+    numbers and units), case (lowercase all but acronyms) and terminal
+    (drop a final period or exclamation mark, unless it ends an
+    abbreviation like "a.m."). Returns the original text if nothing
+    speakable would be left.
+    """
+    normalized = text
+    if "emoji" in steps:
+        normalized = "".join(
+            ch for ch in normalized
+            if ch not in _EMOJI_JOINERS and not (ord(ch) >= 0x2300 and unicodedata.category(ch) in ("So", "Sk"))
+        )
+    if "punctuation" in steps:
+        normalized = _MARKUP_PATTERN.sub("", normalized)
+        normalized = _REPEATED_PUNCTUATION.sub(lambda m: m.group(1) or "...", normalized)
+        normalized = re.sub(r"\s+([!?,;:.])", r"\1", normalized)
+    if "numbers" in steps:
+        normalized = _NUMBER_PATTERN.sub(_expand_number, normalized)
+    if "case" in steps:
+        normalized = re.sub(r"[^\W\d_]+", _lowercase_word, normalized)
+    if steps & {"whitespace", "emoji", "punctuation", "terminal"}:
+        normalized = " ".join(normalized.split())
+    if "terminal" in steps:
+        # Keep the period of an ellipsis or of a single-letter abbreviation like "a.m."
+        normalized = re.sub(r"(?<!\.)(?:(?<!\b[^\W\d_])\.|!)$", "", normalized).rstrip()
+    return normalized if normalized.strip() else text
+
+
+def _normalize_for(engine_name: str, text: str) -> str:
+    if not NORMALIZE_TEXT:
+        return text
+    normalized = normalize_text(text, NORMALIZE_STEPS.get(engine_name, set()))
+    with _normalization_lock:
+        _normalization_stats["texts"] += 1
+        if normalized != text:
+            _normalization_stats["rewritten"] += 1
+    return normalized
+
+
+def _record_normalized_lookup(engine: str, text: str, cached: bool, params: Dict[str, Any]) -> None:
+    """Count a cache lookup, noting hits that only matched because the text was normalized"""
+    raw = _raw_text.get()
+    if raw is None:
+        return
+    raw_key = AudioCache.make_key(engine, raw, **params)
+    with _normalization_lock:
+        raw_seen = raw_key in _raw_cache_keys
+        _raw_cache_keys[raw_key] = None
+        _raw_cache_keys.move_to_end(raw_key)
+        if len(_raw_cache_keys) > _RAW_CACHE_KEYS_LIMIT:
+            _raw_cache_keys.popitem(last=False)
+        _normalization_stats["lookups"] += 1
+        if cached:
+            _normalization_stats["hits"] += 1
+            if raw != text and not raw_seen:
+                _normalization_stats["normalized_hits"] += 1
+
+
+def _describe_normalization() -> str:
+    if not NORMALIZE_TEXT:
+        return "disabled"
+    with _normalization_lock:
+        stats = dict(_normalization_stats)
+    description = f"{stats['rewritten']} of {stats['texts']} texts rewritten"
+    if stats["lookups"]:
+        hit_rate = stats["hits"] / stats["lookups"]
+        raw_hit_rate = (stats["hits"] - stats["normalized_hits"]) / stats["lookups"]
+        description += f", cache hit rate {hit_rate:.0%} ({raw_hit_rate:.0%} on raw text)"
+    return description
+
+
+def _synthesize(engine_name: str, text: str, voice: str, emotion: str, rate: int) -> SynthesisResult:
+    """Synthesize with the named engine, recording latency and outcome for routing"""
+    breaker = _circuit_breakers.get(engine_name)
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpenError(f"{engine_name} circuit is {breaker.state}")
+    
+    start = time.perf_counter()
+    timing = _call_timing()
+    queued_before = timing.phases.get("synthesis_queue", 0.0) if timing is not None else 0.0
+    token = _raw_text.set(text)
+    span_attributes = {"vocalize.engine": engine_name, "vocalize.emotion": emotion, "vocalize.voice": voice,
+                       "vocalize.rate": rate, "vocalize.text_length": len(text)}
+    with _span("synthesize", span_attributes) as span:
+        try:
+            result = _SYNTHESIZERS[engine_name](_normalize_for(engine_name, text), voice, emotion, rate)
+        except Exception:
+            if _job_cancelled():
+                raise  # Says nothing about the engine's health
+            engine_router.record(engine_name, None, False)
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        finally:
+            _raw_text.reset(token)
+        span.set("vocalize.cache", "hit" if result.cached else "miss")
+        span.set("vocalize.audio_bytes", len(result.audio))
+    elapsed = time.perf_counter() - start
+    # Cache hits say nothing about the engine's own latency or health
+    engine_router.record(engine_name, None if result.cached else elapsed, True)
+    if breaker is not None and not result.cached:
+        breaker.record_success()
+    if timing is not None:
+        # Waiting for the engine's concurrency limit is reported as queueing, not synthesis
+        timing.add("synthesis", elapsed - (timing.phases.get("synthesis_queue", 0.0) - queued_before))
+        timing.record_synthesis(engine_name, result)
+    with _timed("postprocess"), _span("postprocess", {"vocalize.engine": engine_name}):
+        return _trim_result(_stretch_result(engine_name, result, rate, emotion))
+
+
+def _speak_with_fallback(engine_name: str, text: str, voice: str, emotion: str, rate: int) -> str:
+    """Speak with the fallback engine while engine_name's circuit breaker is open"""
+    if not FALLBACK_ENGINE or FALLBACK_ENGINE == engine_name or not _get_engine(FALLBACK_ENGINE):
+        return f"❌ Error: {engine_name} is unavailable (circuit open) and no fallback engine is ready"
+    
+    if engine_name in _circuit_breakers:
+        _circuit_breakers[engine_name].note_fallback()
+    logger.warning(f"{engine_name} circuit open, speaking with {FALLBACK_ENGINE} instead")
+    speak_with = {
+        "pyttsx3": _speak_with_pyttsx3,
+        "gtts": _speak_with_gtts,
+        "elevenlabs": _speak_with_elevenlabs,
+    }[FALLBACK_ENGINE]
+    return f"{speak_with(text, voice, emotion, rate)} [fallback: {engine_name} unavailable]"
+
+
+def _speak_with_gtts(text: str, voice: str, emotion: str, rate: int) -> str:
+    """Speak using gTTS engine"""
+    result = _synthesize("gtts", text, voice, emotion, rate)
+    
+    # Play locally or through the shared playback daemon
+    try:
+        _play_audio(result.audio, result.audio_format, text)
+    except Exception as e:
+        raise Exception(f"gTTS error: {str(e)}")
+    
+    success_msg = _spoken_message(text, result.details)
+    logger.info("Successfully spoke text with gTTS")
+    return success_msg
+
+
+def _speak_with_elevenlabs(text: str, voice: str, emotion: str, rate: int) -> str:
+    """Speak using ElevenLabs engine"""
+    result = _synthesize("elevenlabs", text, voice, emotion, rate)
+    
+    # Play locally or through the shared playback daemon
+    try:
+        _play_audio(result.audio, result.audio_format, text)
+    except Exception as e:
+        raise Exception(f"ElevenLabs error: {str(e)}")
+    
+    success_msg = _spoken_message(text, result.details)
+    logger.info("Successfully spoke text with ElevenLabs")
+    return success_msg
+
+
+def _synthesize_with_fallback(order: List[str], text: str, voice: str, emotion: str, rate: int) -> Tuple[str, SynthesisResult]:
+    """Try engines in ranked order until one synthesizes successfully"""
+    last_error = None
+    for name in order:
+        try:
+            return name, _synthesize(name, text, voice, emotion, rate)
+        except Exception as e:
+            if _job_cancelled():
+                raise
+            logger.warning(f"Routed synthesis with {name} failed: {e}")
+            last_error = e
+    raise last_error
+
+
+def _synthesize_hedged(order: List[str], text: str, voice: str, emotion: str, rate: int) -> Tuple[str, SynthesisResult]:
+    """Race the primary engine against backups fired once it runs past its p90
+    
+    The primary starts immediately. If it hasn't answered by its p90 latency
+    (or the latency budget before enough samples exist), the next engine is
+    started too and whichever returns first wins. A failure launches the next
+    backup straight away. Losing requests finish in the background, so their
+    audio still lands in the shared cache.
+    """
+    results = queue.Queue()
+    pending = list(order)
+    active = 0
+    
+    def launch():
+        nonlocal active
+        name = pending.pop(0)
+        active += 1
+        
+        def run():
+            try:
+                results.put((name, _synthesize(name, text, voice, emotion, rate), None))
+            except Exception as e:
+                results.put((name, None, e))
+        
+        threading.Thread(target=_in_job_context(run), name=f"hedged-{name}", daemon=True).start()
+    
+    primary = order[0]
+    hedge_after = engine_router.percentile(primary, 90) or ROUTING_LATENCY_BUDGET
+    hedge_at = time.monotonic() + hedge_after
+    hedged = False
+    last_error = None
+    
+    launch()
+    while active or pending:
+        if active == 0:
+            # Everything launched so far failed; move straight on to the next engine
+            launch()
+            continue
+        timeout = max(0.0, hedge_at - time.monotonic()) if pending and not hedged else None
+        try:
+            name, result, error = results.get(timeout=timeout)
+        except queue.Empty:
+            hedged = True
+            engine_router.note_hedge()
+            logger.info(f"{primary} exceeded {hedge_after * 1000:.0f} ms, hedging with {pending[0]}")
+            launch()
+            continue
+        active -= 1
+        if error is None:
+            if name != primary:
+                engine_router.note_hedge_win()
+            return name, result
+        if _job_cancelled():
+            raise error
+        logger.warning(f"Hedged synthesis with {name} failed: {error}")
+        last_error = error
+    raise last_error
+
+
+def _routing_candidates() -> List[str]:
+    return [name for name in ROUTING_ENGINES if _get_engine(name)]
+
+
+def _synthesize_routed(candidates: List[str], text: str, voice: str, emotion: str, rate: int) -> Tuple[str, SynthesisResult]:
+    """Synthesize with the engine picked by the latency-aware router"""
+    mode = "hedged" if ROUTING_MODE == "hedged" else "latency"
+    order = engine_router.rank(candidates, ROUTING_LATENCY_BUDGET)
+    if mode == "hedged" and len(order) > 1:
+        engine_used, result = _synthesize_hedged(order, text, voice, emotion, rate)
+    else:
+        engine_used, result = _synthesize_with_fallback(order, text, voice, emotion, rate)
+    
+    details = result.details + [f"routing: {mode}"]
+    if engine_used != order[0]:
+        details.append(f"preferred: {order[0]}")
+    return engine_used, SynthesisResult(result.audio, result.audio_format, details, result.cached)
+
+
+def _speak_routed(text: str, voice: str, emotion: str, rate: int) -> str:
+    """Speak with the engine picked by the latency-aware router"""
+    candidates = _routing_candidates()
+    if not candidates:
+        return "❌ Error: No TTS engine available"
+    
+    if candidates == ["pyttsx3"] or not GTTS_AVAILABLE:
+        # Nothing to choose between, or no pygame to play rendered audio with
+        return _speak_with_pyttsx3(text, voice, emotion, rate)
+    
+    engine_used, result = _synthesize_routed(candidates, text, voice, emotion, rate)
+    _play_audio(result.audio, result.audio_format, text)
+    logger.info(f"Successfully spoke text with {engine_used} (routed)")
+    return _spoken_message(text, result.details)
+
+
+# Headless synthesis
+def _convert_audio(audio_data: bytes, source_format: str, target_format: str) -> bytes:
+    """Transcode audio with ffmpeg when the engine's native format isn't the one requested"""
+    if source_format == target_format:
+        return bytes(audio_data)
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise RuntimeError(f"converting {source_format} to {target_format} requires ffmpeg")
+    completed = subprocess.run(
+        [ffmpeg, "-loglevel", "error", "-f", source_format, "-i", "pipe:0", "-f", target_format, "pipe:1"],
+        input=bytes(audio_data),
+        capture_output=True,
+        timeout=60,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {completed.stderr.decode(errors='replace').strip()}")
+    return completed.stdout
+
+
+@_traced("output.write")
+def _write_output_file(audio_data: bytes, audio_format: str) -> str:
+    """Store audio in the managed output directory and return its path
+    
+    Files are named by content hash, so repeated phrases reuse one file, and
+    only the OUTPUT_MAX_FILES most recently written files are kept.
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(OUTPUT_DIR, f"{hashlib.sha256(audio_data).hexdigest()[:32]}.{audio_format}")
+    if os.path.exists(path):
+        os.utime(path)
+    else:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(audio_data)
+        os.replace(tmp_path, path)
+    _prune_output_dir()
+    return path
+
+
+def _prune_output_dir() -> None:
+    entries = [entry for entry in os.scandir(OUTPUT_DIR) if entry.is_file() and not entry.name.endswith(".tmp")]
+    if len(entries) <= OUTPUT_MAX_FILES:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries[:len(entries) - OUTPUT_MAX_FILES]:
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            pass  # Pruned by another call
+
+
+def _synthesize_for_tool(engine_name: str, text: str, voice: str, emotion: str, rate: int) -> SynthesisResult:
+    """Synthesize with the requested engine, falling back while its circuit breaker is open"""
+    if engine_name == "auto":
+        candidates = _routing_candidates()
+        if not candidates:
+            raise RuntimeError("No TTS engine available")
+        return _synthesize_routed(candidates, text, voice, emotion, rate)[1]
+    try:
+        return _synthesize(engine_name, text, voice, emotion, rate)
+    except CircuitOpenError:
+        if not FALLBACK_ENGINE or FALLBACK_ENGINE == engine_name or not _get_engine(FALLBACK_ENGINE):
+            raise
+        _circuit_breakers[engine_name].note_fallback()
+        result = _synthesize(FALLBACK_ENGINE, text, voice, emotion, rate)
+        result.details.append(f"fallback: {engine_name} unavailable")
+        return result
+
+
+@_threaded_tool()
+def synthesize(text: str, voice: str = None, emotion: str = None, rate: int = 150, engine: str = None,
+               audio_format: str = None, output: str = "path", timing: bool = False) -> str:
+    """Render text to audio without playing it, for hosts with no audio device
+    
+    Args:
+        text: The text to synthesize
+        voice: Specific voice name to use (same as speak)
+        emotion: Emotion/vibe - "dramatic", "friendly", "professional", "playful", "calm"
+        rate: Speaking rate in words per minute (default: 150, range: 50-400)
+        engine: "pyttsx3", "gtts", "elevenlabs" or "auto" (default: same as speak)
+        audio_format: "mp3", "wav" or "ogg" (default: the engine's native format; converting needs ffmpeg)
+        output: "path" to save into the server's output directory, or "base64" to return the audio inline
+        timing: Add a third "⏱️ Timing:" line with a JSON breakdown of where the call's time went
+    
+    Returns:
+        A summary line, then the file path or the base64-encoded audio on the second line
+    """
+    is_valid, error_msg = validate_speak_input(text, rate)
+    if not is_valid:
+        return f"❌ Error: {error_msg}"
+    if output not in ("path", "base64"):
+        return f"❌ Error: Unknown output '{output}' (choose from path, base64)"
+    if audio_format and audio_format.lower() not in AUDIO_FORMATS:
+        return f"❌ Error: Unknown audio format '{audio_format}' (choose from {', '.join(AUDIO_FORMATS)})"
+    
+    engine_name, error_msg = _resolve_engine(engine)
+    if error_msg:
+        return error_msg
+    
+    _record_stat("active_calls")
+    with _job_scope(text, "synthesize") as job:
+        try:
+            logger.info(f"Synthesizing text: '{text[:50]}...' using {engine_name} ({job.id})")
+            result = _synthesize_for_tool(engine_name, text, voice, emotion, rate)
+            job.check()
+            target_format = audio_format.lower() if audio_format else result.audio_format
+            audio_data = _convert_audio(result.audio, result.audio_format, target_format)
+            
+            details = result.details + [f"format: {target_format}", f"{len(audio_data) // 1024} KB"]
+            if output == "base64":
+                payload = f"🔤 Base64: {base64.b64encode(audio_data).decode('ascii')}"
+            else:
+                payload = f"📁 Path: {_write_output_file(audio_data, target_format)}"
+            response = f"🎼 Synthesized: '{text}' ({', '.join(details)})\n{payload}"
+        except Exception as e:
+            if job.cancelled:
+                response = _cancelled_message(job)
+            else:
+                logger.error(f"Error synthesizing text: {e}")
+                response = f"❌ Error synthesizing text: {e}"
+        finally:
+            _record_stat("active_calls", -1)
+    
+    if response.startswith("⏹️"):
+        _record_stat("cancelled_calls")
+    else:
+        _record_stat("synthesize_errors" if response.startswith("❌") else "synthesize_calls")
+    if timing:
+        response += "\n" + _timing_line(job, engine_name)
+    return response
+
+
+# Template synthesis
+def _template_pieces(template: str, values: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """Fill a template's named slots; returns (full text, pieces to synthesize separately)
+    
+    Fixed fragments and slot values become separate pieces, so fragments
+    are cached once and reused whatever the slots hold. Pieces with nothing
+    speakable in them, like a lone comma, are dropped.
+    """
+    rendered, pieces = [], []
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        chunks = [literal]
+        if field is not None:
+            if not field or field.isdigit():
+                raise ValueError("template slots must be named, like {service}")
+            value = values[field]
+            value = repr(value) if conversion == "r" else value
+            chunks.append(format(value, spec or ""))
+        for chunk in chunks:
+            rendered.append(chunk)
+            if any(ch.isalnum() for ch in chunk):
+                pieces.append(chunk.strip())
+    return "".join(rendered).strip(), pieces
+
+
+def _template_clip(result: "SynthesisResult") -> Tuple[bytes, str]:
+    """A piece's audio with its silent edges trimmed, so stitched pieces flow like one utterance"""
+    if TRIM_SILENCE:
+        return result.audio, result.audio_format  # Already trimmed by _synthesize
+    trimmed = _cached_postprocess(
+        "trim", result, lambda: _trim_silence(result.audio, result.audio_format),
+        threshold_db=TRIM_THRESHOLD_DB, pad_ms=TRIM_PAD_MS,
+    )
+    return trimmed, "wav"
+
+
+def _stitch_clips(clips: List[Tuple[bytes, str]], crossfade_ms: int = None) -> bytes:
+    """Join clips into one 16-bit WAV, overlapping each join with an equal-power crossfade
+    
+    Clips are converted to the first clip's sample rate and channel count.
+    Each clip gets a single gain envelope (sine fade-in, cosine fade-out)
+    and is added into the output at its offset.
+    """
+    crossfade_ms = TEMPLATE_CROSSFADE_MS if crossfade_ms is None else crossfade_ms
+    segments = []
+    sample_rate = channels = None
+    for audio_data, audio_format in clips:
+        frames, clip_rate, clip_channels = _decode_pcm(audio_data, audio_format)
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+        samples = samples[:len(samples) - len(samples) % clip_channels].reshape(-1, clip_channels)
+        if sample_rate is None:
+            sample_rate, channels = clip_rate, clip_channels
+        if clip_channels != channels:
+            samples = np.repeat(samples.mean(axis=1, keepdims=True), channels, axis=1)
+        if clip_rate != sample_rate and len(samples):
+            positions = np.arange(int(len(samples) * sample_rate / clip_rate)) * clip_rate / sample_rate
+            samples = np.stack([np.interp(positions, np.arange(len(samples)), samples[:, channel])
+                                for channel in range(channels)], axis=1).astype(np.float32)
+        segments.append(samples)
+    
+    fade = sample_rate * crossfade_ms // 1000
+    overlaps = [min(fade, len(previous), len(current)) for previous, current in zip(segments, segments[1:])]
+    lengths = np.array([len(segment) for segment in segments])
+    starts = np.concatenate(([0], np.cumsum(lengths[:-1]) - np.cumsum(overlaps, dtype=int)))
+    output = np.zeros((int(starts[-1] + lengths[-1]), channels), dtype=np.float32)
+    for index, (segment, start) in enumerate(zip(segments, starts)):
+        gain = np.ones(len(segment), dtype=np.float32)
+        fade_in = overlaps[index - 1] if index > 0 else 0
+        fade_out = overlaps[index] if index < len(overlaps) else 0
+        if fade_in:
+            gain[:fade_in] = np.sin(np.linspace(0, np.pi / 2, fade_in))
+        if fade_out:
+            gain[len(gain) - fade_out:] *= np.cos(np.linspace(0, np.pi / 2, fade_out))
+        output[start:start + len(segment)] += segment * gain[:, None]
+    pcm = np.clip(np.round(output * 32768.0), -32768, 32767).astype("<i2")
+    return _pcm_to_wav(pcm.tobytes(), sample_rate, channels)
+
+
+def _speak_template_pieces(engine_name: str, text: str, pieces: List[str], voice: str, emotion: str, rate: int) -> str:
+    results = []
+    for piece in pieces:
+        if engine_name == "auto":
+            # Route the first piece, then keep its engine so the whole utterance has one voice
+            engine_name, result = _synthesize_routed(_routing_candidates(), piece, voice, emotion, rate)
+        else:
+            result = _synthesize(engine_name, piece, voice, emotion, rate)
+        results.append(result)
+    
+    _play_audio(_stitch_clips([_template_clip(result) for result in results]), "wav", text)
+    cached = sum(result.cached for result in results)
+    details = [detail for detail in results[0].details if not detail.startswith(("cache:", "trimmed:"))]
+    details.append(f"fragments: {cached}/{len(results)} cached")
+    logger.info(f"Spoke template with {engine_name}, {cached}/{len(results)} fragments from cache")
+    return _spoken_message(text, details)
+
+
+@_threaded_tool()
+def speak_template(template: str, values: Dict[str, Any], voice: str = None, emotion: str = None,
+                   rate: int = 150, engine: str = None) -> str:
+    """Speak a template with named slots, e.g. "Deploy of {service} finished in {seconds} seconds"
+    
+    The fixed words are cached once per voice and emotion and only the slot values are
+    synthesized, so repeated announcements with changing values start quickly.
+    
+    Args:
+        template: Text with named {slots}; format specs like {seconds:.1f} are allowed
+        values: Value for each slot, e.g. {"service": "billing", "seconds": 42}
+        voice: Specific voice name to use
+        emotion: Emotion/vibe, as for speak
+        rate: Speaking rate in words per minute (default: 150, range: 50-400)
+        engine: Engine for this call, as for speak
+    
+    Returns:
+        Confirmation message with the spoken text and how many fragments came from the cache
+    """
+    try:
+        text, pieces = _template_pieces(template, values or {})
+    except KeyError as e:
+        return f"❌ Error: No value for template slot {e}"
+    except ValueError as e:
+        return f"❌ Error: Invalid template: {e}"
+    
+    is_valid, error_msg = validate_speak_input(text, rate)
+    if not is_valid:
+        return f"❌ Error: {error_msg}"
+    if not NUMPY_AVAILABLE or len(pieces) < 2:
+        # Stitching needs NumPy; without it (or with nothing to stitch) speak the text whole
+        return speak(text, voice, emotion, rate, engine)
+    
+    engine_name, error_msg = _resolve_engine(engine)
+    if error_msg:
+        return error_msg
+    
+    _record_stat("active_calls")
+    with _job_scope(text, "speak_template") as job:
+        try:
+            try:
+                result = _speak_template_pieces(engine_name, text, pieces, voice, emotion, rate)
+            except CircuitOpenError:
+                result = _speak_with_fallback(engine_name, text, voice, emotion, rate)
+        except Exception as e:
+            if job.cancelled:
+                result = _cancelled_message(job)
+            else:
+                error_msg = f"Error speaking template: {str(e)}"
+                logger.error(error_msg)
+                result = f"❌ {error_msg}"
+        finally:
+            _record_stat("active_calls", -1)
+    
+    if result.startswith("⏹️"):
+        _record_stat("cancelled_calls")
+    else:
+        _record_stat("speak_errors" if result.startswith("❌") else "speak_calls")
+    return result
+
+
+# Speculative prefetch
+def _cache_item(item: Union[str, Dict[str, Any]], engine: str = None) -> Tuple[Optional[dict], Optional[str]]:
+    """Validate one line to synthesize ahead of time; returns (item, reason it was skipped)"""
+    if isinstance(item, str):
+        item = {"text": item}
+    text = item.get("text", "")
+    rate = item.get("rate", 150)
+    is_valid, error_msg = validate_speak_input(text, rate)
+    if not is_valid:
+        return None, f"'{text}': {error_msg}"
+    engine_name, error_msg = _resolve_engine(item.get("engine", engine))
+    if error_msg:
+        return None, f"'{text}': {error_msg.removeprefix('❌ Error: ')}"
+    if engine_name == "pyttsx3" and output_sink.is_device and not _playback_daemon_enabled():
+        # pyttsx3 speaks straight to the device, so there is no audio to prepare
+        return None, f"'{text}': pyttsx3 speaks directly to the audio device"
+    return {"engine": engine_name, "text": text, "voice": item.get("voice"),
+            "emotion": item.get("emotion"), "rate": rate}, None
+
+
+def _synthesize_into_cache(item: dict) -> Tuple[List[Tuple[str, int]], bool]:
+    """Synthesize an item for its side effect on the cache
+    
+    Returns the (key, size) entries it created and whether its audio was
+    found in the cache index.
+    """
+    writes = []
+    token = _cache_writes.set(writes)
+    try:
+        if item["engine"] == "auto":
+            _, result = _synthesize_routed(_routing_candidates(), item["text"], item["voice"], item["emotion"],
+                                           item["rate"])
+        else:
+            result = _synthesize(item["engine"], item["text"], item["voice"], item["emotion"], item["rate"])
+    finally:
+        _cache_writes.reset(token)
+    return writes, result.cached
+
+
+def _wait_for_idle(engine_name: str) -> None:
+    """Give way to foreground calls waiting for the engine"""
+    limiter = _synthesis_limits.get(engine_name)
+    while limiter is not None and (limiter.waiting or limiter.active >= limiter.limit):
+        time.sleep(0.05)
+
+
+class Prefetcher:
+    """Synthesizes lines an agent expects to speak soon, in the background
     
-    if not isinstance(rate, (int, float)):
-        return False, "Rate must be a number"
+    Items are synthesized one at a time on a worker thread that yields to
+    foreground calls: it only starts an item once nobody is waiting for that
+    engine. The audio lands in the shared cache, so a later speak() with the
+    same parameters is a cache hit and plays straight away. Cache entries a
+    prefetch created are tracked until they are first read; unread ones are
+    dropped after ttl seconds, or oldest first once they exceed max_bytes.
+    """
     
-    if rate < RATE_CONFIG["min_rate"] or rate > RATE_CONFIG["max_rate"]:
-        return False, f"Rate must be between {RATE_CONFIG['min_rate']} and {RATE_CONFIG['max_rate']} wpm"
+    def __init__(self, max_bytes: int = PREFETCH_MAX_BYTES, ttl: float = PREFETCH_TTL,
+                 max_queue: int = PREFETCH_MAX_QUEUE):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._queue = collections.deque()
+        self._entries: "collections.OrderedDict[str, Tuple[int, float]]" = collections.OrderedDict()
+        self._thread = None
+        self._busy = False
+        self.stats = {"prefetched": 0, "failed": 0, "used": 0, "expired": 0, "evicted": 0}
     
-    return True, ""
-
-
-def calculate_emotion_rate(base_rate: int, emotion: str) -> int:
-    """Calculate speaking rate based on emotion using configurable multipliers"""
-    if not emotion or emotion.lower() not in RATE_CONFIG["emotion_multipliers"]:
-        return base_rate
+    def submit(self, items: List[dict]) -> int:
+        """Queue items (engine, text, voice, emotion, rate); returns how many fit in the queue"""
+        with self._cond:
+            accepted = items[:max(0, self.max_queue - len(self._queue))]
+            self._queue.extend(accepted)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return len(accepted)
     
-    multiplier = RATE_CONFIG["emotion_multipliers"][emotion.lower()]
-    adjusted_rate = int(base_rate * multiplier)
+    def describe(self) -> str:
+        with self._cond:
+            queued = len(self._queue)
+            ready = len(self._entries)
+            ready_bytes = sum(size for size, _ in self._entries.values())
+        return (
+            f"{queued} queued, {ready} unplayed ({ready_bytes // 1024} of {self.max_bytes // 1024} KB), "
+            f"{self.stats['used']} used, {self.stats['expired'] + self.stats['evicted']} dropped, "
+            f"{self.stats['failed']} failed"
+        )
     
-    # Ensure rate stays within bounds
-    return max(RATE_CONFIG["min_rate"], min(RATE_CONFIG["max_rate"], adjusted_rate))
+    def sweep(self) -> None:
+        """Stop tracking entries that have been played, and drop expired or over-budget ones"""
+        if audio_cache is None:
+            return
+        with self._cond:
+            keys = list(self._entries)
+        try:
+            unused = audio_cache.unused(keys)
+        except sqlite3.Error as e:
+            logger.warning(f"Prefetch sweep failed: {e}")
+            return
+        
+        expired, evicted = [], []
+        with self._cond:
+            for key in keys:
+                if key not in unused and self._entries.pop(key, None) is not None:
+                    self.stats["used"] += 1
+            cutoff = time.time() - self.ttl
+            for key, (_, created) in list(self._entries.items()):
+                if created < cutoff:
+                    expired.append(key)
+                    del self._entries[key]
+            total = sum(size for size, _ in self._entries.values())
+            while total > self.max_bytes and self._entries:
+                key, (size, _) = self._entries.popitem(last=False)
+                evicted.append(key)
+                total -= size
+            self.stats["expired"] += len(expired)
+            self.stats["evicted"] += len(evicted)
+        if expired or evicted:
+            audio_cache.discard(expired + evicted)
+    
+    def _next_expiry(self) -> Optional[float]:
+        if not self._entries:
+            return None
+        _, created = next(iter(self._entries.values()))
+        return max(0.0, created + self.ttl - time.time())
+    
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    timeout = self._next_expiry()
+                    self._cond.wait(timeout=timeout)
+                    if not self._queue:
+                        break
+                item = self._queue.popleft() if self._queue else None
+                self._busy = item is not None
+            if item is not None:
+                _wait_for_idle(item["engine"])
+                self._prefetch(item)
+            self.sweep()
+            self._busy = False
+    
+    def _prefetch(self, item: dict) -> None:
+        try:
+            writes, _ = _synthesize_into_cache(item)
+        except Exception as e:
+            logger.warning(f"Prefetch of '{item['text'][:50]}' failed: {e}")
+            self.stats["failed"] += 1
+            return
+        
+        now = time.time()
+        with self._cond:
+            for key, size in writes:
+                self._entries[key] = (size, now)
+            self.stats["prefetched"] += 1
+        logger.info(f"Prefetched '{item['text'][:50]}' with {item['engine']}")
 
 
-# Unified text-to-speech tool
-@mcp.tool()
-def speak(text: str, voice: str = None, emotion: str = None, rate: int = 150) -> str:
-    """Speak text aloud with optional voice and emotion control
+prefetcher = Prefetcher()
+
+
+@_threaded_tool()
+def prefetch(items: List[Union[str, Dict[str, Any]]], engine: str = None) -> str:
+    """Synthesize lines you expect to speak soon in the background, so a later speak() plays instantly
+    
+    Use it for likely follow-ups, e.g. prefetch(["Tests passed", "Tests failed"]) while tests run.
+    Nothing is played. Prefetched audio that is never spoken expires after a while.
     
     Args:
-        text: The text to speak (KEEP IT SHORT! Aim for under 10 words for best results)
-        voice: Specific voice name to use (e.g. "Fred", "Alex", "Samantha")
-        emotion: Emotion/vibe - "dramatic", "friendly", "professional", "playful", "calm"
-        rate: Speaking rate in words per minute (default: 150, range: 50-400)
+        items: Lines to prepare - plain text, or objects with "text" and optional "voice", "emotion",
+            "rate" and "engine", which must match the later speak() call
+        engine: Engine for items that don't name one (default: same as speak)
     
     Returns:
-        Confirmation message about what was spoken, including engine used
-    
-    Note: Shorter is better! Use brief phrases (under 10 words) for optimal speech flow.
+        How many lines were queued for prefetching
     """
-    # Validate inputs
-    is_valid, error_msg = validate_speak_input(text, rate)
-    if not is_valid:
-        logger.warning(f"Invalid input for speak function: {error_msg}")
-        return f"❌ Error: {error_msg}"
+    if audio_cache is None:
+        return "❌ Error: Prefetching needs the synthesis cache (VOCALIZE_CACHE is disabled)"
+    if not items:
+        return "❌ Error: No items to prefetch"
     
-    if not tts_engine:
-        logger.error("TTS engine not available")
-        return "❌ Error: Text-to-speech engine not available"
+    queued, skipped = [], []
+    for item in items:
+        prepared, reason = _cache_item(item, engine)
+        if prepared is None:
+            skipped.append(reason)
+        else:
+            queued.append(prepared)
     
-    # Use thread lock to ensure thread safety
-    with tts_lock:
-        try:
-            logger.info(f"Speaking text: '{text[:50]}...' with emotion='{emotion}', voice='{voice}', rate={rate} using {TTS_ENGINE}")
-            
-            if TTS_ENGINE == "pyttsx3":
-                return _speak_with_pyttsx3(text, voice, emotion, rate)
-            elif TTS_ENGINE == "gtts":
-                return _speak_with_gtts(text, voice, emotion, rate)
-            elif TTS_ENGINE == "elevenlabs":
-                return _speak_with_elevenlabs(text, voice, emotion, rate)
-            else:
-                return "❌ Error: No TTS engine available"
-            
-        except Exception as e:
-            error_msg = f"Error speaking text: {str(e)}"
-            logger.error(error_msg)
-            return f"❌ {error_msg}"
+    accepted = prefetcher.submit(queued)
+    skipped.extend(f"'{item['text']}': prefetch queue full" for item in queued[accepted:])
+    lines = [f"🔮 Prefetching {accepted} line{'s' if accepted != 1 else ''} in the background"]
+    lines.extend(f"⏭️ Skipped {reason}" for reason in skipped)
+    return "\n".join(lines)
 
 
-def _speak_with_pyttsx3(text: str, voice: str, emotion: str, rate: int) -> str:
-    """Speak using pyttsx3 engine"""
-    # Find appropriate voice based on voice name or emotion
-    voice_index = find_voice_by_emotion_and_name(emotion, voice)
+# Startup cache warm-up
+def _load_warmup_manifest(path: str) -> List[dict]:
+    """Read a warm-up manifest and expand it into one item per text, emotion and voice
     
-    if _available_voices and voice_index < len(_available_voices):
-        tts_engine.setProperty('voice', _available_voices[voice_index].id)
-        voice_used = _available_voices[voice_index].name
-        logger.debug(f"Using voice: {voice_used} (index: {voice_index})")
-    else:
-        voice_used = "default"
-        logger.warning("Could not find requested voice, using default")
+    A .json manifest is a list whose entries are either a phrase or an object
+    with "text" (a phrase or list of phrases) and optional "emotions", "voices",
+    "rate" and "engine". Any other file is read as one phrase per line.
+    """
+    with open(path, encoding="utf-8") as f:
+        if not path.endswith(".json"):
+            return [{"text": line.strip()} for line in f if line.strip()]
+        entries = json.load(f)
     
-    # Calculate final rate based on emotion
-    final_rate = calculate_emotion_rate(rate, emotion)
-    tts_engine.setProperty('rate', final_rate)
+    items = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"text": entry}
+        texts = entry.get("text", "")
+        texts = [texts] if isinstance(texts, str) else texts
+        for text in texts:
+            for emotion in entry.get("emotions") or [None]:
+                for voice in entry.get("voices") or [None]:
+                    item = {"text": text, "emotion": emotion, "voice": voice, "rate": entry.get("rate", 150)}
+                    if entry.get("engine"):
+                        item["engine"] = entry["engine"]
+                    items.append(item)
+    return items
+
+
+class CacheWarmer:
+    """Synthesizes a manifest of common phrases into the cache after startup
     
-    # Speak the text
-    tts_engine.say(text)
-    tts_engine.runAndWait()
+    Phrases run on a small thread pool, start no faster than rate per second
+    and give way to foreground calls, so warming never delays real speech.
+    Progress is reported in server_status; state becomes "complete" once
+    every phrase has been tried.
+    """
     
-    # Build response message
-    details = ["engine: pyttsx3"]  # Engine first for visibility
-    if emotion:
-        details.append(f"emotion: {emotion}")
-    if voice:
-        details.append(f"voice: {voice_used}")
-    details.append(f"rate: {final_rate} wpm")
+    def __init__(self, items: List[dict], concurrency: int = WARMUP_CONCURRENCY, rate: float = WARMUP_RATE):
+        self.items = items
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.state = "pending"
+        self.started: Optional[float] = None
+        self.elapsed: Optional[float] = None
+        self.counts = {"synthesized": 0, "cached": 0, "failed": 0, "skipped": 0}
+        self._lock = threading.Lock()
     
-    detail_str = f" ({', '.join(details)})" if details else ""
-    success_msg = f"🗣️ Spoke: '{text}'{detail_str}"
-    logger.info("Successfully spoke text with pyttsx3")
-    return success_msg
+    @property
+    def done(self) -> int:
+        return sum(self.counts.values())
+    
+    def start(self) -> None:
+        threading.Thread(target=self.run, name="cache-warmup", daemon=True).start()
+    
+    def run(self) -> None:
+        self.state = "warming"
+        self.started = time.perf_counter()
+        interval = 1 / self.rate if self.rate > 0 else 0
+        next_start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="cache-warmup") as pool:
+            slots = threading.BoundedSemaphore(self.concurrency)
+            for item in self.items:
+                prepared, reason = _cache_item(item)
+                if prepared is None:
+                    logger.warning(f"Skipping warm-up phrase {reason}")
+                    self._count("skipped")
+                    continue
+                time.sleep(max(0.0, next_start - time.monotonic()))
+                next_start = time.monotonic() + interval
+                slots.acquire()
+                future = pool.submit(self._warm, prepared)
+                future.add_done_callback(lambda _: slots.release())
+        self.elapsed = time.perf_counter() - self.started
+        self.state = "complete"
+        logger.info(f"Cache warm-up complete: {self.describe()}")
+    
+    def _warm(self, item: dict) -> None:
+        _wait_for_idle(item["engine"])
+        try:
+            writes, cached = _synthesize_into_cache(item)
+        except Exception as e:
+            logger.warning(f"Warm-up of '{item['text'][:50]}' failed: {e}")
+            self._count("failed")
+            return
+        if writes:
+            self._count("synthesized")
+        elif cached:
+            self._count("cached")
+        else:
+            # Synthesized, but nothing reached the cache index, so warming it did nothing
+            logger.warning(f"Warm-up of '{item['text'][:50]}' was not stored in the cache")
+            self._count("failed")
+    
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.counts[outcome] += 1
+    
+    def describe(self) -> str:
+        counts = self.counts
+        timing = f" in {self.elapsed:.1f}s" if self.elapsed is not None else ""
+        return (
+            f"{self.state}, {self.done}/{len(self.items)} phrases{timing} ({counts['synthesized']} synthesized, "
+            f"{counts['cached']} already cached, {counts['failed']} failed, {counts['skipped']} skipped)"
+        )
 
 
-def _speak_with_gtts(text: str, voice: str, emotion: str, rate: int) -> str:
-    """Speak using gTTS engine"""
+cache_warmer: Optional[CacheWarmer] = None
+
+
+def _start_cache_warmup(path: str) -> None:
+    """Warm the cache from a manifest in the background; problems are logged, never fatal"""
+    global cache_warmer
+    if audio_cache is None:
+        logger.warning("Ignoring warm-up manifest because the synthesis cache is disabled")
+        return
     try:
-        # For gTTS, we'll use different languages/accents to simulate voice variety
-        lang = 'en'
-        tld = 'com'  # Default to US English
-        
-        # Map emotions to different accents/languages for variety
-        if emotion == "dramatic":
-            tld = 'co.uk'  # British English for dramatic effect
-        elif emotion == "friendly":
-            tld = 'com.au'  # Australian English for friendly
-        elif emotion == "professional":
-            tld = 'com'  # US English for professional
-        elif emotion == "playful":
-            tld = 'ca'  # Canadian English for playful
-        elif emotion == "calm":
-            tld = 'co.uk'  # British English for calm
-            
-        # Create gTTS object
-        tts = gTTS(text=text, lang=lang, tld=tld, slow=False)
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-            tts.save(tmp_file.name)
-            tmp_file_path = tmp_file.name
-        
-        # Play using pygame
-        pygame.mixer.music.load(tmp_file_path)
-        pygame.mixer.music.play()
-        
-        # Wait for playback to complete
-        while pygame.mixer.music.get_busy():
-            pygame.time.wait(100)
-        
-        # Clean up temporary file
-        os.unlink(tmp_file_path)
-        
-        # Build response message
-        details = ["engine: gTTS"]  # Engine first for visibility
-        if emotion:
-            details.append(f"emotion: {emotion}")
-        if voice:
-            details.append(f"voice: {voice}")
-        details.append(f"accent: {tld}")
-        
-        detail_str = f" ({', '.join(details)})" if details else ""
-        success_msg = f"🗣️ Spoke: '{text}'{detail_str}"
-        logger.info("Successfully spoke text with gTTS")
-        return success_msg
-        
+        items = _load_warmup_manifest(path)
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        logger.error(f"Failed to read warm-up manifest {path}: {e}")
+        return
+    cache_warmer = CacheWarmer(items)
+    cache_warmer.start()
+    logger.info(f"Warming the cache with {len(items)} phrases from {path}")
+
+
+# Bulk offline rendering
+_render_worker_engine = None
+
+
+def _render_worker_init() -> None:
+    """Create this worker process's own pyttsx3 engine and voice cache"""
+    global _render_worker_engine
+    _render_worker_engine = pyttsx3.init()
+    initialize_voice_cache(_render_worker_engine)
+
+
+def _render_worker(job: tuple) -> Tuple[int, Optional[str], Optional[str]]:
+    """Render one phrase to its WAV file; returns (index, path, error)"""
+    index, text, voice, emotion, rate, path = job
+    try:
+        _pyttsx3_say(_render_worker_engine, text, voice, emotion, rate, output_path=path)
+        return index, path, None
     except Exception as e:
-        raise Exception(f"gTTS error: {str(e)}")
+        return index, None, str(e)
 
 
-def _speak_with_elevenlabs(text: str, voice: str, emotion: str, rate: int) -> str:
-    """Speak using ElevenLabs engine"""
+_render_spawn_lock = threading.Lock()
+
+
+class _RenderWorkerProcess(multiprocessing.context.SpawnProcess):
+    """Spawned process started with _RENDER_WORKER_ENV set, so importing this module skips server startup"""
+    
+    def start(self) -> None:
+        # The child inherits the environment when it is spawned; the parent's is restored straight after
+        with _render_spawn_lock:
+            os.environ[_RENDER_WORKER_ENV] = "1"
+            try:
+                super().start()
+            finally:
+                del os.environ[_RENDER_WORKER_ENV]
+
+
+class _RenderWorkerContext(multiprocessing.context.SpawnContext):
+    Process = _RenderWorkerProcess
+
+
+def _render_pool(workers: int) -> Executor:
+    # spawn, not fork: the parent holds engine, cache and event-loop threads that must not be copied
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_RenderWorkerContext(),
+        initializer=_render_worker_init,
+    )
+
+
+def _render_batch(texts: List[str], output_dir: str, voice: str = None, emotion: str = None, rate: int = 150,
+                 workers: int = None, progress: Callable[[int, int], None] = None) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Render many phrases to WAV files across a pool of pyttsx3 processes
+    
+    A single pyttsx3 engine renders one utterance at a time on one core, so
+    bulk jobs fan out to worker processes that each own an engine and use
+    save_to_file. Files are numbered by input position, results come back
+    in input order as (path, error) pairs, and progress(done, total) is
+    called as each phrase finishes.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    width = max(5, len(str(len(texts))))
+    jobs = [
+        (index, text, voice, emotion, rate, os.path.join(output_dir, f"{index:0{width}d}.wav"))
+        for index, text in enumerate(texts)
+    ]
+    results: List[Tuple[Optional[str], Optional[str]]] = [(None, None)] * len(jobs)
+    if not jobs:
+        return results
+    
+    workers = max(1, min(workers or RENDER_WORKERS, len(jobs)))
+    logger.info(f"Rendering {len(jobs)} phrases with {workers} pyttsx3 worker processes")
+    with _render_pool(workers) as pool:
+        futures = [pool.submit(_render_worker, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            index, path, error = future.result()
+            results[index] = (path, error)
+            if progress is not None:
+                progress(done, len(jobs))
+    return results
+
+
+@_threaded_tool()
+def render_batch(texts: List[str], voice: str = None, emotion: str = None, rate: int = 150,
+                 workers: int = None, ctx: Context = None) -> str:
+    """Render many phrases to WAV files in parallel with offline pyttsx3 engines
+    
+    Args:
+        texts: Phrases to render, one file each, in order
+        voice: Specific voice name to use for every phrase
+        emotion: Emotion/vibe applied to every phrase
+        rate: Speaking rate in words per minute (default: 150, range: 50-400)
+        workers: Worker processes to use (default: one per CPU core)
+    
+    Returns:
+        The output directory, then one line per phrase with its file path or error
+    """
+    if not texts:
+        return "❌ Error: No texts to render"
+    for text in texts:
+        is_valid, error_msg = validate_speak_input(text, rate)
+        if not is_valid:
+            return f"❌ Error: {error_msg}"
+    
+    def report(done: int, total: int) -> None:
+        if ctx is not None:
+            anyio.from_thread.run(ctx.report_progress, done, total)
+    
+    output_dir = os.path.join(OUTPUT_DIR, f"batch-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
     try:
-        # Use the configured voice ID or override with voice parameter
-        voice_id = voice if voice else ELEVENLABS_VOICE_ID
-        
-        # Map emotions to voice settings for ElevenLabs
-        # Stability: 0-1 (higher = more stable, lower = more variable)
-        # Similarity: 0-1 (higher = closer to original voice)
-        # Style: 0-1 (emotional range)
-        # Use speaker boost for clarity
-        emotion_settings = {
-            "dramatic": VoiceSettings(stability=0.3, similarity_boost=0.8, style=0.9, use_speaker_boost=True),
-            "friendly": VoiceSettings(stability=0.7, similarity_boost=0.8, style=0.6, use_speaker_boost=True),
-            "professional": VoiceSettings(stability=0.8, similarity_boost=0.9, style=0.3, use_speaker_boost=True),
-            "playful": VoiceSettings(stability=0.4, similarity_boost=0.7, style=0.8, use_speaker_boost=True),
-            "calm": VoiceSettings(stability=0.9, similarity_boost=0.8, style=0.2, use_speaker_boost=True),
-            "cheerful": VoiceSettings(stability=0.5, similarity_boost=0.8, style=0.7, use_speaker_boost=True)
-        }
-        
-        # Get voice settings based on emotion, default to professional
-        voice_settings = emotion_settings.get(emotion, emotion_settings["professional"])
-        
-        # Generate speech using eleven_flash_v2_5 model
-        audio_generator = elevenlabs_client.text_to_speech.convert(
-            text=text,
-            voice_id=voice_id,
-            model_id="eleven_flash_v2_5",
-            voice_settings=voice_settings,
-            output_format="mp3_44100_128"
-        )
-        
-        # Convert generator to bytes
-        audio_data = b"".join(audio_generator)
-        
-        # Save to temporary file and play
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-            tmp_file.write(audio_data)
-            tmp_file_path = tmp_file.name
-        
-        # Initialize pygame mixer if not already done (for ElevenLabs playback)
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
-        
-        # Play using pygame
-        pygame.mixer.music.load(tmp_file_path)
-        pygame.mixer.music.play()
-        
-        # Wait for playback to complete
-        while pygame.mixer.music.get_busy():
-            pygame.time.wait(100)
-        
-        # Clean up temporary file
-        os.unlink(tmp_file_path)
-        
-        # Build response message
-        details = ["engine: ElevenLabs"]  # Engine first for visibility
-        if emotion:
-            details.append(f"emotion: {emotion}")
-        if voice:
-            details.append(f"voice: {voice}")
-        else:
-            details.append(f"voice: {voice_id}")
-        details.append("model: eleven_flash_v2_5")
-        
-        detail_str = f" ({', '.join(details)})" if details else ""
-        success_msg = f"🗣️ Spoke: '{text}'{detail_str}"
-        logger.info("Successfully spoke text with ElevenLabs")
-        return success_msg
-        
+        results = _render_batch(texts, output_dir, voice, emotion, rate, workers, report)
     except Exception as e:
-        raise Exception(f"ElevenLabs error: {str(e)}")
+        logger.error(f"Batch render failed: {e}")
+        return f"❌ Error rendering batch: {e}"
+    
+    failed = sum(1 for _, error in results if error)
+    lines = [f"🏭 Rendered {len(results) - failed}/{len(results)} phrases to {output_dir}"]
+    for index, (path, error) in enumerate(results):
+        lines.append(f"{index}: {path}" if error is None else f"{index}: ❌ {error}")
+    return "\n".join(lines)
 
 
 # Add tool to explore emotional voice options
-@mcp.tool()
+@_threaded_tool()
 def list_emotions() -> str:
     """List available emotion categories for expressive speech
     
@@ -595,7 +4490,7 @@ def list_emotions() -> str:
 
 
 # Add tool to list available voices (simplified for emotion-focused workflow)
-@mcp.tool()
+@_threaded_tool()
 def list_voices() -> str:
     """List available text-to-speech voices with emotion categories
     
@@ -709,7 +4604,7 @@ def list_voices() -> str:
 
 
 # Add comprehensive usage guide for agents
-@mcp.tool()
+@_threaded_tool()
 def voice_guide() -> str:
     """Complete guide for AI agents on using voice capabilities effectively
     
@@ -728,7 +4623,7 @@ def voice_guide() -> str:
         f"🔧 CURRENT ENGINE: {TTS_ENGINE.upper()}",
         "   Set TTS_ENGINE environment variable to 'pyttsx3' or 'gtts' to switch engines",
         "",
-        "🗣️ MAIN FUNCTION: speak(text, voice=None, emotion=None, rate=150)",
+        "🗣️ MAIN FUNCTION: speak(text, voice=None, emotion=None, rate=150, engine=None)",
         "",
         "📋 EMOTION CATEGORIES & WHEN TO USE:",
         "",
@@ -779,6 +4674,8 @@ def voice_guide() -> str:
         "• Specific Voices: speak('Hello!', voice='Fred') - Use named voices for consistency",
         "• Rate Control: speak('Fast update!', emotion='dramatic', rate=200) - Adjust speed",
         "• Voice Override: speak('Special voice', voice='Bad News') - Direct voice selection",
+        "• Engine Override: speak('Offline note', engine='pyttsx3') - Pick the engine for one call",
+        "• Auto Routing: speak('Quick update', engine='auto') - Use the fastest healthy engine",
         "",
         "💡 BEST PRACTICES FOR AI AGENTS:",
         "",
@@ -814,6 +4711,9 @@ def voice_guide() -> str:
         "• list_emotions() - Show all emotion categories with descriptions",
         "• list_voices() - Browse available voices organized by emotion",
         "• voice_guide() - This comprehensive guide",
+        "• server_status() - Engine, transport and playback queue status",
+        "• synthesize(text, ...) - Render audio to a file or base64 without playing it",
+        "• render_batch(texts, ...) - Render many phrases to WAV files in parallel (offline)",
         "",
         "🎯 QUICK REFERENCE:",
         "speak('text')                          # Basic speech",
@@ -828,13 +4728,235 @@ def voice_guide() -> str:
     return "\n".join(guide)
 
 
+# Cancellation tools
+def _audible_job() -> Optional[SpeechJob]:
+    """The job whose audio is playing now: the oldest job that reached the audio device"""
+    with _jobs_lock:
+        return next((job for job in _jobs.values() if job.state == "playing"), None)
+
+
+@_threaded_tool()
+def cancel_speech(job_id: str) -> str:
+    """Cancel a speak or synthesize call, whether it is synthesizing, queued or playing
+    
+    Args:
+        job_id: The job ID shown under "Active jobs" in server_status (e.g. "job-12")
+    
+    Returns:
+        Confirmation that the job was cancelled
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        return f"❌ Error: No active job '{job_id}'"
+    state = job.state
+    if not job.cancel():
+        return f"ℹ️ Job {job_id} is already being cancelled"
+    return f"⏹️ Cancelled {job_id} ({job.tool}, {state}): '{job.text[:50]}'"
+
+
+@_threaded_tool()
+def skip_speech() -> str:
+    """Stop the utterance playing right now; queued utterances continue
+    
+    Returns:
+        Which utterance was skipped
+    """
+    job = _audible_job()
+    if job is None:
+        return "ℹ️ Nothing is playing"
+    job.cancel()
+    return f"⏭️ Skipped {job.id}: '{job.text[:50]}'"
+
+
+@_threaded_tool()
+def flush_speech_queue() -> str:
+    """Cancel every pending speak and synthesize call, leaving the current utterance playing
+    
+    Returns:
+        How many calls were cancelled
+    """
+    audible = _audible_job()
+    with _jobs_lock:
+        jobs = [job for job in _jobs.values() if job is not audible]
+    cancelled = sum(1 for job in jobs if job.cancel())
+    return f"🧹 Flushed {cancelled} queued call{'s' if cancelled != 1 else ''}"
+
+
+# Add tool to report shared server state
+@_threaded_tool()
+def server_status() -> str:
+    """Show engine, transport and playback queue status for this server process
+    
+    Returns:
+        Status summary shared by every client connected to this server
+    """
+    with _stats_lock:
+        stats = dict(_server_stats)
+    
+    transport = stats["transport"]
+    if transport != "stdio":
+        transport = f"{transport} ({mcp.settings.host}:{mcp.settings.port})"
+    
+    status = [
+        "📊 VOCALIZE SERVER STATUS",
+        f"🔌 Transport: {transport}",
+        f"🔧 Engine: {TTS_ENGINE} ({'ready' if tts_engine else 'unavailable'})",
+        f"⏱️ Uptime: {int(time.time() - stats['started_at'])}s",
+        f"🗣️ Speak calls: {stats['speak_calls']} completed, {stats['speak_errors']} failed, {stats['active_calls']} in progress",
+        f"🎼 Synthesize calls: {stats['synthesize_calls']} completed, {stats['synthesize_errors']} failed",
+        f"⏹️ Cancelled calls: {stats['cancelled_calls']}",
+        f"🎧 Playback queue depth: {audio_output_lock.depth}",
+        f"🔊 Output sink: {output_sink.describe()}",
+    ]
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+    if jobs:
+        status.append("🧾 Active jobs (cancel_speech, skip_speech, flush_speech_queue):")
+        for job in jobs:
+            status.append(f"   • {job.id}: {job.tool} {job.state} '{job.text[:40]}'")
+    status.append("⚙️ Synthesis:")
+    for name in SUPPORTED_ENGINES:
+        if name != TTS_ENGINE and name not in _engines:
+            continue
+        state = "ready" if (tts_engine if name == TTS_ENGINE else _engines[name]) else "unavailable"
+        limiter = _synthesis_limits[name]
+        status.append(f"   • {name}: {state}, {limiter.active}/{limiter.limit} synthesizing, {limiter.waiting} waiting")
+    if _pyttsx3_session is not None and _pyttsx3_session.supported:
+        status.append(
+            f"   • pyttsx3 session: {_pyttsx3_session.utterances} utterances, "
+            f"{_pyttsx3_session.property_changes} property changes"
+        )
+    
+    status.append(
+        f"🧭 Routing: {ROUTING_MODE} (budget {ROUTING_LATENCY_BUDGET * 1000:.0f} ms, "
+        f"{engine_router.hedges} hedges, {engine_router.hedge_wins} won by backup)"
+    )
+    for name in SUPPORTED_ENGINES:
+        stats_for_engine = engine_router.snapshot(name)
+        if not stats_for_engine["samples"]:
+            continue
+        p50 = stats_for_engine["p50"]
+        p90 = stats_for_engine["p90"]
+        status.append(
+            f"   • {name}: p50 {p50 * 1000 if p50 is not None else 0:.0f} ms, "
+            f"p90 {p90 * 1000 if p90 is not None else 0:.0f} ms, "
+            f"{stats_for_engine['error_rate']:.0%} errors over {stats_for_engine['samples']} calls"
+        )
+    
+    if standby_engine is not None:
+        warmed = f" in {standby_engine.warm_seconds:.2f}s" if standby_engine.warm_seconds is not None else ""
+        status.append(f"🛟 Standby engine: {standby_engine.engine_name} {standby_engine.state}{warmed}")
+    
+    breakers = [breaker for name, breaker in _circuit_breakers.items() if name == TTS_ENGINE or name in _engines]
+    if breakers:
+        status.append(f"🛡️ Circuit breakers (fallback: {FALLBACK_ENGINE or 'none'}):")
+        for breaker in breakers:
+            status.append(
+                f"   • {breaker.name}: {breaker.state}, {breaker.failures} consecutive failures, "
+                f"{breaker.trips} trips, {breaker.fallbacks} fallbacks"
+            )
+    
+    if _playback_daemon_enabled():
+        try:
+            daemon = _daemon_request({"op": "status"}, timeout=1)
+            status.append(f"🔈 Playback daemon: {PLAYBACK_SOCKET} (queue depth {daemon['queue_depth']}, {daemon['played']} played)")
+        except (OSError, RuntimeError, ValueError, KeyError):
+            status.append(f"🔈 Playback daemon: {PLAYBACK_SOCKET} (not running)")
+    
+    status.append(f"🔮 Prefetch: {prefetcher.describe()}")
+    if cache_warmer is not None:
+        status.append(f"🔥 Cache warm-up: {cache_warmer.describe()}")
+    status.append(f"🧹 Text normalization: {_describe_normalization()}")
+    
+    if audio_cache is not None:
+        try:
+            summary = audio_cache.summary()
+            with audio_cache._stats_lock:
+                cache_stats = dict(audio_cache.stats)
+            status.append(
+                f"💾 Audio cache: {summary['entries']} entries, {summary['bytes'] // 1024} KB live "
+                f"in {summary['segments']} pack segments ({summary['pack_bytes'] // 1024} KB on disk), "
+                f"({cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                f"{cache_stats['shared_waits']} shared waits) at {audio_cache.directory}"
+            )
+        except sqlite3.Error as e:
+            status.append(f"💾 Audio cache: unavailable ({e})")
+    else:
+        status.append("💾 Audio cache: disabled")
+    return "\n".join(status)
+
+
 def main():
     """Main entry point for the vocalize MCP server"""
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="VocalizeAgent MCP server")
+    parser.add_argument("--transport", choices=SUPPORTED_TRANSPORTS, default=SERVER_TRANSPORT,
+                        help="stdio (one process per client) or a network transport shared by many clients")
+    parser.add_argument("--host", default=SERVER_HOST, help="Bind address for network transports")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Port for network transports")
+    parser.add_argument("--playback-daemon", action="store_true",
+                        help="Run the shared local playback daemon instead of the MCP server")
+    parser.add_argument("--socket", default=PLAYBACK_SOCKET, help="Unix socket path for the playback daemon")
+    parser.add_argument("--render-batch", metavar="FILE",
+                        help="Render each non-empty line of FILE to a WAV file with pyttsx3 and exit")
+    parser.add_argument("--output-dir", default="rendered", help="Directory for --render-batch output")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --render-batch")
+    parser.add_argument("--emotion", default=None, help="Emotion for --render-batch")
+    parser.add_argument("--rate", type=int, default=150, help="Speaking rate for --render-batch")
+    args = parser.parse_args()
+    
+    if args.render_batch:
+        with open(args.render_batch, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+        
+        def print_progress(done: int, total: int) -> None:
+            print(f"\rRendered {done}/{total}", end="", file=sys.stderr, flush=True)
+        
+        try:
+            results = _render_batch(texts, args.output_dir, emotion=args.emotion, rate=args.rate,
+                                    workers=args.workers, progress=print_progress)
+        except Exception as e:
+            logger.error(f"Batch render failed: {e}")
+            sys.exit(1)
+        print(file=sys.stderr)
+        failed = [(index, error) for index, (_, error) in enumerate(results) if error]
+        for index, error in failed:
+            logger.error(f"Phrase {index} failed: {error}")
+        print(f"Rendered {len(results) - len(failed)}/{len(results)} phrases to {args.output_dir}")
+        if failed:
+            sys.exit(1)
+        return
+    
+    if args.playback_daemon:
+        if not args.socket:
+            parser.error("--playback-daemon requires --socket or VOCALIZE_PLAYBACK_SOCKET")
+        try:
+            run_playback_daemon(args.socket)
+        except KeyboardInterrupt:
+            logger.info("Playback daemon interrupted by user")
+        except Exception as e:
+            logger.error(f"Playback daemon error: {e}")
+            sys.exit(1)
+        return
+    
+    if args.transport not in SUPPORTED_TRANSPORTS:
+        logger.warning(f"Unknown transport '{args.transport}', using stdio")
+        args.transport = "stdio"
     
-    logger.info("Starting VocalizeAgent MCP server...")
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
+    _server_stats["transport"] = args.transport
+    if WARMUP_MANIFEST:
+        _start_cache_warmup(WARMUP_MANIFEST)
+    
+    if args.transport == "stdio":
+        logger.info("Starting VocalizeAgent MCP server...")
+    else:
+        logger.info(f"Starting VocalizeAgent MCP server on {args.transport} at {args.host}:{args.port} (shared engine and playback queue)")
     try:
-        mcp.run()
+        mcp.run(transport=args.transport)
     except KeyboardInterrupt:
         logger.info("Server interrupted by user")
         sys.exit(0)
@@ -0,0 +1,509 @@
+# ABOUTME: Tests for the shared synthesis cache used by network TTS engines
+# ABOUTME: Covers pack file storage, eviction, compaction, cross-process single-flight, prefetching and startup warm-up
+import json
+import pytest
+import os
+import sqlite3
+import threading
+import time
+from unittest.mock import Mock, patch
+import main
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """A fresh cache in a temporary directory"""
+    return main.AudioCache(str(tmp_path / "cache"), max_bytes=1024 * 1024, wait_timeout=5)
+
+
+class TestAudioCache:
+    """Test basic cache storage"""
+
+    def test_put_and_get(self, cache):
+        """Test that published audio can be read back"""
+        key = main.AudioCache.make_key("gtts", "Hello", tld="com")
+        assert cache.get(key) is None
+
+        cache.put(key, "gtts", b"mp3-bytes")
+
+        assert cache.get(key) == b"mp3-bytes"
+        assert cache.summary()["entries"] == 1
+        assert cache.summary()["bytes"] == 9
+
+    def test_key_depends_on_parameters(self):
+        """Test that different voices or accents never share a cache entry"""
+        base = main.AudioCache.make_key("gtts", "Hello", tld="com")
+        assert base == main.AudioCache.make_key("gtts", "Hello", tld="com")
+        assert base != main.AudioCache.make_key("gtts", "Hello", tld="co.uk")
+        assert base != main.AudioCache.make_key("elevenlabs", "Hello", tld="com")
+
+    def test_clips_share_pack_segments(self, cache):
+        """Test that clips are appended to one pack file instead of a file per clip"""
+        for i in range(10):
+            cache.put(f"key{i}", "gtts", f"clip-{i}".encode())
+
+        packs = os.listdir(os.path.join(cache.directory, "packs"))
+        assert packs == ["segment-000001.pack"]
+        assert cache.get("key7") == b"clip-7"
+        assert cache.summary()["segments"] == 1
+
+    def test_get_returns_zero_copy_view(self, cache):
+        """Test that reads are memoryviews over the mapped segment"""
+        cache.put("k", "gtts", b"audio")
+        view = cache.get("k")
+
+        assert isinstance(view, memoryview)
+        assert bytes(view) == b"audio"
+
+    def test_segments_rotate_when_full(self, tmp_path):
+        """Test that a new segment is started once the active one reaches its size limit"""
+        cache = main.AudioCache(str(tmp_path / "cache"), segment_bytes=250)
+        for i in range(5):
+            cache.put(f"key{i}", "gtts", bytes([i]) * 100)
+
+        assert cache.summary()["segments"] == 3
+        for i in range(5):
+            assert cache.get(f"key{i}") == bytes([i]) * 100
+
+    def test_appends_visible_to_other_instances(self, cache):
+        """Test that a reader with an older mapping sees clips appended later"""
+        other = main.AudioCache(cache.directory)
+        cache.put("first", "gtts", b"one")
+        assert other.get("first") == b"one"
+
+        cache.put("second", "gtts", b"two")
+        assert other.get("second") == b"two"
+
+    def test_eviction_removes_least_recently_used(self, tmp_path):
+        """Test that the cache stays within its size budget"""
+        cache = main.AudioCache(str(tmp_path / "cache"), max_bytes=250)
+        with patch.object(cache, '_schedule_compaction'):
+            for i in range(3):
+                cache.put(f"key{i}", "gtts", b"x" * 100)
+                time.sleep(0.01)
+
+        assert cache.get("key0") is None
+        assert cache.get("key2") == b"x" * 100
+        assert cache.summary()["bytes"] <= 250
+        assert cache.stats["evictions"] == 1
+
+    def test_upgrade_removes_per_clip_files(self, tmp_path):
+        """Test that moving from the one-file-per-clip layout deletes the old clip files"""
+        directory = tmp_path / "cache"
+        (directory / "blobs" / "ab").mkdir(parents=True)
+        (directory / "blobs" / "ab" / "abcdef").write_bytes(b"old clip")
+        sqlite3.connect(str(directory / "index.sqlite3")).execute(
+            "CREATE TABLE entries (key TEXT PRIMARY KEY, engine TEXT, size INTEGER)").connection.close()
+
+        cache = main.AudioCache(str(directory))
+        cache.put("k", "gtts", b"audio")
+
+        assert not (directory / "blobs").exists()
+        assert cache.get("k") == b"audio"
+
+    def test_stats_counted_under_concurrency(self, cache):
+        """Test that hit counts from many threads are not lost"""
+        cache.put("k", "gtts", b"audio")
+
+        def read():
+            for _ in range(50):
+                cache.get_or_create("k", "gtts", Mock(return_value=b"audio"))
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert cache.stats["hits"] == 400
+
+
+class TestCompaction:
+    """Test reclaiming evicted space from pack segments"""
+
+    def test_compaction_reclaims_dead_segments(self, tmp_path):
+        """Test that mostly-dead sealed segments are rewritten and deleted"""
+        cache = main.AudioCache(str(tmp_path / "cache"), segment_bytes=300)
+        with patch.object(cache, '_schedule_compaction'):
+            for i in range(6):
+                cache.put(f"key{i}", "gtts", bytes([i]) * 100)
+        conn = cache._connect()
+        conn.execute("DELETE FROM entries WHERE key IN ('key0', 'key1', 'key3', 'key4')")
+        before = cache.summary()
+
+        reclaimed = cache.compact()
+
+        after = cache.summary()
+        assert reclaimed > 0
+        assert after["pack_bytes"] < before["pack_bytes"]
+        assert cache.get("key2") == bytes([2]) * 100
+        assert cache.get("key5") == bytes([5]) * 100
+        assert cache.stats["compactions"] >= 1
+
+    def test_active_segment_never_compacted(self, cache):
+        """Test that the segment currently receiving appends is left alone"""
+        cache.put("k", "gtts", b"x" * 100)
+        cache._connect().execute("DELETE FROM entries")
+
+        assert cache.compact() == 0
+        assert cache.summary()["segments"] == 1
+
+    def test_eviction_triggers_background_compaction(self, tmp_path):
+        """Test that evicting entries schedules compaction"""
+        cache = main.AudioCache(str(tmp_path / "cache"), max_bytes=150)
+        with patch.object(cache, '_schedule_compaction') as mock_schedule:
+            cache.put("a", "gtts", b"x" * 100)
+            cache.put("b", "gtts", b"x" * 100)
+
+            mock_schedule.assert_called_once()
+
+
+class TestSingleFlight:
+    """Test that identical phrases are synthesized only once"""
+
+    def test_hit_skips_synthesis(self, cache):
+        """Test that a cached phrase is returned without synthesizing"""
+        create = Mock(return_value=b"audio")
+
+        assert cache.get_or_create("k", "gtts", create) == (b"audio", False)
+        assert cache.get_or_create("k", "gtts", create) == (b"audio", True)
+        create.assert_called_once()
+
+    def test_concurrent_threads_share_one_synthesis(self, cache):
+        """Test that threads asking for the same phrase wait for one synthesis"""
+        calls = []
+
+        def slow_create():
+            calls.append(1)
+            time.sleep(0.1)
+            return b"audio"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_create("k", "gtts", slow_create)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert [data for data, _ in results] == [b"audio"] * 5
+        assert sum(1 for _, cached in results if cached) == 4
+
+    def test_waits_for_other_process(self, cache):
+        """Test that a phrase claimed by another live process is awaited, not re-synthesized"""
+        cache._connect().execute(
+            "INSERT INTO inflight (key, owner_pid, started) VALUES (?, ?, ?)", ("k", os.getppid(), time.time())
+        )
+
+        def other_process_finishes():
+            time.sleep(0.1)
+            other = main.AudioCache(cache.directory)
+            other.put("k", "gtts", b"from-other-process")
+            other._connect().execute("DELETE FROM inflight WHERE key = ?", ("k",))
+
+        threading.Thread(target=other_process_finishes).start()
+        create = Mock(return_value=b"duplicate")
+
+        assert cache.get_or_create("k", "gtts", create) == (b"from-other-process", True)
+        create.assert_not_called()
+        assert cache.stats["shared_waits"] == 1
+
+    def test_cancel_while_waiting_for_thread(self, cache):
+        """Test that a call waiting on another thread's synthesis stops when cancelled"""
+        release = threading.Event()
+        leader = threading.Thread(target=lambda: cache.get_or_create("k", "gtts", lambda: release.wait(5) and b"audio"))
+        leader.start()
+        while "k" not in cache._flights:
+            time.sleep(0.005)
+
+        with main._job_scope("Hello", "speak") as job:
+            threading.Timer(0.05, job.cancel).start()
+            start = time.perf_counter()
+            with pytest.raises(main.SpeechCancelled):
+                cache.get_or_create("k", "gtts", Mock(return_value=b"duplicate"))
+        assert time.perf_counter() - start < 0.5
+        release.set()
+        leader.join()
+
+    def test_cancel_while_waiting_for_other_process(self, cache):
+        """Test that a call waiting on another process's claim stops when cancelled"""
+        cache._connect().execute(
+            "INSERT INTO inflight (key, owner_pid, started) VALUES (?, ?, ?)", ("k", os.getppid(), time.time())
+        )
+        create = Mock(return_value=b"duplicate")
+
+        with main._job_scope("Hello", "speak") as job:
+            threading.Timer(0.05, job.cancel).start()
+            start = time.perf_counter()
+            with pytest.raises(main.SpeechCancelled):
+                cache.get_or_create("k", "gtts", create)
+        assert time.perf_counter() - start < 0.5
+        create.assert_not_called()
+        assert "k" not in cache._flights
+
+    def test_stale_claim_is_taken_over(self, cache):
+        """Test that a claim left by a crashed process does not block synthesis"""
+        cache._connect().execute(
+            "INSERT INTO inflight (key, owner_pid, started) VALUES (?, ?, ?)", ("k", 1, time.time() - 3600)
+        )
+        create = Mock(return_value=b"audio")
+
+        assert cache.get_or_create("k", "gtts", create) == (b"audio", False)
+        create.assert_called_once()
+
+    def test_failed_synthesis_releases_claim(self, cache):
+        """Test that errors propagate and do not leave the key claimed"""
+        with pytest.raises(RuntimeError):
+            cache.get_or_create("k", "gtts", Mock(side_effect=RuntimeError("network down")))
+
+        assert cache._connect().execute("SELECT COUNT(*) FROM inflight").fetchone()[0] == 0
+        assert cache.get_or_create("k", "gtts", Mock(return_value=b"audio")) == (b"audio", False)
+
+
+class TestCachedSynthesis:
+    """Test cache integration with the speak path"""
+
+    def test_disabled_cache_always_synthesizes(self):
+        """Test that synthesis runs directly when the cache is disabled"""
+        with patch('main.audio_cache', None):
+            create = Mock(return_value=b"audio")
+            assert main._cached_synthesis("gtts", "Hi", create) == (b"audio", False)
+            assert main._cached_synthesis("gtts", "Hi", create) == (b"audio", False)
+            assert create.call_count == 2
+
+    @pytest.mark.skipif(not main.GTTS_AVAILABLE, reason="gTTS not installed")
+    def test_gtts_repeat_phrase_served_from_cache(self, cache):
+        """Test that speaking the same gTTS phrase twice only calls Google once"""
+        with patch('main.audio_cache', cache), \
+             patch('main.gTTS') as mock_gtts, \
+             patch('main._play_audio') as mock_play:
+            mock_gtts.return_value.write_to_fp.side_effect = lambda fp: fp.write(b"mp3")
+
+            first = main._speak_with_gtts("Build passed", None, "friendly", 150)
+            second = main._speak_with_gtts("Build passed", None, "friendly", 150)
+
+            assert mock_gtts.call_count == 1
+            assert "cache: miss" in first
+            assert "cache: hit" in second
+            assert mock_play.call_count == 2
+
+
+def _cached_gtts(calls):
+    """A gTTS synthesizer that goes through the cache and records each real synthesis"""
+    def synthesize(text, voice, emotion, rate):
+        def create():
+            calls.append(text)
+            return f"mp3:{text}".encode()
+
+        audio, cached = main._cached_synthesis("gtts", text, create, rate=rate)
+        return main.SynthesisResult(audio, "mp3", [f"cache: {'hit' if cached else 'miss'}"], cached)
+    return synthesize
+
+
+def _drain(prefetcher, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while prefetcher._queue or prefetcher._busy:
+        assert time.monotonic() < deadline, "timed out waiting for prefetch"
+        time.sleep(0.01)
+
+
+class TestPrefetch:
+    """Test speculative synthesis of lines an agent expects to speak"""
+
+    @pytest.fixture
+    def prefetching(self, cache):
+        calls = []
+        prefetcher = main.Prefetcher(max_bytes=1024, ttl=60)
+        with patch('main.audio_cache', cache), \
+             patch('main.prefetcher', prefetcher), \
+             patch.dict(main._engines, {"gtts": "gtts"}), \
+             patch.dict(main._SYNTHESIZERS, {"gtts": _cached_gtts(calls)}), \
+             patch('main.engine_router', main.EngineRouter()), \
+             patch('main.TIME_STRETCH', False), \
+             patch('main.TRIM_SILENCE', False), \
+             patch('main.NORMALIZE_TEXT', False):
+            yield prefetcher, calls
+
+    def _prefetch(self, prefetcher, items):
+        result = main.prefetch(items, engine="gtts")
+        _drain(prefetcher)
+        return result
+
+    def test_prefetched_line_speaks_from_cache(self, prefetching):
+        """Test that speak() after prefetch plays without synthesizing again"""
+        prefetcher, calls = prefetching
+        result = self._prefetch(prefetcher, ["Tests passed", {"text": "Tests failed", "rate": 180}])
+
+        assert result == "🔮 Prefetching 2 lines in the background"
+        assert calls == ["Tests passed", "Tests failed"]
+        with patch('main._play_audio') as mock_play:
+            spoken = main.speak("Tests failed", rate=180, engine="gtts")
+
+        assert "cache: hit" in spoken
+        assert calls == ["Tests passed", "Tests failed"]
+        mock_play.assert_called_once()
+
+    def test_used_entries_survive_expiry(self, prefetching, cache):
+        """Test that played lines are kept while unplayed ones expire"""
+        prefetcher, _ = prefetching
+        self._prefetch(prefetcher, ["Played", "Never played"])
+        with patch('main._play_audio'):
+            main.speak("Played", engine="gtts")
+
+        prefetcher.ttl = 0
+        prefetcher.sweep()
+
+        assert prefetcher.stats["used"] == 1
+        assert prefetcher.stats["expired"] == 1
+        assert cache.summary()["entries"] == 1
+        assert cache.get(main.AudioCache.make_key("gtts", "Played", rate=150)) is not None
+
+    def test_budget_evicts_oldest_unplayed(self, prefetching, cache):
+        """Test that unplayed audio over the budget is dropped oldest first"""
+        prefetcher, _ = prefetching
+        prefetcher.max_bytes = 20
+        self._prefetch(prefetcher, ["First line", "Second line", "Third line"])
+
+        assert prefetcher.stats["evicted"] == 2
+        assert cache.get(main.AudioCache.make_key("gtts", "First line", rate=150)) is None
+        assert cache.get(main.AudioCache.make_key("gtts", "Third line", rate=150)) is not None
+
+    def test_yields_to_waiting_calls(self):
+        """Test that prefetching waits while foreground calls queue for the engine"""
+        limiter = main.SynthesisLimiter("gtts", 1)
+        limiter.waiting = 1
+        with patch.dict(main._synthesis_limits, {"gtts": limiter}):
+            threading.Timer(0.1, lambda: setattr(limiter, "waiting", 0)).start()
+            start = time.perf_counter()
+            main._wait_for_idle("gtts")
+
+        assert time.perf_counter() - start >= 0.1
+
+    def test_invalid_items_skipped(self, prefetching):
+        """Test that bad items are reported without blocking the rest"""
+        prefetcher, _ = prefetching
+        result = self._prefetch(prefetcher, ["", {"text": "Hi", "engine": "nope"}, "Fine"])
+
+        lines = result.splitlines()
+        assert lines[0] == "🔮 Prefetching 1 line in the background"
+        assert lines[1] == "⏭️ Skipped '': Text cannot be empty"
+        assert lines[2].startswith("⏭️ Skipped 'Hi': Unknown engine 'nope'")
+        assert "🔮 Prefetch: 0 queued, 1 unplayed" in main.server_status()
+
+    def test_pyttsx3_line_speaks_from_cache(self, cache, fake_pyttsx3):
+        """Test that a prefetched pyttsx3 render is kept and played when the line is spoken"""
+        prefetcher = main.Prefetcher(max_bytes=1 << 20, ttl=60)
+        with patch('main.audio_cache', cache), patch('main.prefetcher', prefetcher):
+            assert main.prefetch(["Tests passed"], engine="pyttsx3") == "🔮 Prefetching 1 line in the background"
+            _drain(prefetcher)
+            spoken = main.speak("Tests passed", engine="pyttsx3")
+            prefetcher.sweep()
+
+        assert fake_pyttsx3 == ["Tests passed"]
+        assert "cache: hit" in spoken
+        assert prefetcher.stats["used"] == 1
+
+    def test_requires_cache(self):
+        """Test that prefetching is refused when the cache is disabled"""
+        with patch('main.audio_cache', None):
+            assert "❌ Error: Prefetching needs the synthesis cache" in main.prefetch(["Hi"])
+
+
+class TestCacheWarmup:
+    """Test warming the cache from a phrase manifest after startup"""
+
+    def test_manifest_expands_text_emotion_voice(self, tmp_path):
+        """Test that JSON entries expand to every text, emotion and voice combination"""
+        path = tmp_path / "warmup.json"
+        path.write_text(json.dumps([
+            "Build passed",
+            {"text": ["Tests failed", "Deploy done"], "emotions": ["calm", "excited"], "engine": "gtts"},
+        ]))
+
+        items = main._load_warmup_manifest(str(path))
+
+        assert items[0] == {"text": "Build passed", "emotion": None, "voice": None, "rate": 150}
+        assert len(items) == 5
+        assert {(item["text"], item["emotion"]) for item in items[1:]} == {
+            ("Tests failed", "calm"), ("Tests failed", "excited"), ("Deploy done", "calm"), ("Deploy done", "excited")}
+        assert all(item["engine"] == "gtts" for item in items[1:])
+
+    def test_plain_manifest_one_phrase_per_line(self, tmp_path):
+        """Test that non-JSON manifests list one phrase per line"""
+        path = tmp_path / "warmup.txt"
+        path.write_text("Hello\n\nGoodbye\n")
+
+        assert [item["text"] for item in main._load_warmup_manifest(str(path))] == ["Hello", "Goodbye"]
+
+    def test_warms_and_reports_progress(self, cache):
+        """Test that phrases are synthesized once and progress reaches complete"""
+        calls = []
+        items = [{"text": "One", "engine": "gtts"}, {"text": "Two", "engine": "gtts"},
+                 {"text": "One", "engine": "gtts"}, {"text": "", "engine": "gtts"}]
+        with patch('main.audio_cache', cache), \
+             patch.dict(main._engines, {"gtts": "gtts"}), \
+             patch.dict(main._SYNTHESIZERS, {"gtts": _cached_gtts(calls)}), \
+             patch('main.engine_router', main.EngineRouter()), \
+             patch('main.TIME_STRETCH', False), \
+             patch('main.TRIM_SILENCE', False), \
+             patch('main.NORMALIZE_TEXT', False):
+            warmer = main.CacheWarmer(items, concurrency=1, rate=0)
+            warmer.start()
+            deadline = time.monotonic() + 2
+            while warmer.state != "complete":
+                assert time.monotonic() < deadline, "timed out waiting for warm-up"
+                time.sleep(0.01)
+
+            with patch('main.cache_warmer', warmer):
+                status = main.server_status()
+
+        assert calls == ["One", "Two"]
+        assert warmer.counts == {"synthesized": 2, "cached": 1, "failed": 0, "skipped": 1}
+        assert "🔥 Cache warm-up: complete, 4/4 phrases in " in status
+
+    def test_pyttsx3_phrases_cached(self, cache, fake_pyttsx3):
+        """Test that pyttsx3 phrases are stored, and only phrases found in the index count as cached"""
+        items = [{"text": "One", "engine": "pyttsx3"}, {"text": "One", "engine": "pyttsx3"}]
+        with patch('main.audio_cache', cache):
+            warmer = main.CacheWarmer(items, concurrency=1, rate=0)
+            warmer.run()
+
+        assert fake_pyttsx3 == ["One"]
+        assert warmer.counts == {"synthesized": 1, "cached": 1, "failed": 0, "skipped": 0}
+
+    def test_uncached_synthesis_not_reported_as_hit(self, cache):
+        """Test that audio which never reached the cache index counts as failed, not cached"""
+        def synthesize(text, voice, emotion, rate):
+            return main.SynthesisResult(b"mp3", "mp3", ["engine: gTTS"])
+
+        with patch('main.audio_cache', cache), \
+             patch.dict(main._engines, {"gtts": "gtts"}), \
+             patch.dict(main._SYNTHESIZERS, {"gtts": synthesize}), \
+             patch('main.engine_router', main.EngineRouter()), \
+             patch('main.TIME_STRETCH', False), \
+             patch('main.TRIM_SILENCE', False):
+            warmer = main.CacheWarmer([{"text": "One", "engine": "gtts"}], concurrency=1, rate=0)
+            warmer.run()
+
+        assert warmer.counts == {"synthesized": 0, "cached": 0, "failed": 1, "skipped": 0}
+
+    def test_rate_limited(self):
+        """Test that phrases start no faster than the configured rate"""
+        items = [{"text": f"Line {i}", "engine": "gtts"} for i in range(3)]
+        with patch.dict(main._engines, {"gtts": "gtts"}), \
+             patch('main._synthesize_into_cache', return_value=([], True)):
+            start = time.perf_counter()
+            main.CacheWarmer(items, concurrency=3, rate=20).run()
+
+        assert time.perf_counter() - start >= 0.1
+
+    def test_unreadable_manifest_is_not_fatal(self, tmp_path, cache):
+        """Test that a missing manifest is logged and warm-up is skipped"""
+        with patch('main.audio_cache', cache), patch('main.cache_warmer', None):
+            main._start_cache_warmup(str(tmp_path / "missing.json"))
+            assert main.cache_warmer is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,211 @@
+# ABOUTME: Tests for cancelling speak and synthesize calls while they are queued, synthesizing or playing
+# ABOUTME: Covers cancellation tokens, the cancel/skip/flush tools, network synthesis and pyttsx3
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+import main
+from conftest import silence
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out waiting for condition"
+        time.sleep(0.005)
+
+
+def _job(text):
+    return next(job for job in list(main._jobs.values()) if job.text == text)
+
+
+@pytest.fixture
+def realtime_gtts(fake_gtts):
+    """gTTS with a fake synthesizer returning one second of audio, played in real time"""
+    def synthesizer(*_):
+        return main.SynthesisResult(silence(1.0), "wav", ["engine: gTTS"])
+
+    fake_gtts(synthesizer, realtime=True)
+
+
+def _speak_in_background(text, results):
+    thread = threading.Thread(target=lambda: results.update({text: main.speak(text, engine="gtts")}))
+    thread.start()
+    _wait_for(lambda: any(job.text == text for job in list(main._jobs.values())))
+    return thread
+
+
+class TestSpeechJob:
+    """Test the cancellation token carried by each call"""
+
+    def test_callbacks_run_once(self):
+        """Test that cancel runs registered callbacks exactly once"""
+        job = main.SpeechJob("job-x", "Hello", "speak")
+        callback = Mock()
+        job.on_cancel(callback)
+
+        assert job.cancel()
+        assert not job.cancel()
+        callback.assert_called_once()
+        with pytest.raises(main.SpeechCancelled):
+            job.check()
+
+    def test_late_callback_runs_immediately(self):
+        """Test that a callback registered after cancellation runs straight away"""
+        job = main.SpeechJob("job-x", "Hello", "speak")
+        job.cancel()
+        callback = Mock()
+        job.on_cancel(callback)
+
+        callback.assert_called_once()
+
+    def test_unregistered_callback_not_run(self):
+        """Test that finished work can stop listening for cancellation"""
+        job = main.SpeechJob("job-x", "Hello", "speak")
+        callback = Mock()
+        job.on_cancel(callback)()
+        job.cancel()
+
+        callback.assert_not_called()
+
+    def test_scope_registers_and_removes_job(self):
+        """Test that a job is current and listed only while its call runs"""
+        with main._job_scope("Hello", "speak") as job:
+            assert main._current_job.get() is job
+            assert main._jobs[job.id] is job
+        assert main._current_job.get() is None
+        assert job.id not in main._jobs
+
+
+class TestCancelTools:
+    """Test cancelling, skipping and flushing speech from MCP tools"""
+
+    def test_cancel_while_playing(self, realtime_gtts):
+        """Test that a playing call stops within milliseconds"""
+        results = {}
+        thread = _speak_in_background("Long readout", results)
+        job = _job("Long readout")
+        _wait_for(lambda: job.state == "playing")
+
+        assert f"{job.id}: speak playing 'Long readout'" in main.server_status()
+        start = time.perf_counter()
+        assert main.cancel_speech(job.id).startswith(f"⏹️ Cancelled {job.id} (speak, playing)")
+        thread.join()
+
+        assert time.perf_counter() - start < 0.1
+        assert results["Long readout"] == f"⏹️ Cancelled: 'Long readout' ({job.id}, while playing)"
+
+    def test_cancel_while_queued(self, realtime_gtts):
+        """Test that a call waiting for the audio device leaves the queue"""
+        results = {}
+        with main.audio_output_lock:
+            thread = _speak_in_background("Waiting", results)
+            job = _job("Waiting")
+            _wait_for(lambda: job.state == "queued" and main.audio_output_lock.depth == 2)
+            main.cancel_speech(job.id)
+            thread.join(timeout=1)
+
+            assert not thread.is_alive()
+            assert main.audio_output_lock.depth == 1
+        assert "while queued" in results["Waiting"]
+
+    def test_skip_then_flush(self, realtime_gtts):
+        """Test that skip stops the current utterance and flush drops the rest"""
+        results = {}
+        threads = [_speak_in_background(text, results) for text in ("One", "Two", "Three")]
+        _wait_for(lambda: _job("One").state == "playing")
+
+        assert main.skip_speech().startswith("⏭️ Skipped")
+        _wait_for(lambda: _job("Two").state == "playing")
+        assert main.flush_speech_queue() == "🧹 Flushed 1 queued call"
+        for thread in threads:
+            thread.join()
+
+        assert results["One"].startswith("⏹️ Cancelled")
+        assert results["Two"].startswith("🗣️ Spoke: 'Two'")
+        assert results["Three"].startswith("⏹️ Cancelled")
+
+    def test_nothing_to_cancel(self):
+        """Test the replies when there is no matching job"""
+        assert "❌ Error: No active job 'job-0'" in main.cancel_speech("job-0")
+        assert main.skip_speech() == "ℹ️ Nothing is playing"
+
+    def test_cancelled_calls_counted(self, realtime_gtts):
+        """Test that cancellations are reported separately from failures"""
+        with patch.dict(main._server_stats, {"cancelled_calls": 0, "speak_errors": 0}):
+            results = {}
+            thread = _speak_in_background("Counted", results)
+            _job("Counted").cancel()
+            thread.join()
+
+            assert main._server_stats["speak_errors"] == 0
+            assert "⏹️ Cancelled calls: 1" in main.server_status()
+
+
+class TestCancellingSynthesis:
+    """Test that cancellation interrupts network synthesis and pyttsx3"""
+
+    def test_stream_closed_on_cancel(self):
+        """Test that a streamed download stops and is closed once cancelled"""
+        closed = threading.Event()
+
+        def stream(job):
+            try:
+                yield b"chunk"
+                job.cancel()
+                yield b"chunk"
+                yield b"never read"
+            finally:
+                closed.set()
+
+        with main._job_scope("Hello", "speak") as job:
+            with pytest.raises(main.SpeechCancelled):
+                main._read_cancellable(stream(job))
+        assert closed.is_set()
+
+    def test_gtts_writes_abort(self):
+        """Test that gTTS output stops being accepted once cancelled"""
+        job = main.SpeechJob("job-x", "Hello", "speak")
+        buffer = main._CancellableBuffer(job)
+        buffer.write(b"mp3")
+        job.cancel()
+
+        with pytest.raises(main.SpeechCancelled):
+            buffer.write(b"more")
+
+    def test_cancellation_not_counted_against_engine(self):
+        """Test that a cancelled call doesn't trip the circuit breaker or routing stats"""
+        breaker = main.CircuitBreaker("gtts", probe=lambda: None, failure_threshold=1)
+        router = main.EngineRouter()
+
+        def cancelled(*_):
+            main._current_job.get().cancel()
+            raise Exception("gTTS error: cancelled")
+
+        with patch.dict(main._circuit_breakers, {"gtts": breaker}), patch('main.engine_router', router), \
+             patch.dict(main._SYNTHESIZERS, {"gtts": cancelled}), main._job_scope("Hello", "speak"):
+            with pytest.raises(Exception):
+                main._synthesize("gtts", "Hello", None, None, 150)
+
+        assert breaker.state == "closed"
+        assert router.snapshot("gtts")["samples"] == 0
+
+    def test_pyttsx3_stopped_on_cancel(self):
+        """Test that runAndWait is interrupted by stopping the engine"""
+        engine = Mock()
+        stopped = threading.Event()
+        engine.stop.side_effect = stopped.set
+        engine.runAndWait.side_effect = lambda: stopped.wait(2)
+
+        with patch('main._get_pyttsx3_session', return_value=None), main._job_scope("Hello", "speak") as job:
+            threading.Timer(0.05, job.cancel).start()
+            start = time.perf_counter()
+            with pytest.raises(main.SpeechCancelled):
+                main._pyttsx3_say(engine, "Hello", None, None, 150)
+
+        assert time.perf_counter() - start < 0.5
+        engine.stop.assert_called_once()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,110 @@
+# ABOUTME: Tests for the stand-in ElevenLabs and gTTS endpoints and for pointing the engines at them
+# ABOUTME: Drives the real elevenlabs SDK and gTTS against a local server on a free port
+import time
+import pytest
+from unittest.mock import patch
+import fake_tts_server
+import main
+from fake_tts_server import FakeTTSOptions, FakeTTSServer
+
+pytestmark = pytest.mark.skipif(not (main.GTTS_AVAILABLE and main.ELEVENLABS_AVAILABLE),
+                                reason="requires gTTS and the elevenlabs SDK")
+
+
+@pytest.fixture
+def endpoints():
+    """Both engines pointed at a stand-in server; yields a function that starts it with options"""
+    servers = []
+
+    def start(**options):
+        server = FakeTTSServer(FakeTTSOptions(**options)).start()
+        servers.append(server)
+        client = main.ElevenLabs(api_key="test-key", timeout=5, base_url=server.url)
+        for patcher in (patch('main.elevenlabs_client', client), patch('main.GTTS_BASE_URL', server.url),
+                        patch.object(main.gtts_tts, '_translate_url', main._gtts_translate_url)):
+            patcher.start()
+        return server
+
+    with patch('main.audio_cache', None):
+        yield start
+        patch.stopall()
+        for server in servers:
+            server.stop()
+
+
+class TestStandInEndpoints:
+    """Test that the SDKs get audio, delays and errors from the stand-in server"""
+
+    def test_elevenlabs_audio(self, endpoints):
+        """Test that text_to_speech.convert streams generated silence sized to the text"""
+        server = endpoints(ms_per_word=500)
+        result = main._synthesize_elevenlabs("Four words of text", None, None, 150)
+
+        assert result.audio[:2] == b"\xff\xfb"
+        assert main._audio_duration(result.audio, "mp3") == pytest.approx(2.0, abs=0.05)
+        assert server.requests["elevenlabs"] == 1
+
+    def test_gtts_canned_audio(self, endpoints):
+        """Test that gTTS decodes the canned MP3 from a batchexecute reply"""
+        canned = fake_tts_server.silent_mp3(0.5)
+        server = endpoints(audio=canned)
+        result = main._synthesize_gtts("Hello there", None, "dramatic", 150)
+
+        assert result.audio == canned
+        assert server.requests["gtts"] == 1
+
+    def test_models_probe(self, endpoints):
+        """Test that the circuit breaker's ElevenLabs probe is answered"""
+        endpoints()
+        main._probe_elevenlabs()
+
+    def test_latency_and_chunk_cadence(self, endpoints):
+        """Test that the first-byte delay and the pause between chunks are applied"""
+        endpoints(latency_ms=100, chunk_bytes=417, chunk_interval_ms=20, audio=fake_tts_server.SILENT_MP3_FRAME * 5)
+        start = time.perf_counter()
+        main._synthesize_elevenlabs("Hello", None, None, 150)
+
+        assert time.perf_counter() - start >= 0.1 + 4 * 0.02
+
+    @pytest.mark.parametrize("status", [429, 503])
+    def test_injected_errors(self, endpoints, status):
+        """Test that injected statuses surface as engine errors"""
+        server = endpoints(error_rate=1.0, error_statuses=(status,))
+        with pytest.raises(Exception, match=f"ElevenLabs error: .*{status}"):
+            main._synthesize_elevenlabs("Hello", None, None, 150)
+        with pytest.raises(Exception, match=f"gTTS error: {status}"):
+            main._synthesize_gtts("Hello", None, None, 150)
+
+        assert server.requests["errors"] == 2
+
+    def test_api_key_checked(self, endpoints):
+        """Test that a configured key must match the SDK's xi-api-key header"""
+        endpoints(api_key="other-key")
+        with pytest.raises(Exception, match="401"):
+            main._synthesize_elevenlabs("Hello", None, None, 150)
+
+
+class TestBaseUrlConfiguration:
+    """Test that engines are pointed at stand-in endpoints through configuration"""
+
+    def test_elevenlabs_base_url(self):
+        """Test that ELEVENLABS_BASE_URL reaches the SDK client"""
+        with patch('main.ELEVENLABS_API_KEY', "key"), patch('main.ELEVENLABS_BASE_URL', "http://127.0.0.1:9"), \
+             patch('main.ElevenLabs') as mock_client, patch('main.elevenlabs_client', None):
+            assert main._init_elevenlabs() == "elevenlabs"
+
+        assert mock_client.call_args.kwargs["base_url"] == "http://127.0.0.1:9"
+
+    def test_gtts_base_url(self):
+        """Test that GTTS_BASE_URL replaces the Google host and keeps the accent"""
+        with patch('main.GTTS_BASE_URL', "http://127.0.0.1:9/"), \
+             patch.object(main.gtts_tts, '_translate_url', main.gtts_tts._translate_url), \
+             patch('main.pygame'):
+            main._init_gtts()
+            url = main.gtts_tts._translate_url(tld="co.uk", path="_/TranslateWebserverUi/data/batchexecute")
+
+        assert url == "http://127.0.0.1:9/_/TranslateWebserverUi/data/batchexecute?tld=co.uk"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
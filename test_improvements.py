@@ -1,5 +1,5 @@
 # ABOUTME: Tests for the improved voice functionality addressing issues.md
-# ABOUTME: Tests validation, thread safety, caching, logging, and platform compatibility
+# ABOUTME: Tests validation, thread safety, caching, logging, platform compatibility and the pyttsx3 session
 import pytest
 from unittest.mock import Mock, patch
 import threading
@@ -215,5 +215,70 @@ class TestErrorRecovery:
         assert voice_index == 0  # Should fallback to first voice
 
 
+class TestPyttsx3Session:
+    """Test the persistent pyttsx3 event-loop session"""
+    
+    @pytest.fixture
+    def engine(self):
+        """A real pyttsx3 engine on the silent dummy driver"""
+        return main.pyttsx3.init('dummy')
+    
+    def test_session_speaks_without_run_and_wait(self, engine):
+        """Test that utterances complete through the external loop"""
+        session = main.Pyttsx3Session(engine)
+        try:
+            assert session.supported
+            with patch.object(engine, 'runAndWait') as mock_run_and_wait:
+                session.run("First", "dummy.voice1", 150)
+                session.run("Second", "dummy.voice1", 150)
+            
+            mock_run_and_wait.assert_not_called()
+            assert session.utterances == 2
+        finally:
+            session.close()
+    
+    def test_only_changed_properties_are_set(self, engine):
+        """Test that voice and rate are applied only when they change"""
+        session = main.Pyttsx3Session(engine)
+        try:
+            with patch.object(engine, 'setProperty', wraps=engine.setProperty) as mock_set:
+                session.run("One", "dummy.voice1", 150)
+                session.run("Two", "dummy.voice1", 150)
+                session.run("Three", "dummy.voice1", 180)
+            
+            assert mock_set.call_args_list == [
+                (('voice', 'dummy.voice1'),), (('rate', 150),), (('rate', 180),)
+            ]
+            assert session.property_changes == 3
+        finally:
+            session.close()
+    
+    def test_driver_errors_reach_caller(self, engine):
+        """Test that a failing utterance raises instead of hanging"""
+        session = main.Pyttsx3Session(engine)
+        try:
+            with patch.object(engine, 'say', side_effect=RuntimeError("driver failure")):
+                with pytest.raises(RuntimeError, match="driver failure"):
+                    session.run("Broken")
+            session.run("Recovered")
+        finally:
+            session.close()
+    
+    def test_unsupported_driver_falls_back(self, engine):
+        """Test that drivers without a working external loop keep using runAndWait"""
+        with patch.object(engine, 'iterate', side_effect=TypeError("no iterator")), \
+             patch('main._pyttsx3_session', None):
+            assert main._get_pyttsx3_session(engine) is None
+            assert not main._pyttsx3_session.supported
+        
+        # The loop was ended, so the engine can still be driven the old way
+        engine.say("Still works")
+        engine.runAndWait()
+    
+    def test_mock_engines_use_run_and_wait(self):
+        """Test that non-pyttsx3 engine objects are never wrapped in a session"""
+        assert main._get_pyttsx3_session(Mock()) is None
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,98 @@
+# ABOUTME: Tests for the load-testing harness's fake engines and report calculations
+# ABOUTME: Runs the fake backends inside the imported server rather than spawning processes
+import pytest
+from unittest.mock import patch
+import load_test
+import main
+
+
+@pytest.fixture
+def fake_engines():
+    """Fake backends installed into this process's server, restored afterwards"""
+    breakers = {name: main.CircuitBreaker(name, probe=lambda: None) for name in main._circuit_breakers}
+    with patch.dict(main._SYNTHESIZERS), patch.dict(main._engines), patch.dict(main._circuit_breakers, breakers), \
+         patch('main.tts_engine', main.tts_engine), \
+         patch('main.initialize_voice_cache') as mock_voice_cache, \
+         patch('main.engine_router', main.EngineRouter()), \
+         patch('main.output_sink', main.NullSink()), \
+         patch('main.PLAYBACK_SOCKET', None), \
+         patch('main.audio_cache', None), \
+         patch('main.TIME_STRETCH', False), \
+         patch('main.TRIM_SILENCE', False), \
+         patch('main.NORMALIZE_TEXT', False):
+        backends = load_test.install_fake_backends(main, latency_ms=0, jitter_ms=0, ms_per_word=10, seed=1)
+        yield backends, mock_voice_cache
+
+
+class TestFakeEngines:
+    """Test the fake backends the harness runs the real server with"""
+
+    def test_every_engine_replaced(self, fake_engines):
+        """Test that speak works on every engine without real dependencies"""
+        backends, mock_voice_cache = fake_engines
+
+        assert set(backends) == set(main.SUPPORTED_ENGINES)
+        for name in main.SUPPORTED_ENGINES:
+            result = main.speak("Three short words", engine=name)
+            assert result.startswith("🗣️ Spoke: 'Three short words'")
+            assert "fake backend" in result
+        voices = mock_voice_cache.call_args.args[0].getProperty("voices")
+        assert [voice.name for voice in voices][0] == "Fake Alex"
+
+    def test_audio_length_follows_words(self, fake_engines):
+        """Test that returned audio lasts ms_per_word for each word"""
+        backends, _ = fake_engines
+        audio = backends["gtts"].render("one two three four")
+
+        assert main._audio_duration(audio, "wav") == pytest.approx(0.04, abs=0.001)
+
+    def test_failure_injection(self, fake_engines):
+        """Test that injected failures surface as engine errors and count against the engine"""
+        backends, _ = fake_engines
+        backends["gtts"].failure_rate = 1.0
+
+        assert main.speak("Hello", engine="gtts") == "❌ Error speaking text: gTTS error: injected failure"
+        assert main.engine_router.snapshot("gtts")["error_rate"] == 1.0
+        assert main._circuit_breakers["gtts"].failures == 1
+
+
+class TestReport:
+    """Test the call mix and the report's statistics"""
+
+    def test_parse_mix(self):
+        """Test weighted call mixes and their validation"""
+        assert load_test.parse_mix("speak=8, list_voices=1,server_status") == {
+            "speak": 8.0, "list_voices": 1.0, "server_status": 1.0}
+        with pytest.raises(ValueError):
+            load_test.parse_mix("cancel_speech=1")
+        with pytest.raises(ValueError):
+            load_test.parse_mix("speak=0")
+
+    def test_parse_status(self, fake_engines):
+        """Test that queue depth and synthesis load are read from real server_status output"""
+        with main.audio_output_lock:
+            sample = load_test.parse_status(main.server_status())
+
+        assert sample["playback_depth"] == 1
+        assert sample["engines"]["gtts"] == {"active": 0, "limit": main._synthesis_limits["gtts"].limit, "waiting": 0}
+
+    def test_summarize(self):
+        """Test overall and per-tool percentiles, error rates and queue depth"""
+        records = [("speak", i / 100, i != 10) for i in range(1, 11)] + [("server_status", 0.005, True)]
+        samples = [{"t": 0.1, "playback_depth": 1, "engines": {"gtts": {"active": 1, "limit": 4, "waiting": 2}}},
+                   {"t": 0.2, "playback_depth": 3, "engines": {"gtts": {"active": 4, "limit": 4, "waiting": 0}}}]
+        summary = load_test.summarize(4, records, 2.0, samples)
+
+        assert summary["calls"] == 11 and summary["errors"] == 1
+        assert summary["throughput"] == 5.5
+        assert summary["tools"]["speak"]["p90"] == 0.09
+        assert summary["tools"]["speak"]["p99"] == 0.10
+        assert summary["tools"]["speak"]["error_rate"] == 0.1
+        assert summary["tools"]["server_status"]["errors"] == 0
+        assert summary["queue"]["peak_depth"] == 3
+        assert summary["queue"]["mean_depth"] == 2
+        assert summary["queue"]["peak_synthesis_waiting"] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,118 @@
+# ABOUTME: Tests for the text normalization applied before synthesis and cache lookup
+# ABOUTME: Covers each rewriting step, per-engine configuration and hit rate reporting
+import pytest
+from unittest.mock import patch
+import main
+
+
+ALL_STEPS = set(main.NORMALIZATION_STEPS)
+
+
+class TestNormalizeText:
+    """Test rewriting text into a canonical spoken form"""
+
+    def test_variants_share_one_form(self):
+        """Test that casing, spacing and final punctuation variants normalize together"""
+        variants = ["Build passed!", "build passed", "Build  passed.", "**Build passed** 🎉"]
+        assert {main.normalize_text(text, ALL_STEPS) for text in variants} == {"build passed"}
+
+    def test_numbers_and_units_spelled_out(self):
+        """Test that numbers, decimals, separators and units become words"""
+        assert main.normalize_text("3 tests failed in 200ms", {"numbers"}) == "three tests failed in two hundred milliseconds"
+        assert main.normalize_text("Disk 95% full, 1 GB left", {"numbers"}) == "Disk ninety-five percent full, one gigabyte left"
+        assert main.normalize_text("Copied 1,234 files in 2.5s", {"numbers"}) == \
+            "Copied one thousand two hundred thirty-four files in two point five seconds"
+
+    def test_negative_numbers(self):
+        """Test that a leading minus sign is spoken while ranges keep their hyphen"""
+        assert main.normalize_text("Error -5 occurred", {"numbers"}) == "Error minus five occurred"
+        assert main.normalize_text("pages 10-20", {"numbers"}) == "pages ten-twenty"
+
+    def test_identifiers_left_alone(self):
+        """Test that versions, times, ordinals and identifiers keep their digits"""
+        text = "Release 1.2.3 at 10:30 took 3rd place in mp3 at 4k"
+        assert main.normalize_text(text, {"numbers"}) == text
+
+    def test_case_keeps_acronyms(self):
+        """Test that lowercasing leaves acronyms intact"""
+        assert main.normalize_text("The USB Drive passed the API Check", {"case"}) == "the USB drive passed the API check"
+
+    def test_questions_and_ellipses_keep_punctuation(self):
+        """Test that punctuation which changes intonation survives"""
+        assert main.normalize_text("Is it done??", ALL_STEPS) == "is it done?"
+        assert main.normalize_text("Wait....", ALL_STEPS) == "wait..."
+
+    def test_abbreviations_keep_final_period(self):
+        """Test that the terminal step doesn't cut a single-letter abbreviation short"""
+        assert main.normalize_text("Deploy at 2 a.m.", ALL_STEPS) == "deploy at two a.m."
+        assert main.normalize_text("Deploy at night.", ALL_STEPS) == "deploy at night"
+
+    def test_nothing_speakable_keeps_original(self):
+        """Test that text made only of emoji is not reduced to nothing"""
+        assert main.normalize_text("👍", ALL_STEPS) == "👍"
+
+
+class TestNormalizedSynthesis:
+    """Test normalization in the synthesis path"""
+
+    @pytest.fixture
+    def recorded_gtts(self):
+        texts = []
+
+        def synthesize(text, voice, emotion, rate):
+            texts.append(text)
+            return main.SynthesisResult(b"mp3", "mp3", ["engine: gTTS"])
+
+        with patch.dict(main._SYNTHESIZERS, {"gtts": synthesize, "elevenlabs": synthesize}), \
+             patch('main.engine_router', main.EngineRouter()), \
+             patch('main.TIME_STRETCH', False), \
+             patch('main.TRIM_SILENCE', False):
+            yield texts
+
+    def test_steps_configured_per_engine(self, recorded_gtts):
+        """Test that each engine only gets its own normalization steps"""
+        main._synthesize("gtts", "Build Passed!", None, None, 150)
+        main._synthesize("elevenlabs", "Build Passed!", None, None, 150)
+
+        assert recorded_gtts == ["build passed", "Build Passed!"]
+
+    def test_disabled(self, recorded_gtts):
+        """Test that VOCALIZE_NORMALIZE=false passes text through untouched"""
+        with patch('main.NORMALIZE_TEXT', False):
+            main._synthesize("gtts", "Build Passed!", None, None, 150)
+
+        assert recorded_gtts == ["Build Passed!"]
+        with patch('main.NORMALIZE_TEXT', False):
+            assert "🧹 Text normalization: disabled" in main.server_status()
+
+    def test_hit_rates_reported(self, tmp_path):
+        """Test that hits gained by normalization are reported against raw text hits"""
+        cache = main.AudioCache(str(tmp_path / "cache"), max_bytes=1024 * 1024, wait_timeout=5)
+
+        def synthesize(text, voice, emotion, rate):
+            audio, cached = main._cached_synthesis("gtts", text, lambda: b"mp3")
+            return main.SynthesisResult(audio, "mp3", [], cached=cached)
+
+        stats = {"texts": 0, "rewritten": 0, "lookups": 0, "hits": 0, "normalized_hits": 0}
+        with patch('main.audio_cache', cache), patch.dict(main._normalization_stats, stats), \
+             patch.dict(main._raw_cache_keys, clear=True), \
+             patch.dict(main._SYNTHESIZERS, {"gtts": synthesize}), \
+             patch('main.engine_router', main.EngineRouter()), \
+             patch('main.TIME_STRETCH', False), \
+             patch('main.TRIM_SILENCE', False):
+            for text in ("build passed", "build passed", "Build passed!", "Build  passed."):
+                main._synthesize("gtts", text, None, None, 150)
+
+            assert main._normalization_stats["normalized_hits"] == 2
+            assert "2 of 4 texts rewritten, cache hit rate 75% (25% on raw text)" in main.server_status()
+
+            # Repeating the same raw text hits on its own, normalized or not
+            main._normalization_stats.update(stats)
+            for _ in range(4):
+                main._synthesize("gtts", "Deploy finished.", None, None, 150)
+
+            assert "4 of 4 texts rewritten, cache hit rate 75% (75% on raw text)" in main.server_status()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,95 @@
+# ABOUTME: Tests for capturing profiles of slow speak calls and the tools that list and show them
+# ABOUTME: Covers the sampling and cProfile captures, the slowness threshold and profile rotation
+import os
+import time
+import pytest
+from unittest.mock import patch
+import main
+
+
+def _slow_gtts(text, voice, emotion, rate):
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        pass
+    return main.SynthesisResult(b"mp3", "mp3", ["engine: gTTS"])
+
+
+@pytest.fixture
+def profiling(tmp_path, fake_gtts):
+    """Profiling on for calls over 50 ms, with a slow fake gTTS and silent output"""
+    with patch('main.PROFILE_SLOW_MS', 50), \
+         patch('main.PROFILE_DIR', str(tmp_path / "profiles")), \
+         patch('main.PROFILE_INTERVAL_MS', 2):
+        fake_gtts(_slow_gtts)
+        yield tmp_path / "profiles"
+
+
+class TestSlowCallProfiles:
+    """Test profile capture for slow speak calls"""
+
+    def test_sampled_profile_saved_for_slow_call(self, profiling):
+        """Test that a slow call leaves folded stacks and metadata with its parameters"""
+        main.speak("Deploy finished", emotion="calm", engine="gtts")
+
+        profiles = main._load_profiles()
+        assert len(profiles) == 1
+        profile = profiles[0]
+        assert profile["params"]["text"] == "Deploy finished"
+        assert profile["params"]["emotion"] == "calm"
+        assert profile["elapsed_ms"] >= 100
+        assert profile["timing"]["engine"] == "gtts"
+        with open(os.path.join(profiling, profile["data_file"])) as f:
+            assert "_slow_gtts" in f.read()
+
+    def test_fast_calls_not_kept(self, profiling):
+        """Test that calls under the threshold leave nothing behind"""
+        with patch('main.PROFILE_SLOW_MS', 10_000):
+            main.speak("Quick", engine="gtts")
+
+        assert main._load_profiles() == []
+        assert "No profiles captured" in main.list_profiles()
+
+    def test_cprofile_mode(self, profiling):
+        """Test that cProfile captures are saved in pstats format and summarized"""
+        with patch('main.PROFILE_MODE', "cprofile"):
+            main.speak("Profiled", engine="gtts")
+
+        profile = main._load_profiles()[0]
+        assert profile["data_file"].endswith(".prof")
+        report = main.get_profile(profile["id"])
+        assert "_slow_gtts" in report
+        assert "cumulative" in report
+
+    def test_tools_list_and_show(self, profiling):
+        """Test that list_profiles and get_profile report the capture"""
+        main.speak("Deploy finished", engine="gtts")
+        profile_id = main._load_profiles()[0]["id"]
+
+        listing = main.list_profiles()
+        assert f"• {profile_id}: speak took " in listing
+        assert "'Deploy finished'" in listing
+        report = main.get_profile(profile_id)
+        assert report.startswith(f"🔬 Profile {profile_id}: speak took ")
+        assert "samples, by share of samples with the function on the stack" in report
+        assert "_slow_gtts" in report
+        assert main.get_profile("missing") == "❌ Error: No profile 'missing'"
+
+    def test_rotation_keeps_newest(self, profiling):
+        """Test that only the newest PROFILE_MAX_FILES profiles are kept"""
+        with patch('main.PROFILE_MAX_FILES', 2):
+            for text in ("One", "Two", "Three"):
+                main.speak(text, engine="gtts")
+
+        assert [profile["params"]["text"] for profile in main._load_profiles()] == ["Three", "Two"]
+        assert len(os.listdir(profiling)) == 4
+
+    def test_disabled_by_default(self, profiling):
+        """Test that nothing is captured unless a threshold is configured"""
+        with patch('main.PROFILE_SLOW_MS', 0):
+            main.speak("Unprofiled", engine="gtts")
+
+        assert not os.path.exists(profiling)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
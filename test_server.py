@@ -0,0 +1,541 @@
+# ABOUTME: Tests for shared-server behavior of the vocalize MCP server
+# ABOUTME: Covers network transports, playback queueing, engine routing, failover and status
+import pytest
+import threading
+import time
+import anyio
+from unittest.mock import Mock, patch
+import main
+
+
+class TestOrderedLock:
+    """Test the FIFO lock that orders playback across clients"""
+
+    def test_waiters_served_in_arrival_order(self):
+        """Test that blocked callers acquire the lock first-come, first-served"""
+        lock = main.OrderedLock()
+        order = []
+
+        lock.acquire()
+        threads = []
+        for i in range(5):
+            thread = threading.Thread(target=lambda i=i: (lock.acquire(), order.append(i), lock.release()))
+            thread.start()
+            threads.append(thread)
+            # Make sure each thread is queued before the next one arrives
+            while lock.depth < i + 2:
+                time.sleep(0.001)
+
+        lock.release()
+        for thread in threads:
+            thread.join()
+
+        assert order == [0, 1, 2, 3, 4]
+        assert not lock.locked()
+
+    def test_depth_counts_holder_and_waiters(self):
+        """Test that queue depth reflects the holder plus queued callers"""
+        lock = main.OrderedLock()
+        assert lock.depth == 0
+        with lock:
+            assert lock.depth == 1
+            assert lock.locked()
+        assert lock.depth == 0
+
+    def test_release_unlocked_raises(self):
+        """Test that releasing an unheld lock is an error"""
+        with pytest.raises(RuntimeError):
+            main.OrderedLock().release()
+
+
+class TestNetworkTransport:
+    """Test the shared network server mode"""
+
+    def test_speak_registered_as_threaded_tool(self):
+        """Test that speak runs off the event loop so clients don't block each other"""
+        tool = main.mcp._tool_manager.get_tool("speak")
+        assert tool is not None
+        assert tool.is_async
+        # Parameters still come from the original speak() signature
+        assert set(tool.parameters["properties"]) >= {"text", "voice", "emotion", "rate"}
+
+    def test_threaded_speak_returns_result(self):
+        """Test calling speak through MCP from an event loop"""
+        result = anyio.run(main.mcp.call_tool, "speak", {"text": ""})
+        text = result[0][0].text if isinstance(result, tuple) else result[0].text
+        assert "❌ Error: Text cannot be empty" in text
+
+    def test_main_uses_requested_transport(self):
+        """Test that main() runs the server on the transport given on the command line"""
+        original_host, original_port = main.mcp.settings.host, main.mcp.settings.port
+        try:
+            with patch('sys.argv', ['vocalize-mcp', '--transport', 'sse', '--host', '0.0.0.0', '--port', '9123']), \
+                 patch.object(main.mcp, 'run') as mock_run, \
+                 patch.dict(main._server_stats, {"transport": "stdio"}):
+                main.main()
+
+                mock_run.assert_called_once_with(transport="sse")
+                assert main.mcp.settings.host == "0.0.0.0"
+                assert main.mcp.settings.port == 9123
+                assert main._server_stats["transport"] == "sse"
+        finally:
+            main.mcp.settings.host, main.mcp.settings.port = original_host, original_port
+
+    def test_env_int_invalid_value(self):
+        """Test that invalid integer environment values fall back to the default"""
+        with patch.dict('os.environ', {"VOCALIZE_TEST_INT": "not-a-number"}):
+            assert main._env_int("VOCALIZE_TEST_INT", 42) == 42
+        with patch.dict('os.environ', {"VOCALIZE_TEST_INT": "7"}):
+            assert main._env_int("VOCALIZE_TEST_INT", 42) == 7
+
+
+class TestServerStatus:
+    """Test the server_status tool"""
+
+    def test_status_sections(self):
+        """Test that status reports transport, engine and queue depth"""
+        result = main.server_status()
+
+        assert "📊 VOCALIZE SERVER STATUS" in result
+        assert "🔌 Transport:" in result
+        assert "🔧 Engine:" in result
+        assert "🎧 Playback queue depth: 0" in result
+
+    @patch('main._speak_with_pyttsx3')
+    @patch('main.TTS_ENGINE', 'pyttsx3')
+    @patch('main.tts_engine', object())
+    def test_speak_updates_counters(self, mock_speak_pyttsx3):
+        """Test that completed and failed speak calls are counted"""
+        mock_speak_pyttsx3.return_value = "🗣️ Spoke: 'Hi' (engine: pyttsx3)"
+        with patch.dict(main._server_stats, {"speak_calls": 0, "speak_errors": 0, "active_calls": 0}):
+            main.speak("Hi")
+            main.speak("")
+            assert main._server_stats["speak_calls"] == 1
+            assert main._server_stats["active_calls"] == 0
+
+            mock_speak_pyttsx3.side_effect = Exception("boom")
+            main.speak("Hi")
+            assert main._server_stats["speak_errors"] == 1
+
+
+class TestPerEngineLocking:
+    """Test per-engine synthesis limits and per-call engine routing"""
+
+    def test_synthesis_limiter_bounds_concurrency(self):
+        """Test that no more than the limit synthesize at once"""
+        limiter = main.SynthesisLimiter("test", 2)
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with limiter:
+                with lock:
+                    peak.append(limiter.active)
+                time.sleep(0.05)
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) == 2
+        assert limiter.active == 0 and limiter.waiting == 0
+
+    def test_unknown_engine_rejected(self):
+        """Test that an unsupported engine name returns an error"""
+        result = main.speak("Hello", engine="espeak")
+        assert "❌ Error: Unknown engine 'espeak'" in result
+
+    @patch('main._speak_with_gtts')
+    @patch('main.TTS_ENGINE', 'pyttsx3')
+    def test_route_per_call(self, mock_speak_gtts):
+        """Test that speak(engine=...) uses a side-by-side engine instead of the default"""
+        mock_speak_gtts.return_value = "🗣️ Spoke: 'Hi' (engine: gTTS)"
+        with patch.dict(main._engines, {"gtts": "gtts"}):
+            result = main.speak("Hi", engine="gtts")
+
+        mock_speak_gtts.assert_called_once_with("Hi", None, None, 150)
+        assert "engine: gTTS" in result
+
+    @patch('main.TTS_ENGINE', 'pyttsx3')
+    def test_unavailable_engine_reported(self):
+        """Test that a requested engine that failed to initialize is reported"""
+        with patch.dict(main._engines, {"elevenlabs": None}):
+            result = main.speak("Hi", engine="elevenlabs")
+        assert "❌ Error: elevenlabs engine not available" in result
+
+    def test_lazy_engine_initialization(self):
+        """Test that non-default engines are initialized once, on first use"""
+        init = patch.dict(main._ENGINE_INITIALIZERS, {"gtts": lambda: "gtts"})
+        with init, patch.dict(main._engines, clear=True), patch('main.TTS_ENGINE', 'pyttsx3'):
+            assert main._get_engine("gtts") == "gtts"
+            assert main._engines == {"gtts": "gtts"}
+
+    @pytest.mark.skipif(not main.GTTS_AVAILABLE, reason="gTTS not installed")
+    def test_synthesis_overlaps_but_playback_is_exclusive(self):
+        """Test that network synthesis runs concurrently while audio output stays serialized"""
+        counters = {"synth": 0, "synth_peak": 0, "play": 0, "play_peak": 0}
+        lock = threading.Lock()
+
+        def track(kind, duration):
+            with lock:
+                counters[kind] += 1
+                counters[f"{kind}_peak"] = max(counters[f"{kind}_peak"], counters[kind])
+            time.sleep(duration)
+            with lock:
+                counters[kind] -= 1
+
+        def fake_write(fp):
+            track("synth", 0.1)
+            fp.write(b"mp3")
+
+        with patch('main.gTTS') as mock_gtts, \
+             patch('main._play_audio_locally', side_effect=lambda *_: track("play", 0.02)), \
+             patch('main.GAPLESS_PLAYBACK', False), \
+             patch('main.audio_cache', None), \
+             patch('main.PLAYBACK_SOCKET', None):
+            mock_gtts.return_value.write_to_fp.side_effect = fake_write
+            threads = [threading.Thread(target=main._speak_with_gtts, args=(f"Line {i}", None, None, 150))
+                       for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert counters["synth_peak"] > 1
+        assert counters["play_peak"] == 1
+
+
+def _result(engine, audio=b"audio"):
+    return main.SynthesisResult(audio, "mp3", [f"engine: {engine}"])
+
+
+class TestEngineRouting:
+    """Test latency-aware engine routing and hedged requests"""
+
+    def test_rank_orders_within_budget_by_p90(self):
+        """Test that in-budget engines are ranked by p90, with preference breaking ties"""
+        router = main.EngineRouter()
+        for _ in range(5):
+            router.record("elevenlabs", 0.5, True)
+            router.record("gtts", 0.2, True)
+            router.record("pyttsx3", 0.5, True)
+
+        assert router.rank(["elevenlabs", "pyttsx3", "gtts"], budget=1.0) == ["gtts", "elevenlabs", "pyttsx3"]
+        assert router.rank(["pyttsx3", "elevenlabs", "gtts"], budget=1.0) == ["gtts", "pyttsx3", "elevenlabs"]
+
+    def test_rank_keeps_preference_without_samples(self):
+        """Test that unsampled engines keep configured order behind measured in-budget ones"""
+        router = main.EngineRouter()
+        for _ in range(5):
+            router.record("gtts", 0.2, True)
+
+        assert router.rank(["elevenlabs", "pyttsx3"], budget=1.0) == ["elevenlabs", "pyttsx3"]
+        assert router.rank(["elevenlabs", "gtts", "pyttsx3"], budget=1.0) == ["gtts", "elevenlabs", "pyttsx3"]
+
+    def test_rank_demotes_slow_and_failing_engines(self):
+        """Test that over-budget engines move behind fast ones and unhealthy ones go last"""
+        router = main.EngineRouter(min_samples=3)
+        for _ in range(5):
+            router.record("elevenlabs", 3.0, True)
+            router.record("gtts", 0.4, True)
+            router.record("pyttsx3", None, False)
+
+        assert router.rank(["elevenlabs", "pyttsx3", "gtts"], budget=1.0) == ["gtts", "elevenlabs", "pyttsx3"]
+        assert router.error_rate("pyttsx3") == 1.0
+
+    def test_cache_hits_do_not_skew_latency(self):
+        """Test that cached results count as successes without recording latency"""
+        router = main.EngineRouter()
+        with patch('main.engine_router', router), \
+             patch.dict(main._SYNTHESIZERS, {"gtts": lambda *_: main.SynthesisResult(b"a", "mp3", [], cached=True)}):
+            main._synthesize("gtts", "Hi", None, None, 150)
+
+        assert router.snapshot("gtts")["samples"] == 1
+        assert router.percentile("gtts", 90) is None
+
+    def test_fallback_to_next_engine_on_failure(self):
+        """Test that a failing engine falls through to the next ranked one"""
+        def broken(*_):
+            raise RuntimeError("quota exceeded")
+
+        with patch('main.engine_router', main.EngineRouter()), \
+             patch.dict(main._SYNTHESIZERS, {"elevenlabs": broken, "gtts": lambda *_: _result("gTTS")}):
+            engine, result = main._synthesize_with_fallback(["elevenlabs", "gtts"], "Hi", None, None, 150)
+
+        assert engine == "gtts"
+        assert result.details == ["engine: gTTS"]
+
+    def test_hedged_backup_wins_when_primary_is_slow(self):
+        """Test that a backup is fired once the primary runs past its p90 and the first answer is used"""
+        router = main.EngineRouter()
+        for _ in range(5):
+            router.record("elevenlabs", 0.05, True)
+
+        def slow(*_):
+            time.sleep(0.5)
+            return _result("ElevenLabs")
+
+        with patch('main.engine_router', router), \
+             patch.dict(main._SYNTHESIZERS, {"elevenlabs": slow, "gtts": lambda *_: _result("gTTS")}):
+            start = time.perf_counter()
+            engine, _ = main._synthesize_hedged(["elevenlabs", "gtts"], "Hi", None, None, 150)
+            elapsed = time.perf_counter() - start
+
+        assert engine == "gtts"
+        assert elapsed < 0.4
+        assert router.hedges == 1 and router.hedge_wins == 1
+
+    def test_hedged_fast_primary_needs_no_backup(self):
+        """Test that no backup request is made when the primary answers in time"""
+        backup = []
+        with patch('main.engine_router', main.EngineRouter()), \
+             patch.dict(main._SYNTHESIZERS, {"elevenlabs": lambda *_: _result("ElevenLabs"),
+                                             "gtts": lambda *_: backup.append(1) or _result("gTTS")}):
+            engine, _ = main._synthesize_hedged(["elevenlabs", "gtts"], "Hi", None, None, 150)
+
+        assert engine == "elevenlabs"
+        assert backup == []
+
+    @pytest.mark.skipif(not main.GTTS_AVAILABLE, reason="pygame not installed")
+    @patch('main.ROUTING_ENGINES', ["elevenlabs", "gtts"])
+    def test_speak_auto_routes_and_plays(self):
+        """Test that speak(engine="auto") plays audio from the routed engine"""
+        with patch.dict(main._engines, {"elevenlabs": "elevenlabs", "gtts": "gtts"}), \
+             patch.dict(main._SYNTHESIZERS, {"elevenlabs": lambda *_: _result("ElevenLabs")}), \
+             patch('main.engine_router', main.EngineRouter()), \
+             patch('main._play_audio') as mock_play:
+            result = main.speak("Hi", engine="auto")
+
+        mock_play.assert_called_once_with(b"audio", "mp3", "Hi")
+        assert "engine: ElevenLabs" in result
+        assert "routing: latency" in result
+
+
+class TestCircuitBreaker:
+    """Test failing fast to a local engine while a network engine is down"""
+
+    def _open_breaker(self, name="gtts"):
+        breaker = main.CircuitBreaker(name, failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        return breaker
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the breaker trips only after the failure threshold"""
+        breaker = main.CircuitBreaker("gtts", failure_threshold=3, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.allow()
+
+        breaker.record_failure()
+        assert not breaker.allow()
+        assert breaker.state == main.CircuitBreaker.OPEN
+        assert breaker.trips == 1
+
+    def test_success_resets_failure_count(self):
+        """Test that intermittent failures never trip the breaker"""
+        breaker = main.CircuitBreaker("gtts", failure_threshold=2, reset_timeout=60)
+        for _ in range(5):
+            breaker.record_failure()
+            breaker.record_success()
+        assert breaker.state == main.CircuitBreaker.CLOSED
+
+    def test_background_probe_closes_breaker(self):
+        """Test that the breaker closes once a recovery probe succeeds"""
+        attempts = []
+
+        def probe():
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise ConnectionError("still down")
+
+        breaker = main.CircuitBreaker("gtts", failure_threshold=1, reset_timeout=0.02, probe=probe)
+        breaker.record_failure()
+        deadline = time.time() + 2
+        while breaker.state != main.CircuitBreaker.CLOSED and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert breaker.state == main.CircuitBreaker.CLOSED
+        assert len(attempts) == 2
+
+    def test_open_breaker_fails_fast(self):
+        """Test that no request reaches an engine whose breaker is open"""
+        synthesize = []
+        with patch.dict(main._circuit_breakers, {"gtts": self._open_breaker()}), \
+             patch.dict(main._SYNTHESIZERS, {"gtts": lambda *_: synthesize.append(1)}):
+            with pytest.raises(main.CircuitOpenError):
+                main._synthesize("gtts", "Hi", None, None, 150)
+
+        assert synthesize == []
+
+    @patch('main._speak_with_pyttsx3')
+    @patch('main.TTS_ENGINE', 'gtts')
+    @patch('main.tts_engine', 'gtts')
+    @patch('main.FALLBACK_ENGINE', 'pyttsx3')
+    def test_speak_falls_back_to_local_engine(self, mock_speak_pyttsx3):
+        """Test that speak answers from the fallback engine while the breaker is open"""
+        mock_speak_pyttsx3.return_value = "🗣️ Spoke: 'Hi' (engine: pyttsx3)"
+        breaker = self._open_breaker()
+        with patch.dict(main._circuit_breakers, {"gtts": breaker}), \
+             patch.dict(main._engines, {"pyttsx3": object()}):
+            result = main.speak("Hi")
+
+        mock_speak_pyttsx3.assert_called_once_with("Hi", None, None, 150)
+        assert "engine: pyttsx3" in result
+        assert "[fallback: gtts unavailable]" in result
+        assert breaker.fallbacks == 1
+
+    @patch('main.TTS_ENGINE', 'gtts')
+    @patch('main.tts_engine', 'gtts')
+    def test_breaker_state_in_status(self):
+        """Test that server_status reports breaker state and trip counts"""
+        with patch.dict(main._circuit_breakers, {"gtts": self._open_breaker()}):
+            result = main.server_status()
+
+        assert "🛡️ Circuit breakers" in result
+        assert "gtts: open, 1 consecutive failures, 1 trips, 0 fallbacks" in result
+
+
+class TestWarmStandby:
+    """Test background warm-up of the fallback engine"""
+
+    def test_standby_warms_engine_once(self):
+        """Test that the standby initializes the engine off-thread so failover finds it ready"""
+        init_calls = []
+
+        def slow_init():
+            init_calls.append(threading.current_thread().name)
+            time.sleep(0.05)
+            return "engine"
+
+        with patch.dict(main._ENGINE_INITIALIZERS, {"elevenlabs": slow_init}), \
+             patch.dict(main._engines, clear=True), \
+             patch('main.TTS_ENGINE', 'gtts'):
+            standby = main.WarmStandby("elevenlabs")
+            standby.start()
+            assert standby.state == "warming"
+
+            assert standby.wait(timeout=2)
+            assert standby.state == "ready"
+            assert standby.warm_seconds >= 0.05
+            # Failover now uses the warmed engine without initializing again
+            assert main._get_engine("elevenlabs") == "engine"
+            assert init_calls == ["standby-elevenlabs"]
+
+    def test_failed_standby_reported(self):
+        """Test that a standby engine that cannot initialize is marked failed"""
+        with patch.dict(main._ENGINE_INITIALIZERS, {"elevenlabs": lambda: None}), \
+             patch.dict(main._engines, clear=True), \
+             patch('main.TTS_ENGINE', 'gtts'):
+            standby = main.WarmStandby("elevenlabs")
+            standby.start()
+
+            assert not standby.wait(timeout=2)
+            assert standby.state == "failed"
+
+    def test_standby_readiness_in_status(self):
+        """Test that server_status shows whether the standby is ready"""
+        standby = main.WarmStandby("pyttsx3")
+        standby.state = "ready"
+        standby.warm_seconds = 0.5
+        with patch('main.standby_engine', standby):
+            assert "🛟 Standby engine: pyttsx3 ready in 0.50s" in main.server_status()
+
+
+@pytest.mark.skipif(not hasattr(__import__('socket'), 'AF_UNIX'), reason="Unix sockets not available")
+class TestPlaybackDaemon:
+    """Test the shared local playback daemon"""
+
+    @pytest.fixture
+    def daemon(self, tmp_path):
+        played = []
+        daemon = main.PlaybackDaemon(str(tmp_path / "playback.sock"),
+                                     play=lambda data, fmt: (time.sleep(0.02), played.append((data, fmt))))
+        daemon.start()
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        daemon.played_items = played
+        with patch('main.PLAYBACK_SOCKET', daemon.socket_path), \
+             patch('main.PLAYBACK_DAEMON_AUTOSTART', False):
+            yield daemon
+        daemon.stop()
+
+    def test_play_through_daemon(self, daemon):
+        """Test that audio handed to the daemon is played and acknowledged"""
+        main._play_audio(b"audio-bytes", "mp3", "Hello")
+
+        assert daemon.played_items == [(b"audio-bytes", "mp3")]
+
+    def test_concurrent_clients_play_one_at_a_time(self, daemon):
+        """Test that requests from many clients are queued rather than overlapping"""
+        threads = [threading.Thread(target=main._send_to_playback_daemon, args=(f"clip{i}".encode(), "mp3"))
+                   for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(data for data, _ in daemon.played_items) == [f"clip{i}".encode() for i in range(5)]
+        assert daemon.played == 5
+
+    def test_waits_for_queued_clip_to_finish(self, tmp_path):
+        """Test that a clip handed to a queueing sink is acknowledged only once it has played"""
+        finished = threading.Event()
+        daemon = main.PlaybackDaemon(str(tmp_path / "playback.sock"), play=lambda data, fmt: finished)
+        daemon.start()
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        threading.Timer(0.1, finished.set).start()
+        start = time.perf_counter()
+        try:
+            with patch('main.PLAYBACK_SOCKET', daemon.socket_path):
+                main._send_to_playback_daemon(b"clip", "mp3")
+        finally:
+            daemon.stop()
+
+        assert time.perf_counter() - start >= 0.09
+        assert daemon.played == 1
+
+    def test_cancelled_client_released(self, tmp_path):
+        """Test that a client's cancelled clip is stopped by the daemon and acknowledged as cancelled"""
+        finished = threading.Event()
+        sink = Mock()
+        sink.cancel.side_effect = lambda event: event.set()
+        daemon = main.PlaybackDaemon(str(tmp_path / "playback.sock"), play=lambda data, fmt: finished)
+        daemon.start()
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        try:
+            with patch('main.PLAYBACK_SOCKET', daemon.socket_path), patch('main.output_sink', sink), \
+                 main._job_scope("Hello", "speak") as job:
+                threading.Timer(0.05, job.cancel).start()
+                with pytest.raises(main.SpeechCancelled):
+                    main._send_to_playback_daemon(b"clip", "mp3")
+        finally:
+            daemon.stop()
+
+        sink.cancel.assert_called_once_with(finished)
+        assert daemon.played == 0
+
+    def test_status_request(self, daemon):
+        """Test that the daemon reports its queue in server_status"""
+        result = main.server_status()
+        assert f"🔈 Playback daemon: {daemon.socket_path}" in result
+        assert "queue depth 0" in result
+
+    def test_refuses_second_daemon(self, daemon):
+        """Test that a second daemon cannot steal a live socket"""
+        with pytest.raises(RuntimeError, match="already running"):
+            main.PlaybackDaemon(daemon.socket_path).start()
+
+    def test_falls_back_to_local_playback(self, tmp_path):
+        """Test that audio is played locally when no daemon is listening"""
+        with patch('main.PLAYBACK_SOCKET', str(tmp_path / "missing.sock")), \
+             patch('main.PLAYBACK_DAEMON_AUTOSTART', False), \
+             patch('main.GAPLESS_PLAYBACK', False), \
+             patch('main._play_audio_locally') as mock_local:
+            main._play_audio(b"audio", "mp3")
+
+            mock_local.assert_called_once_with(b"audio", "mp3")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,404 @@
+# ABOUTME: Tests for the pluggable audio output sinks used by every engine
+# ABOUTME: Covers gapless device playback, WAV, PCM and null sinks, trimming and time-stretching
+import io
+import os
+import re
+import socket
+import threading
+import time
+import wave
+import pytest
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from unittest.mock import patch
+import main
+
+
+def _wav_bytes(seconds=0.5, sample_rate=8000, channels=1):
+    """A silent 16-bit WAV clip"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"\x00\x00" * channels * int(sample_rate * seconds))
+    return buffer.getvalue()
+
+
+def _mp3_bytes(seconds=1.0):
+    """A constant-bitrate MPEG-1 Layer III stream at 128 kbps"""
+    header = bytes([0xFF, 0xFB, 0x90, 0x00])
+    return header + b"\x00" * (int(16000 * seconds) - len(header))
+
+
+def _padded_tone(lead=0.4, tone=0.2, tail=0.3, sample_rate=8000):
+    """A WAV clip with a tone between stretches of silence"""
+    def silence(seconds):
+        return b"\x00\x00" * int(sample_rate * seconds)
+
+    loud = (b"\xff\x3f" + b"\x01\xc0") * int(sample_rate * tone / 2)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(silence(lead) + loud + silence(tail))
+    return buffer.getvalue()
+
+
+def _tone_wav(frequency=440, seconds=1.0, sample_rate=16000):
+    """A WAV clip of a steady sine tone"""
+    samples = (0.5 * np.sin(2 * np.pi * frequency * np.arange(int(sample_rate * seconds)) / sample_rate) * 32767)
+    return main._pcm_to_wav(samples.astype("<i2").tobytes(), sample_rate, 1)
+
+
+def _dominant_frequency(audio_data):
+    """The strongest frequency in a WAV clip, in Hz"""
+    frames, sample_rate, _ = main._decode_pcm(audio_data, "wav")
+    samples = np.frombuffer(frames, dtype="<i2").astype(float)
+    return np.argmax(np.abs(np.fft.rfft(samples))) * sample_rate / len(samples)
+
+
+class TestSinkSelection:
+    """Test choosing a sink from VOCALIZE_SINK"""
+
+    def test_specs(self, tmp_path):
+        """Test that each sink spec builds the matching sink"""
+        assert isinstance(main._create_sink("device"), main.DeviceSink)
+        assert not main._create_sink("null").realtime
+        assert main._create_sink("null:realtime").realtime
+        assert main._create_sink(f"wav:{tmp_path}").directory == str(tmp_path)
+        assert main._create_sink(f"pcm:{tmp_path / 'fifo'}").target == str(tmp_path / "fifo")
+
+    def test_unknown_spec_uses_device(self):
+        """Test that an unknown sink falls back to the audio device"""
+        assert isinstance(main._create_sink("speakers"), main.DeviceSink)
+
+    def test_play_audio_goes_to_sink(self):
+        """Test that engine playback is routed through the configured sink"""
+        sink = main.NullSink()
+        with patch('main.output_sink', sink), patch('main.PLAYBACK_SOCKET', None):
+            main._play_audio(b"audio", "mp3")
+
+        assert sink.played == 1
+
+    def test_device_sink_plays_locally(self):
+        """Test that the device sink uses the pygame player"""
+        with patch('main._play_audio_locally') as mock_local, patch('main.GAPLESS_PLAYBACK', False):
+            main.DeviceSink().play(b"audio", "mp3")
+
+        mock_local.assert_called_once_with(b"audio", "mp3")
+
+    @patch('main.TTS_ENGINE', 'pyttsx3')
+    def test_pyttsx3_renders_into_non_device_sink(self):
+        """Test that pyttsx3 renders to audio instead of speaking on the device"""
+        sink = main.NullSink()
+        rendered = main.SynthesisResult(b"wav", "wav", ["engine: pyttsx3"])
+        with patch('main.output_sink', sink), patch('main.PLAYBACK_SOCKET', None), \
+             patch.dict(main._SYNTHESIZERS, {"pyttsx3": lambda *_: rendered}):
+            result = main._speak_with_pyttsx3("Hello", None, None, 150)
+
+        assert sink.played == 1
+        assert "engine: pyttsx3" in result
+
+
+class _LateChannel:
+    """Mixer channel that reports its queued clip as still waiting for delay seconds after it starts"""
+
+    def __init__(self, channel, delay):
+        self._channel = channel
+        self._delay = delay
+        self._started = None
+
+    def __getattr__(self, name):
+        return getattr(self._channel, name)
+
+    def get_queue(self):
+        queued = self._channel.get_queue()
+        if queued is not None:
+            self._started = None
+            return queued
+        if self._started is None:
+            self._started = time.monotonic()
+        return "waiting" if time.monotonic() < self._started + self._delay else None
+
+
+@pytest.mark.skipif(not main.GTTS_AVAILABLE or np is None, reason="pygame or numpy not installed")
+class TestGaplessPlayback:
+    """Test queueing clips on the mixer so back-to-back utterances have no gap"""
+
+    @pytest.fixture
+    def device(self, monkeypatch):
+        """A fresh device sink on a mixer that needs no sound hardware"""
+        monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+        main.pygame.mixer.quit()
+        sink = main.DeviceSink()
+        with patch('main.output_sink', sink), patch('main.PLAYBACK_SOCKET', None), \
+             patch('main.GAPLESS_PLAYBACK', True):
+            yield sink
+        main.pygame.mixer.quit()
+
+    def test_back_to_back_clips_have_no_gap(self, device):
+        """Test that clips waiting to play are queued and start when the previous one ends"""
+        finished = []
+        def play(i):
+            main._play_audio(_tone_wav(seconds=0.2, sample_rate=44100), "wav")
+            finished.append(i)
+
+        start = time.perf_counter()
+        threads = []
+        for i in range(3):
+            threads.append(threading.Thread(target=play, args=(i,)))
+            threads[-1].start()
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+
+        assert time.perf_counter() - start == pytest.approx(0.6, abs=0.08)
+        assert finished == [0, 1, 2]
+        assert device._player.handoffs == 2
+        assert device._player.last_gap < 0.02
+        assert re.search(r"gapless, 2 queued handoffs, last gap 1?\d ms", device.describe())
+
+    def test_late_handoff_gap_measured(self, device):
+        """Test that a queued clip starting late is reported as a gap of that length"""
+        channel_class = main.pygame.mixer.Channel
+        with patch.object(main.pygame.mixer, 'Channel', lambda index: _LateChannel(channel_class(index), 0.1)):
+            device.enqueue(_tone_wav(seconds=0.2, sample_rate=44100), "wav")
+            device.enqueue(_tone_wav(seconds=0.2, sample_rate=44100), "wav")
+            device.drain()
+
+        assert device._player.handoffs == 1
+        assert device._player.last_gap == pytest.approx(0.1, abs=0.03)
+        assert re.search(r"last gap (9\d|1[0-3]\d) ms", device.describe())
+
+    def test_enqueue_returns_before_playback_ends(self, device):
+        """Test that handing over a clip doesn't block, while drain waits for it"""
+        start = time.perf_counter()
+        finished = device.enqueue(_tone_wav(seconds=0.2, sample_rate=44100), "wav")
+        assert not finished.is_set()
+        assert time.perf_counter() - start < 0.1
+
+        device.drain()
+        assert finished.is_set()
+        assert time.perf_counter() - start >= 0.19
+
+    def test_cancel_stops_current_and_keeps_next(self, device):
+        """Test that cancelling the playing clip stops it and the clip queued behind it still plays"""
+        first = device.enqueue(_tone_wav(seconds=1.0, sample_rate=44100), "wav")
+        second = device.enqueue(_tone_wav(seconds=0.2, sample_rate=44100), "wav")
+        time.sleep(0.05)
+
+        start = time.perf_counter()
+        device.cancel(first)
+        assert first.wait(0.1)
+        assert not second.is_set()
+        assert second.wait(1.0)
+        assert time.perf_counter() - start == pytest.approx(0.2, abs=0.08)
+
+
+class TestNullSink:
+    """Test the sink used for benchmarks without sound hardware"""
+
+    def test_instant(self):
+        """Test that the instant null sink returns immediately"""
+        start = time.perf_counter()
+        main.NullSink().play(_mp3_bytes(5.0), "mp3")
+        assert time.perf_counter() - start < 0.5
+
+    def test_realtime(self):
+        """Test that the realtime null sink takes as long as playback would"""
+        start = time.perf_counter()
+        main.NullSink(realtime=True).play(_wav_bytes(0.3), "wav")
+        assert time.perf_counter() - start >= 0.3
+
+    def test_durations(self):
+        """Test WAV and constant-bitrate MP3 durations from their headers"""
+        assert main._audio_duration(_wav_bytes(0.5), "wav") == pytest.approx(0.5)
+        assert main._audio_duration(_mp3_bytes(2.0), "mp3") == pytest.approx(2.0)
+        assert main._audio_duration(b"ID3\x03\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10 + _mp3_bytes(1.0), "mp3") == \
+            pytest.approx(1.0)
+
+
+class TestWavFileSink:
+    """Test writing played audio to WAV files"""
+
+    def test_wav_clips_written_in_order(self, tmp_path):
+        """Test that each clip becomes the next numbered file"""
+        sink = main.WavFileSink(str(tmp_path))
+        clip = _wav_bytes(0.1)
+        sink.play(clip, "wav")
+        sink.play(clip, "wav")
+
+        assert sorted(os.listdir(tmp_path)) == ["00001.wav", "00002.wav"]
+        assert sink.last_path == str(tmp_path / "00002.wav")
+        with open(sink.last_path, 'rb') as f:
+            assert f.read() == clip
+
+    def test_numbering_continues(self, tmp_path):
+        """Test that a new sink doesn't overwrite earlier clips"""
+        main.WavFileSink(str(tmp_path)).play(_wav_bytes(0.1), "wav")
+        sink = main.WavFileSink(str(tmp_path))
+        sink.play(_wav_bytes(0.1), "wav")
+
+        assert sink.last_path.endswith("00002.wav")
+
+    def test_encoded_audio_is_decoded(self, tmp_path):
+        """Test that compressed clips are decoded into valid WAV files"""
+        with patch('main._decode_pcm', return_value=(b"\x01\x00" * 100, 22050, 1)):
+            sink = main.WavFileSink(str(tmp_path))
+            sink.play(b"mp3-bytes", "mp3")
+
+        with wave.open(sink.last_path, 'rb') as wav:
+            assert wav.getframerate() == 22050
+            assert wav.getnframes() == 100
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="Unix sockets not available")
+class TestPcmStreamSink:
+    """Test streaming raw PCM to another process"""
+
+    def test_streams_to_unix_socket(self, tmp_path):
+        """Test that decoded frames are written to a listening socket"""
+        path = str(tmp_path / "pcm.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        received = []
+
+        def reader():
+            conn, _ = server.accept()
+            with conn:
+                while data := conn.recv(4096):
+                    received.append(data)
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        sink = main.PcmStreamSink(path)
+        with patch('main._decode_pcm', return_value=(b"\x02\x00" * 50, 44100, 2)):
+            sink.play(b"one", "mp3")
+            sink.play(b"two", "mp3")
+        sink._stream.close()
+        thread.join(timeout=2)
+        server.close()
+
+        assert b"".join(received) == b"\x02\x00" * 100
+        assert "s16le 44100 Hz 2 ch" in sink.describe()
+
+    @pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason="FIFOs not available")
+    def test_streams_to_fifo(self, tmp_path):
+        """Test that frames can be piped through a named FIFO"""
+        path = str(tmp_path / "pcm.fifo")
+        os.mkfifo(path)
+        received = []
+        thread = threading.Thread(target=lambda: received.append(open(path, 'rb').read()))
+        thread.start()
+
+        sink = main.PcmStreamSink(path)
+        with patch('main._decode_pcm', return_value=(b"\x03\x00" * 10, 44100, 2)):
+            sink.play(b"clip", "mp3")
+        sink._stream.close()
+        thread.join(timeout=2)
+
+        assert received == [b"\x03\x00" * 10]
+
+
+@pytest.mark.skipif(not main.NUMPY_AVAILABLE, reason="numpy not installed")
+class TestSilenceTrimming:
+    """Test trimming leading and trailing silence from synthesized audio"""
+
+    def test_trims_both_ends_keeping_padding(self):
+        """Test that only padding is left around the tone"""
+        trimmed = main._trim_silence(_padded_tone(), "wav", threshold_db=-45, pad_ms=30)
+
+        assert main._audio_duration(trimmed, "wav") == pytest.approx(0.2 + 0.06, abs=0.011)
+
+    def test_silent_clip_left_whole(self):
+        """Test that a clip with no speech is not trimmed to nothing"""
+        clip = _wav_bytes(0.5)
+        assert main._audio_duration(main._trim_silence(clip, "wav"), "wav") == pytest.approx(0.5)
+
+    def test_synthesis_reports_trimmed_ms_and_caches(self, tmp_path):
+        """Test that synthesis results are trimmed once and the trimmed audio is reused"""
+        cache = main.AudioCache(str(tmp_path / "cache"))
+        clip = _padded_tone()
+
+        def synthesizer(*_):
+            return main.SynthesisResult(clip, "wav", ["engine: pyttsx3"])
+
+        with patch('main.TRIM_SILENCE', True), patch('main.TRIM_PAD_MS', 30), \
+             patch('main.audio_cache', cache), patch('main.engine_router', main.EngineRouter()), \
+             patch.dict(main._SYNTHESIZERS, {"pyttsx3": synthesizer}):
+            first = main._synthesize("pyttsx3", "Hi", None, None, 150)
+            with patch('main._trim_silence') as mock_trim:
+                second = main._synthesize("pyttsx3", "Hi", None, None, 150)
+
+        mock_trim.assert_not_called()
+        assert first.audio_format == "wav"
+        assert bytes(second.audio) == bytes(first.audio)
+        assert first.details[-1] == "trimmed: 640 ms"
+
+    def test_disabled_by_default(self):
+        """Test that results pass through untouched unless trimming is enabled"""
+        result = main.SynthesisResult(b"mp3", "mp3", ["engine: gTTS"])
+        with patch('main.TRIM_SILENCE', False):
+            assert main._trim_result(result) is result
+        with patch('main.TRIM_SILENCE', True), patch('main.NUMPY_AVAILABLE', False):
+            assert main._trim_result(result) is result
+
+
+
+@pytest.mark.skipif(not main.NUMPY_AVAILABLE, reason="numpy not installed")
+class TestTimeStretch:
+    """Test applying the speaking rate to network engines by time-stretching"""
+
+    @pytest.mark.parametrize("speed", [0.5, 1.25, 2.0])
+    def test_duration_changes_pitch_does_not(self, speed):
+        """Test that stretched audio lasts 1/speed as long at the same pitch"""
+        stretched = main._time_stretch(_tone_wav(), "wav", speed)
+
+        assert main._audio_duration(stretched, "wav") == pytest.approx(1.0 / speed, abs=0.001)
+        assert _dominant_frequency(stretched) == pytest.approx(440, abs=3)
+
+    def test_speed_buckets(self):
+        """Test that rates map to speeds rounded to the cache step, including emotion"""
+        with patch('main.TIME_STRETCH_STEP', 0.05):
+            assert main._stretch_speed(150, None) == 1.0
+            assert main._stretch_speed(180, None) == 1.2
+            assert main._stretch_speed(182, None) == 1.2
+            assert main._stretch_speed(150, "dramatic") == 1.2
+            assert main._stretch_speed(75, None) == 0.5
+
+    def test_network_engine_stretched_and_cached_per_bucket(self, tmp_path):
+        """Test that gTTS honors rate and nearby rates reuse one cached variant"""
+        cache = main.AudioCache(str(tmp_path / "cache"))
+
+        def synthesizer(*_):
+            return main.SynthesisResult(_tone_wav(), "wav", ["engine: gTTS"])
+
+        with patch('main.TIME_STRETCH', True), patch('main.TIME_STRETCH_STEP', 0.05), \
+             patch('main.audio_cache', cache), patch('main.engine_router', main.EngineRouter()), \
+             patch.dict(main._SYNTHESIZERS, {"gtts": synthesizer}):
+            first = main._synthesize("gtts", "Hi", None, None, 180)
+            with patch('main._time_stretch') as mock_stretch:
+                second = main._synthesize("gtts", "Hi", None, None, 182)
+
+        mock_stretch.assert_not_called()
+        assert first.details[-1] == "speed: 1.20x"
+        assert bytes(second.audio) == bytes(first.audio)
+        assert main._audio_duration(first.audio, "wav") == pytest.approx(1 / 1.2, abs=0.001)
+
+    def test_default_rate_and_pyttsx3_untouched(self):
+        """Test that the default rate is a no-op and pyttsx3 keeps its native rate control"""
+        result = main.SynthesisResult(b"mp3", "mp3", ["engine: gTTS"])
+        with patch('main.TIME_STRETCH', True):
+            assert main._stretch_result("gtts", result, 150, None) is result
+            assert main._stretch_result("pyttsx3", result, 300, None) is result
+        with patch('main.TIME_STRETCH', False):
+            assert main._stretch_result("gtts", result, 300, None) is result
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
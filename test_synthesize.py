@@ -0,0 +1,192 @@
+# ABOUTME: Tests for headless synthesis tools that render audio without playing it
+# ABOUTME: Covers file and base64 output, format conversion, the output directory and bulk rendering
+import base64
+import multiprocessing
+import os
+import time
+import pytest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import Mock, patch
+import main
+
+
+def _fake_gtts(text, voice, emotion, rate):
+    return main.SynthesisResult(f"mp3:{text}".encode(), "mp3", ["engine: gTTS"])
+
+
+def _in_render_worker():
+    return main._IN_RENDER_WORKER
+
+
+def _worker_startup_state():
+    return main._IN_RENDER_WORKER, main.tts_engine, main.standby_engine, main.tracer, type(main.output_sink).__name__
+
+
+@pytest.fixture
+def headless(tmp_path):
+    """gTTS available with a fake synthesizer, output under a temporary directory"""
+    with patch.dict(main._engines, {"gtts": "gtts"}), \
+         patch.dict(main._SYNTHESIZERS, {"gtts": _fake_gtts}), \
+         patch('main.engine_router', main.EngineRouter()), \
+         patch('main.OUTPUT_DIR', str(tmp_path / "output")), \
+         patch('main.NORMALIZE_TEXT', False), \
+         patch('main._play_audio') as mock_play:
+        yield mock_play
+
+
+class TestSynthesizeTool:
+    """Test rendering audio without playback"""
+
+    def test_registered_as_threaded_tool(self):
+        """Test that synthesize runs off the event loop like speak"""
+        tool = main.mcp._tool_manager.get_tool("synthesize")
+        assert tool is not None
+        assert tool.is_async
+        assert {"audio_format", "output"} <= set(tool.parameters["properties"])
+
+    def test_writes_file_without_playing(self, headless):
+        """Test that audio is saved to the output directory and never played"""
+        result = main.synthesize("Build passed", engine="gtts")
+
+        assert "🎼 Synthesized: 'Build passed' (engine: gTTS, format: mp3" in result
+        path = result.splitlines()[1].removeprefix("📁 Path: ")
+        with open(path, 'rb') as f:
+            assert f.read() == b"mp3:Build passed"
+        assert path.endswith(".mp3")
+        headless.assert_not_called()
+
+    def test_base64_output(self, headless):
+        """Test that audio can be returned inline"""
+        result = main.synthesize("Hello", engine="gtts", output="base64")
+
+        payload = result.splitlines()[1].removeprefix("🔤 Base64: ")
+        assert base64.b64decode(payload) == b"mp3:Hello"
+
+    def test_repeat_phrase_reuses_file(self, headless):
+        """Test that identical audio maps to a single file"""
+        first = main.synthesize("Same", engine="gtts").splitlines()[1]
+        second = main.synthesize("Same", engine="gtts").splitlines()[1]
+
+        assert first == second
+        assert len(os.listdir(main.OUTPUT_DIR)) == 1
+
+    def test_output_directory_is_pruned(self, headless):
+        """Test that only the most recent files are kept"""
+        with patch('main.OUTPUT_MAX_FILES', 2):
+            for i in range(4):
+                main.synthesize(f"Line {i}", engine="gtts")
+
+        assert len(os.listdir(main.OUTPUT_DIR)) == 2
+
+    def test_conversion_requires_ffmpeg(self, headless):
+        """Test that a non-native format without ffmpeg is a clear error"""
+        with patch('main.shutil.which', return_value=None):
+            result = main.synthesize("Hello", engine="gtts", audio_format="wav")
+
+        assert "❌ Error synthesizing text: converting mp3 to wav requires ffmpeg" in result
+
+    def test_conversion_with_ffmpeg(self, headless):
+        """Test that requested formats are transcoded through ffmpeg"""
+        completed = Mock(returncode=0, stdout=b"RIFF-wav")
+        with patch('main.shutil.which', return_value="/usr/bin/ffmpeg"), \
+             patch('main.subprocess.run', return_value=completed) as mock_run:
+            result = main.synthesize("Hello", engine="gtts", audio_format="wav", output="base64")
+
+        assert base64.b64decode(result.splitlines()[1].removeprefix("🔤 Base64: ")) == b"RIFF-wav"
+        assert mock_run.call_args.kwargs["input"] == b"mp3:Hello"
+        assert "format: wav" in result
+
+    def test_invalid_arguments(self):
+        """Test that unknown output modes and formats are rejected"""
+        assert "❌ Error: Unknown output 'stream'" in main.synthesize("Hi", output="stream")
+        assert "❌ Error: Unknown audio format 'flac'" in main.synthesize("Hi", audio_format="flac")
+        assert "❌ Error: Text cannot be empty" in main.synthesize("")
+
+    def test_counted_in_status(self, headless):
+        """Test that synthesize calls are reported separately from speak calls"""
+        with patch.dict(main._server_stats, {"synthesize_calls": 0, "synthesize_errors": 0}):
+            main.synthesize("Hello", engine="gtts")
+            assert "🎼 Synthesize calls: 1 completed, 0 failed" in main.server_status()
+
+
+class TestRenderBatch:
+    """Test bulk rendering across a pool of pyttsx3 worker processes"""
+
+    @pytest.fixture
+    def thread_pool(self):
+        """Run workers in threads so patched workers are visible to them"""
+        with patch('main._render_pool', lambda workers: ThreadPoolExecutor(max_workers=workers)):
+            yield
+
+    def test_results_in_input_order(self, thread_pool, tmp_path):
+        """Test that results follow input order even when phrases finish out of order"""
+        def fake_worker(job):
+            index, text, _, _, _, path = job
+            time.sleep(0.05 * (3 - index))
+            if text == "bad":
+                return index, None, "render failed"
+            return index, path, None
+
+        progress = []
+        with patch('main._render_worker', fake_worker):
+            results = main._render_batch(["a", "b", "bad", "d"], str(tmp_path), workers=4,
+                                         progress=lambda done, total: progress.append((done, total)))
+
+        assert [os.path.basename(path) for path, _ in results if path] == ["00000.wav", "00001.wav", "00003.wav"]
+        assert results[2] == (None, "render failed")
+        assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+    def test_worker_saves_with_own_engine(self, tmp_path):
+        """Test that a worker renders with save_to_file on its process-local engine"""
+        engine = Mock()
+        path = str(tmp_path / "00000.wav")
+        with patch('main._render_worker_engine', engine):
+            assert main._render_worker((0, "Alert", None, None, 150, path)) == (0, path, None)
+
+        engine.save_to_file.assert_called_once_with("Alert", path)
+        engine.say.assert_not_called()
+
+    def test_worker_reports_errors(self, tmp_path):
+        """Test that one failing phrase does not abort the batch"""
+        engine = Mock()
+        engine.save_to_file.side_effect = RuntimeError("driver crashed")
+        with patch('main._render_worker_engine', engine):
+            assert main._render_worker((3, "Alert", None, None, 150, "x.wav")) == (3, None, "driver crashed")
+
+    def test_workers_skip_server_startup(self, tmp_path, monkeypatch):
+        """Test that spawned render workers don't repeat engine, standby, tracer or sink setup on import"""
+        monkeypatch.setenv("TTS_ENGINE", "gtts")
+        monkeypatch.setenv("VOCALIZE_TRACE", str(tmp_path / "spans.jsonl"))
+        with ProcessPoolExecutor(max_workers=1, mp_context=main._RenderWorkerContext()) as pool:
+            state = pool.submit(_worker_startup_state).result(timeout=60)
+
+        assert state == (True, None, None, None, "NullSink")
+        assert not main._IN_RENDER_WORKER
+        assert main._RENDER_WORKER_ENV not in os.environ
+
+    def test_other_child_processes_start_normally(self):
+        """Test that only render workers are flagged, not every multiprocessing child"""
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            assert pool.submit(_in_render_worker).result(timeout=60) is False
+
+    def test_tool_lists_files(self, thread_pool, tmp_path):
+        """Test that the render_batch tool reports one line per phrase"""
+        def fake_worker(job):
+            return job[0], job[5], None
+
+        with patch('main._render_worker', fake_worker), patch('main.OUTPUT_DIR', str(tmp_path)):
+            result = main.render_batch(["Disk full", "Backup done"])
+
+        lines = result.splitlines()
+        assert lines[0].startswith("🏭 Rendered 2/2 phrases to ")
+        assert lines[1].startswith("0: ") and lines[1].endswith("00000.wav")
+        assert lines[2].startswith("1: ") and lines[2].endswith("00001.wav")
+
+    def test_tool_validates_every_phrase(self):
+        """Test that a batch with an invalid phrase is rejected up front"""
+        assert "❌ Error: Text cannot be empty" in main.render_batch(["ok", ""])
+        assert "❌ Error: No texts to render" in main.render_batch([])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
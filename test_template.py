@@ -0,0 +1,148 @@
+# ABOUTME: Tests for template speech that caches fixed fragments and stitches in slot values
+# ABOUTME: Covers template parsing, crossfaded stitching and fragment reuse through the cache
+import io
+import wave
+import pytest
+from unittest.mock import patch
+import main
+
+np = pytest.importorskip("numpy")
+
+
+def _tone(seconds, sample_rate=8000, silence=0.0):
+    """A 16-bit mono WAV tone with optional silence on both sides"""
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+    pad = np.zeros(int(sample_rate * silence))
+    samples = np.concatenate([pad, tone, pad])
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def _frames(audio):
+    with wave.open(io.BytesIO(audio), 'rb') as wav:
+        return wav.getnframes(), wav.getframerate()
+
+
+class TestTemplatePieces:
+    """Test splitting templates into cacheable pieces"""
+
+    def test_fragments_and_slots_split(self):
+        """Test that fixed text and slot values become separate pieces"""
+        text, pieces = main._template_pieces("Deploy of {service} finished in {seconds} seconds.",
+                                             {"service": "billing", "seconds": 42})
+
+        assert text == "Deploy of billing finished in 42 seconds."
+        assert pieces == ["Deploy of", "billing", "finished in", "42", "seconds."]
+
+    def test_format_specs_applied(self):
+        """Test that slot format specs are honoured"""
+        text, _ = main._template_pieces("Took {seconds:.1f} seconds", {"seconds": 2.345})
+        assert text == "Took 2.3 seconds"
+
+    def test_invalid_templates(self):
+        """Test that missing values and unnamed slots are rejected"""
+        assert main.speak_template("Deploy of {service}", {}) == "❌ Error: No value for template slot 'service'"
+        assert "template slots must be named" in main.speak_template("Deploy of {}", {"service": "x"})
+
+
+class TestStitching:
+    """Test joining clips with crossfades"""
+
+    def test_crossfade_overlaps_joins(self):
+        """Test that each join overlaps the clips by the crossfade length"""
+        stitched = main._stitch_clips([(_tone(0.1), "wav"), (_tone(0.2), "wav"), (_tone(0.1), "wav")], crossfade_ms=10)
+
+        assert _frames(stitched) == (800 + 1600 + 800 - 2 * 80, 8000)
+
+    def test_mismatched_rates_resampled(self):
+        """Test that clips are converted to the first clip's sample rate"""
+        stitched = main._stitch_clips([(_tone(0.1, 8000), "wav"), (_tone(0.1, 16000), "wav")], crossfade_ms=0)
+
+        assert _frames(stitched) == (1600, 8000)
+
+    def test_join_has_no_gap(self):
+        """Test that the equal-power crossfade keeps the level up through the join"""
+        stitched = main._stitch_clips([(_tone(0.1), "wav"), (_tone(0.1), "wav")], crossfade_ms=10)
+        with wave.open(io.BytesIO(stitched), 'rb') as wav:
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2") / 32768.0
+
+        join = samples[720:800]
+        assert np.sqrt(np.mean(join ** 2)) > 0.2
+
+
+class TestSpeakTemplate:
+    """Test speaking templates through the cache"""
+
+    @pytest.fixture
+    def cached_engine(self, tmp_path):
+        calls = []
+        cache = main.AudioCache(str(tmp_path / "cache"), max_bytes=1024 * 1024, wait_timeout=5)
+
+        def synthesize(text, voice, emotion, rate):
+            def create():
+                calls.append(text)
+                return _tone(0.05 * len(text.split()), silence=0.1)
+
+            audio, cached = main._cached_synthesis("gtts", text, create)
+            return main.SynthesisResult(audio, "wav", ["engine: gTTS", f"cache: {'hit' if cached else 'miss'}"], cached)
+
+        with patch('main.audio_cache', cache), \
+             patch.dict(main._engines, {"gtts": "gtts"}), \
+             patch.dict(main._SYNTHESIZERS, {"gtts": synthesize}), \
+             patch('main.engine_router', main.EngineRouter()), \
+             patch('main.TIME_STRETCH', False), \
+             patch('main.TRIM_SILENCE', False), \
+             patch('main.NORMALIZE_TEXT', False), \
+             patch('main._play_audio') as mock_play:
+            yield calls, mock_play
+
+    def test_fixed_fragments_reused(self, cached_engine):
+        """Test that a second announcement only synthesizes its new slot values"""
+        calls, mock_play = cached_engine
+        template = "Deploy of {service} finished in {seconds} seconds"
+        first = main.speak_template(template, {"service": "billing", "seconds": 42}, engine="gtts")
+        second = main.speak_template(template, {"service": "search", "seconds": 42}, engine="gtts")
+
+        assert first == "🗣️ Spoke: 'Deploy of billing finished in 42 seconds' (engine: gTTS, fragments: 0/5 cached)"
+        assert second.endswith("(engine: gTTS, fragments: 4/5 cached)")
+        assert calls == ["Deploy of", "billing", "finished in", "42", "seconds", "search"]
+        assert mock_play.call_args.args[1] == "wav"
+
+    def test_pyttsx3_fragments_reused(self, tmp_path, fake_pyttsx3):
+        """Test that fragments rendered by the default pyttsx3 engine are cached per voice and emotion"""
+        cache = main.AudioCache(str(tmp_path / "cache"), max_bytes=1024 * 1024, wait_timeout=5)
+        template = "Deploy of {service} finished"
+        with patch('main.audio_cache', cache), patch('main.TTS_ENGINE', "pyttsx3"), patch('main.ROUTING_MODE', "fixed"):
+            main.speak_template(template, {"service": "billing"}, emotion="calm")
+            second = main.speak_template(template, {"service": "search"}, emotion="calm")
+            excited = main.speak_template(template, {"service": "search"}, emotion="excited")
+
+        assert second.endswith("fragments: 2/3 cached)")
+        assert excited.endswith("fragments: 0/3 cached)")
+        assert fake_pyttsx3 == ["Deploy of", "billing", "finished", "search", "Deploy of", "search", "finished"]
+
+    def test_silence_trimmed_between_fragments(self, cached_engine):
+        """Test that the padding each fragment was rendered with is cut before stitching"""
+        _, mock_play = cached_engine
+        main.speak_template("Status {state}", {"state": "green"}, engine="gtts")
+
+        frames, sample_rate = _frames(mock_play.call_args.args[0])
+        assert frames / sample_rate < 0.25  # Two 50 ms words with 30 ms padding; untrimmed they would last 0.5 s
+
+    def test_single_piece_spoken_whole(self, cached_engine):
+        """Test that a template without slots is spoken like speak()"""
+        calls, _ = cached_engine
+        result = main.speak_template("All systems go", {}, engine="gtts")
+
+        assert result.startswith("🗣️ Spoke: 'All systems go'")
+        assert calls == ["All systems go"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,94 @@
+# ABOUTME: Tests for the per-call timing breakdown returned by speak(timing=True)
+# ABOUTME: Covers queue, synthesis and playback phases, cache reporting and the engine used after fallback
+import json
+import threading
+import time
+import pytest
+from unittest.mock import patch
+import main
+from conftest import silence
+
+
+def _timing(result):
+    line = result.splitlines()[-1]
+    assert line.startswith("⏱️ Timing: ")
+    return json.loads(line.removeprefix("⏱️ Timing: "))
+
+
+@pytest.fixture
+def slow_gtts(fake_gtts):
+    """gTTS taking 50 ms to synthesize 0.1 s of audio, played in real time"""
+    def synthesize(text, voice, emotion, rate):
+        with main._synthesis_limits["gtts"]:
+            time.sleep(0.05)
+        return main.SynthesisResult(silence(0.1), "wav", ["engine: gTTS"])
+
+    fake_gtts(synthesize, realtime=True)
+
+
+class TestCallTiming:
+    """Test the structured timing breakdown"""
+
+    def test_phases_reported(self, slow_gtts):
+        """Test that synthesis, first audio and playback durations are measured"""
+        result = main.speak("Build passed", engine="gtts", timing=True)
+
+        assert result.splitlines()[0].startswith("🗣️ Spoke: 'Build passed'")
+        timing = _timing(result)
+        assert timing["engine"] == timing["requested_engine"] == "gtts"
+        assert timing["synthesis_ms"] >= 50
+        assert timing["playback_ms"] >= 100
+        assert timing["first_audio_ms"] >= timing["synthesis_ms"]
+        assert timing["total_ms"] >= timing["first_audio_ms"] + timing["playback_ms"] - 1
+        assert timing["audio_bytes"] == len(silence(0.1))
+
+    def test_waits_reported_as_queueing(self, slow_gtts):
+        """Test that waiting for the engine or the audio device is not counted as synthesis"""
+        limiter = main.SynthesisLimiter("gtts", 1)
+        with patch.dict(main._synthesis_limits, {"gtts": limiter}), main.audio_output_lock:
+            results = {}
+            thread = threading.Thread(target=lambda: results.update(
+                speak=main.speak("Queued", engine="gtts", timing=True)))
+            with limiter:
+                thread.start()
+                time.sleep(0.1)
+            time.sleep(0.15)
+        thread.join()
+
+        timing = _timing(results["speak"])
+        assert timing["synthesis_queue_ms"] >= 90
+        assert timing["synthesis_ms"] < 90
+        assert timing["playback_queue_ms"] >= 50
+
+    def test_cache_hit_and_network_bytes(self):
+        """Test that cache hits are reported and transfer no network bytes"""
+        timing = main.CallTiming()
+        timing.record_synthesis("gtts", main.SynthesisResult(b"mp3" * 10, "mp3", [], cached=True))
+
+        report = timing.report("gtts")
+        assert report["cache"] == "hit"
+        assert report["network_bytes"] == 0
+        assert report["audio_bytes"] == 30
+        assert report["playback_ms"] is None
+
+    def test_engine_after_fallback(self, slow_gtts):
+        """Test that the engine actually used is reported when the requested one fails"""
+        def failing(*_):
+            raise RuntimeError("ElevenLabs error: down")
+
+        with patch.dict(main._engines, {"elevenlabs": "client"}), \
+             patch.dict(main._SYNTHESIZERS, {"elevenlabs": failing}), \
+             patch('main.ROUTING_ENGINES', ["elevenlabs", "gtts"]):
+            result = main.speak("Routed", engine="auto", timing=True)
+
+        timing = _timing(result)
+        assert timing["requested_engine"] == "auto"
+        assert timing["engine"] == "gtts"
+
+    def test_off_by_default(self, slow_gtts):
+        """Test that the plain confirmation is unchanged unless timing is requested"""
+        assert "⏱️" not in main.speak("Plain", engine="gtts")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
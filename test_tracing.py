@@ -0,0 +1,125 @@
+# ABOUTME: Tests for opt-in span tracing of the speech pipeline
+# ABOUTME: Covers span nesting, attributes, OTLP/JSON file and collector export, and the disabled fast path
+import http.server
+import anyio
+import json
+import threading
+import pytest
+from unittest.mock import patch
+import main
+
+
+def _exported_spans(path):
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            for resource_spans in json.loads(line)["resourceSpans"]:
+                for scope_spans in resource_spans["scopeSpans"]:
+                    spans.extend(scope_spans["spans"])
+    return spans
+
+
+def _attributes(span):
+    return {attribute["key"]: next(iter(attribute["value"].values())) for attribute in span["attributes"]}
+
+
+@pytest.fixture
+def file_tracer(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = main.Tracer(str(path), flush_interval=60)
+    with patch('main.tracer', tracer):
+        yield tracer, path
+    tracer.close()
+
+
+class TestTracing:
+    """Test spans emitted around pipeline stages"""
+
+    def test_speak_traced_end_to_end(self, file_tracer, fake_gtts):
+        """Test that one tool call produces a single trace covering every stage"""
+        tracer, path = file_tracer
+        fake_gtts()
+        result = main._run_tool(main.speak, "Build passed", emotion="calm", engine="gtts")
+        tracer.flush()
+
+        assert result.startswith("🗣️ Spoke")
+        spans = {span["name"]: span for span in _exported_spans(path)}
+        assert {"tool speak", "validate", "synthesize", "postprocess", "playback"} <= set(spans)
+        root = spans["tool speak"]
+        assert "parentSpanId" not in root
+        assert root["kind"] == main.SPAN_KIND_SERVER
+        assert {span["traceId"] for span in spans.values()} == {root["traceId"]}
+        assert spans["synthesize"]["parentSpanId"] == root["spanId"]
+
+        synthesize = _attributes(spans["synthesize"])
+        assert synthesize["vocalize.engine"] == "gtts"
+        assert synthesize["vocalize.emotion"] == "calm"
+        assert synthesize["vocalize.text_length"] == "12"
+        assert synthesize["vocalize.cache"] == "miss"
+        assert _attributes(root)["vocalize.outcome"] == "ok"
+        assert int(root["endTimeUnixNano"]) >= int(spans["playback"]["endTimeUnixNano"])
+
+    def test_failures_marked_as_errors(self, file_tracer):
+        """Test that exceptions and error replies set an error status"""
+        tracer, path = file_tracer
+        with pytest.raises(ValueError):
+            with main._span("stage"):
+                raise ValueError("boom")
+        main._run_tool(main.speak, "")
+        tracer.flush()
+
+        spans = {span["name"]: span for span in _exported_spans(path)}
+        assert spans["stage"]["status"] == {"code": 2, "message": "ValueError: boom"}
+        assert spans["tool speak"]["status"]["code"] == 2
+
+    def test_every_tool_traced(self, file_tracer):
+        """Test that every registered tool runs inside a tool span, including the informational ones"""
+        tracer, path = file_tracer
+        assert all(tool.is_async for tool in main.mcp._tool_manager.list_tools())
+        for name in ("list_emotions", "list_voices", "voice_guide", "server_status"):
+            anyio.run(main.mcp.call_tool, name, {})
+        tracer.flush()
+
+        names = {span["name"] for span in _exported_spans(path)}
+        assert {"tool list_emotions", "tool list_voices", "tool voice_guide", "tool server_status"} <= names
+
+    def test_exports_to_collector(self):
+        """Test that an http target receives OTLP/JSON posts"""
+        received = []
+
+        class Collector(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.HTTPServer(("127.0.0.1", 0), Collector)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        tracer = main.Tracer(f"http://127.0.0.1:{server.server_port}/v1/traces", flush_interval=60)
+        try:
+            with patch('main.tracer', tracer), main._span("stage", {"vocalize.engine": "gtts"}):
+                pass
+            tracer.close()
+        finally:
+            server.shutdown()
+
+        resource = received[0]["resourceSpans"][0]
+        assert {"key": "service.name", "value": {"stringValue": "vocalize-mcp"}} in resource["resource"]["attributes"]
+        assert resource["scopeSpans"][0]["spans"][0]["name"] == "stage"
+        assert tracer.exported == 1
+
+    def test_disabled_is_a_no_op(self):
+        """Test that nothing is recorded when tracing is off"""
+        with patch('main.tracer', None):
+            assert main._span("stage") is main._NO_SPAN
+            with main._span("stage") as span:
+                span.set("vocalize.engine", "gtts")
+            assert main.validate_speak_input("Hello", 150) == (True, "")
+            assert main._current_span.get() is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])